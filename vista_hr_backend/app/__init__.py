@@ -25,6 +25,11 @@ def create_app():
     from .models import review       as _m7  # noqa
     from .models import saved_listing as _m8 # noqa
     from .models import ticket       as _m9  # noqa
+    from .models import listing_index as _m10 # noqa
+    from .models import counter      as _m11 # noqa
+    from .models import daily_metric as _m12 # noqa
+    from .models import conversation_thread as _m13 # noqa
+    from .models import realtime_event as _m14 # noqa
 
     CORS(
     app,
@@ -57,6 +62,7 @@ def create_app():
     from .routes.saved         import saved_bp
     from .routes.tickets       import tickets_bp
     from .routes.feedback      import feedback_bp
+    from .routes.events        import events_bp
 
 
     app.register_blueprint(auth_bp,          url_prefix="/api")
@@ -74,6 +80,7 @@ def create_app():
     app.register_blueprint(saved_bp,         url_prefix="/api")
     app.register_blueprint(tickets_bp,       url_prefix="/api")
     app.register_blueprint(feedback_bp,      url_prefix="/api")
+    app.register_blueprint(events_bp,        url_prefix="/api")
 
     @app.get("/health")
     def health():
@@ -36,6 +36,7 @@ from flask import current_app, request, g, make_response
 from ..extensions import db
 from ..models import User
 from ..utils.errors import json_error
+from ..utils.presence import touch_seen
 
 
 
@@ -195,6 +196,8 @@ def require_auth(fn):
 
         g.current_user = user
         g.token_payload = payload
+        # In-memory last-seen for presence / "active now" (no DB write)
+        touch_seen(user.id, user.role.value if hasattr(user.role, "value") else str(user.role))
         return fn(*args, **kwargs)
 
     return wrapper
@@ -50,4 +50,20 @@ class Config:
     # Abstract API — email validation (optional, falls back to regex if unset)
     ABSTRACT_API_KEY   = os.getenv("ABSTRACT_API_KEY", "")
 
-    SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-flask-session-key-change-me")
\ No newline at end of file
+    SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-flask-session-key-change-me")
+
+    # Realtime (SSE) fan-out between workers: "socket" | "db" | "local"
+    REALTIME_BACKEND        = os.getenv("REALTIME_BACKEND", "socket")
+    REALTIME_SOCKET_DIR     = os.getenv("REALTIME_SOCKET_DIR", "")
+    REALTIME_STREAM_SECONDS = int(os.getenv("REALTIME_STREAM_SECONDS", "120"))
+    # Open streams per worker; each holds a gthread thread (see Procfile --threads)
+    REALTIME_MAX_STREAMS    = int(os.getenv("REALTIME_MAX_STREAMS", "16"))
+
+    # Background jobs (one leader process per host, see utils/scheduler.py)
+    SCHEDULER_ENABLED       = os.getenv("SCHEDULER_ENABLED", "1") != "0"
+    SCHEDULER_LOCK_FILE     = os.getenv("SCHEDULER_LOCK_FILE", "")
+    BOOKING_EXPIRY_INTERVAL = int(os.getenv("BOOKING_EXPIRY_INTERVAL", "300"))   # seconds
+    DAILY_ROLLUP_INTERVAL   = int(os.getenv("DAILY_ROLLUP_INTERVAL", "900"))     # seconds
+
+    # Finished bulk receipt ZIPs (shared by the workers of one host)
+    RECEIPT_EXPORT_DIR      = os.getenv("RECEIPT_EXPORT_DIR", "")
\ No newline at end of file
@@ -6,6 +6,11 @@ from .notification import Notification
 from .review import Review
 from .saved_listing import SavedListing
 from .ticket import Ticket
+from .listing_index import ListingIndex
+from .counter import Counter
+from .daily_metric import DailyMetric
+from .conversation_thread import ConversationThread
+from .realtime_event import RealtimeEvent
 
 
-__all__ = ["User", "Listing", "Booking", "Message", "ArchivedConversation", "Notification", "Review", "SavedListing", "Ticket"]
\ No newline at end of file
+__all__ = ["User", "Listing", "Booking", "Message", "ArchivedConversation", "Notification", "Review", "SavedListing", "Ticket", "ListingIndex", "Counter", "DailyMetric", "ConversationThread", "RealtimeEvent"]
\ No newline at end of file
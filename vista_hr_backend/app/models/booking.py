@@ -1,11 +1,20 @@
 from datetime import datetime, timezone
 from sqlalchemy import Enum
+from sqlalchemy.orm import load_only
 from ..extensions import db
 
 BOOKING_STATUS = ("PENDING", "APPROVED", "VIEWING_SCHEDULED", "VIEWING_DECLINED", "ACTIVE", "COMPLETED", "MOVED_OUT", "REJECTED", "CANCELLED")
 
 class Booking(db.Model):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Deadline scans of the expiry job (utils/booking_expiry.py)
+        db.Index("ix_bookings_status_created",  "status", "created_at"),
+        db.Index("ix_bookings_status_approved", "status", "approved_at"),
+        db.Index("ix_bookings_status_viewing",  "status", "viewing_date"),
+        # Owner calendar: stays starting before the end of a date window
+        db.Index("ix_bookings_listing_move_in", "listing_id", "move_in_date"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -71,54 +80,231 @@ class Booking(db.Model):
     # Viewing confirmed by resident (prevents re-prompting on refresh)
     viewing_confirmed_at    = db.Column(db.DateTime, nullable=True)
 
+    # Listing + parties as they were when the booking was made, refreshed
+    # once on approval and immutable after that (receipts, booking cards).
+    # See build_booking_snapshot(); NULL only for rows not yet backfilled.
+    snapshot = db.Column(db.JSON, nullable=True)
+
     # Relationships (lazy=True is fine for this scale)
     listing = db.relationship("Listing", backref=db.backref("bookings", lazy=True))
     resident = db.relationship("User", foreign_keys=[resident_id])
 
-    def to_dict(self):
-        listing = self.listing
-        location = (listing.location or {}) if listing else {}
-        photos = (listing.photos or []) if listing else []
-        cover = None
-        if isinstance(photos, list) and photos:
-            cover = photos[0].get("url") if isinstance(photos[0], dict) else photos[0]
-
-        resident = self.resident
-        resident_first = (resident.first_name or "").strip() if resident else ""
-        resident_last  = (resident.last_name  or "").strip() if resident else ""
-        resident_name  = f"{resident_first} {resident_last}".strip() or (resident.email if resident else None)
+    def to_dict(self, lean: bool = False, listing_snapshot: dict = None):
+        """
+        `lean` drops free text, document URLs and the resident's email —
+        enough for list rows and counts. Pass `listing_snapshot` to reuse
+        one snapshot for every booking of the same listing (see
+        serialize_bookings).
+        """
+        snap = self.snapshot
+        if snap:
+            # Frozen copy — no listing / user lookups
+            listing_snapshot = listing_card(snap)
+            resident_name  = snap["resident"]["name"]
+            resident_email = snap["resident"]["email"]
+        else:
+            if listing_snapshot is None:
+                listing_snapshot = booking_listing_snapshot(self.listing)
+            resident = self.resident
+            resident_name  = person_name(resident, None)
+            resident_email = resident.email if resident else None
 
-        return {
+        data = {
             "id": self.id,
             "listing_id": self.listing_id,
             "resident_id": self.resident_id,
             "resident_name": resident_name,
-            "resident_email": resident.email if resident else None,
             "status": self.status,
             "move_in_date": self.move_in_date.isoformat() if self.move_in_date else None,
             "move_out_date": self.move_out_date.isoformat() if self.move_out_date else None,
-            "message": self.message,
-            "owner_note": self.owner_note,
-            "payment_proof_url": self.payment_proof_url,
             "payment_verified": bool(self.payment_verified),
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "approved_at":       self.approved_at.isoformat() if self.approved_at else None,
             "viewing_date":      self.viewing_date.isoformat() if self.viewing_date else None,
+            "contract_end_date": self.contract_end_date.isoformat() if self.contract_end_date else None,
+            # Denormalized listing snapshot for easy display
+            "listing": listing_snapshot,
+        }
+        if lean:
+            return data
+
+        data.update({
+            "resident_email": resident_email,
+            "message": self.message,
+            "owner_note": self.owner_note,
+            "payment_proof_url": self.payment_proof_url,
             "viewing_notes":     self.viewing_notes,
             "cancel_reason":     self.cancel_reason,
-            "contract_end_date": self.contract_end_date.isoformat() if self.contract_end_date else None,
             "days_early":              self.days_early,
             "viewing_declined_at":     self.viewing_declined_at.isoformat() if self.viewing_declined_at else None,
             "viewing_decline_reason":  self.viewing_decline_reason,
             "viewing_confirmed_at":    self.viewing_confirmed_at.isoformat() if self.viewing_confirmed_at else None,
-            # Denormalized listing snapshot for easy display
-            "listing": {
-                "title": listing.title if listing else None,
-                "place_type": listing.place_type if listing else None,
-                "city": location.get("city"),
-                "barangay": location.get("barangay"),
-                "price": (listing.capacity or {}).get("monthly_rent") if listing else None,
-                "cover": cover,
-            } if listing else None,
-        }
\ No newline at end of file
+        })
+        return data
+
+    def freeze_snapshot(self, listing=None, resident=None, owner=None) -> None:
+        """(Re)take the snapshot — on creation and on approval only."""
+        from .listing import Listing
+        from .user import User
+
+        listing  = listing  or db.session.get(Listing, self.listing_id)
+        resident = resident or db.session.get(User, self.resident_id)
+        owner    = owner    or (db.session.get(User, listing.owner_id) if listing else None)
+        self.snapshot = build_booking_snapshot(listing, resident, owner)
+
+
+# =========================
+# Snapshot
+# =========================
+def person_name(user, default="—"):
+    if user is None:
+        return default
+    full = f"{(user.first_name or '').strip()} {(user.last_name or '').strip()}".strip()
+    return full or user.email
+
+
+def build_booking_snapshot(listing, resident, owner) -> dict:
+    from .listing_index import extract_rent
+    from ..utils.photos import listing_cover
+
+    location = (listing.location or {}) if listing else {}
+    address = ", ".join(
+        p for p in (location.get("address", ""), location.get("barangay", ""), location.get("city", "")) if p
+    )
+    return {
+        "taken_at": datetime.now(timezone.utc).isoformat(),
+        "listing": {
+            "id": listing.id if listing else None,
+            "title": listing.title if listing else None,
+            "place_type": listing.place_type if listing else None,
+            "city": location.get("city"),
+            "barangay": location.get("barangay"),
+            "address": address or None,
+            "monthly_rent": extract_rent(listing.capacity if listing else None),
+            "cover": listing_cover(listing),
+        },
+        "owner": {"id": owner.id if owner else None, "name": person_name(owner)},
+        "resident": {
+            "id": resident.id if resident else None,
+            "name": person_name(resident, None),
+            "email": resident.email if resident else None,
+        },
+    }
+
+
+def listing_card(snap: dict) -> dict:
+    """The `listing` block of to_dict() from a stored snapshot."""
+    l = snap["listing"]
+    return {
+        "title": l["title"],
+        "place_type": l["place_type"],
+        "city": l["city"],
+        "barangay": l["barangay"],
+        "price": l["monthly_rent"],
+        "cover": l["cover"],
+    }
+
+
+def backfill_booking_snapshots(batch: int = 500) -> int:
+    """Snapshot bookings created before the column existed. Returns rows filled."""
+    from .user import User
+
+    done = 0
+    while True:
+        rows = with_booking_relations(Booking.query).filter(Booking.snapshot.is_(None)).limit(batch).all()
+        if not rows:
+            return done
+        owner_ids = {b.listing.owner_id for b in rows if b.listing}
+        owners = {u.id: u for u in User.query.filter(User.id.in_(owner_ids))} if owner_ids else {}
+        for b in rows:
+            b.snapshot = build_booking_snapshot(
+                b.listing, b.resident, owners.get(b.listing.owner_id) if b.listing else None
+            )
+        db.session.commit()
+        done += len(rows)
+
+
+# =========================
+# List serialization
+# =========================
+def booking_listing_snapshot(listing):
+    if listing is None:
+        return None
+    from .listing_index import extract_rent
+    from ..utils.photos import listing_cover
+
+    location = listing.location or {}
+    return {
+        "title": listing.title,
+        "place_type": listing.place_type,
+        "city": location.get("city"),
+        "barangay": location.get("barangay"),
+        "price": extract_rent(listing.capacity),
+        "cover": listing_cover(listing),
+    }
+
+
+def with_booking_relations(query):
+    """
+    Eager-load the listing and resident of every row: one IN query for the
+    listings and one for the residents, whatever the number of bookings.
+    """
+    from sqlalchemy.orm import selectinload
+    from .listing import Listing
+    from .user import User
+
+    return query.options(
+        selectinload(Booking.listing).load_only(
+            Listing.id, Listing.owner_id, Listing.title, Listing.place_type, Listing.location,
+            Listing.capacity, Listing.cover_url, Listing.cover_variants, Listing.photos,
+        ),
+        selectinload(Booking.resident).load_only(
+            User.id, User.first_name, User.last_name, User.email,
+        ),
+    )
+
+
+def _load_live_relations(bookings) -> list:
+    """
+    Put the listings / residents of snapshot-less bookings in the identity
+    map with one IN query each, so to_dict()'s many-to-one lookups are free.
+    The identity map is weak — keep the returned rows alive while serializing.
+    """
+    from .listing import Listing
+    from .user import User
+
+    loaded = []
+    listing_ids  = {b.listing_id for b in bookings}
+    resident_ids = {b.resident_id for b in bookings}
+    if listing_ids:
+        loaded += Listing.query.options(load_only(
+            Listing.id, Listing.title, Listing.place_type, Listing.location,
+            Listing.capacity, Listing.cover_url, Listing.cover_variants, Listing.photos,
+        )).filter(Listing.id.in_(listing_ids)).all()
+    if resident_ids:
+        loaded += User.query.options(load_only(
+            User.id, User.first_name, User.last_name, User.email,
+        )).filter(User.id.in_(resident_ids)).all()
+    return loaded
+
+
+def serialize_bookings(bookings, lean: bool = False) -> list:
+    """
+    to_dict() for a list. Snapshotted rows need no further queries; the
+    rest get their relations bulk-loaded and each live listing card is
+    built once.
+    """
+    live = [b for b in bookings if not b.snapshot]
+    loaded = _load_live_relations(live) if live else []    # noqa: F841 — held on purpose
+
+    snapshots = {}
+    out = []
+    for b in bookings:
+        if b.snapshot:
+            out.append(b.to_dict(lean=lean))
+            continue
+        if b.listing_id not in snapshots:
+            snapshots[b.listing_id] = booking_listing_snapshot(b.listing)
+        out.append(b.to_dict(lean=lean, listing_snapshot=snapshots[b.listing_id]))
+    return out
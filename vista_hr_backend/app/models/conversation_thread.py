@@ -0,0 +1,270 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, case, func, inspect, or_
+from sqlalchemy.exc import IntegrityError
+
+from ..extensions import db
+from .message import MESSAGE_MAX_LENGTH
+
+
+class ConversationThread(db.Model):
+    """
+    One row per inbox thread: (listing, participant pair). The pair is stored
+    ordered (user_lo < user_hi) and every per-participant flag comes as a
+    *_lo / *_hi column pair, so both sides' inboxes read the same row.
+
+    Written in the same transaction as the message writes it summarizes
+    (send, read marking, delete, archive); the inbox never scans messages.
+    """
+    __tablename__ = "conversation_threads"
+
+    id         = db.Column(db.Integer, primary_key=True)
+    listing_id = db.Column(db.Integer, db.ForeignKey("listings.id", ondelete="CASCADE"), nullable=False)
+    user_lo    = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_hi    = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    # Latest message
+    last_message_id = db.Column(db.Integer, nullable=True)
+    last_sender_id  = db.Column(db.Integer, nullable=True)
+    last_text       = db.Column(db.String(MESSAGE_MAX_LENGTH), nullable=True)
+    last_at         = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    # Per participant
+    unread_lo   = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    unread_hi   = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    archived_lo = db.Column(db.Boolean, nullable=False, default=False, server_default="0")
+    archived_hi = db.Column(db.Boolean, nullable=False, default=False, server_default="0")
+    deleted_lo  = db.Column(db.Boolean, nullable=False, default=False, server_default="0")
+    deleted_hi  = db.Column(db.Boolean, nullable=False, default=False, server_default="0")
+
+    # Denormalized listing card (refreshed by sync_listing_index)
+    listing_title  = db.Column(db.String(255), nullable=True)
+    listing_meta   = db.Column(db.String(255), nullable=True)
+    listing_status = db.Column(db.String(32), nullable=True)
+    listing_cover  = db.Column(db.String(500), nullable=True)
+
+    # Bumped on every change — inbox ETags sum it
+    rev = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+    __table_args__ = (
+        db.UniqueConstraint("listing_id", "user_lo", "user_hi", name="uq_conversation_thread"),
+        db.Index("ix_threads_lo_inbox", "user_lo", "deleted_lo", "archived_lo", "last_at", "id"),
+        db.Index("ix_threads_hi_inbox", "user_hi", "deleted_hi", "archived_hi", "last_at", "id"),
+    )
+
+    def side(self, user_id) -> str:
+        return "lo" if user_id == self.user_lo else "hi"
+
+    def get(self, field, user_id):
+        return getattr(self, f"{field}_{self.side(user_id)}")
+
+    def put(self, field, user_id, value) -> None:
+        setattr(self, f"{field}_{self.side(user_id)}", value)
+
+    def other_id(self, user_id) -> int:
+        return self.user_hi if user_id == self.user_lo else self.user_lo
+
+
+def pair(a: int, b: int):
+    return (a, b) if a < b else (b, a)
+
+
+def find_thread(listing_id: int, a: int, b: int, for_update: bool = False):
+    lo, hi = pair(a, b)
+    q = ConversationThread.query.filter_by(listing_id=listing_id, user_lo=lo, user_hi=hi)
+    # A locking read also sees rows committed after this transaction's snapshot
+    return (q.with_for_update() if for_update else q).first()
+
+
+def listing_card(listing) -> dict:
+    """The listing fields the inbox shows next to each thread."""
+    from ..utils.photos import listing_cover
+
+    location = listing.location if isinstance(listing.location, dict) else {}
+    capacity = listing.capacity if isinstance(listing.capacity, dict) else {}
+    city     = location.get("city", "")
+    rent     = capacity.get("monthly_rent")
+    try:
+        rent_str = f"₱{int(rent):,}/mo" if rent else ""
+    except (TypeError, ValueError):
+        rent_str = ""
+    status = listing.status.value if hasattr(listing.status, "value") else str(listing.status)
+    return {
+        "listing_title":  listing.title or f"Listing #{listing.id}",
+        "listing_meta":   f"{city} · {rent_str}".strip(" ·") if city or rent_str else "",
+        "listing_status": status,
+        "listing_cover":  listing_cover(listing),
+    }
+
+
+def _incr(thread, column: str, n: int = 1) -> None:
+    """Add n to a counter column; stored rows get `col = col + n` (no lost updates)."""
+    if inspect(thread).persistent:
+        setattr(thread, column, getattr(ConversationThread, column) + n)
+    else:
+        setattr(thread, column, (getattr(thread, column) or 0) + n)
+
+
+def _bump_rev(thread) -> None:
+    _incr(thread, "rev")
+
+
+# =========================
+# Writes (caller commits)
+# =========================
+def record_message(msg, listing) -> ConversationThread:
+    """Fold a newly added message into its thread summary."""
+    thread = find_thread(msg.listing_id, msg.sender_id, msg.receiver_id)
+    if thread is not None:
+        # Lock and re-read: concurrent sends must compare against the latest
+        # last_message_id, or an older message could commit last and win
+        db.session.refresh(thread, with_for_update=True)
+    else:
+        lo, hi = pair(msg.sender_id, msg.receiver_id)
+        thread = ConversationThread(
+            listing_id=msg.listing_id, user_lo=lo, user_hi=hi,
+            unread_lo=0, unread_hi=0, rev=0,
+        )
+        try:
+            with db.session.begin_nested():
+                db.session.add(thread)
+        except IntegrityError:
+            # Both sides sent a first message at once — the other insert won
+            thread = find_thread(msg.listing_id, msg.sender_id, msg.receiver_id, for_update=True)
+
+    db.session.flush([msg])     # msg.id / created_at
+    if thread.last_message_id is None or msg.id > thread.last_message_id:
+        thread.last_message_id = msg.id
+        thread.last_sender_id  = msg.sender_id
+        thread.last_text       = msg.text
+        thread.last_at         = msg.created_at
+
+    # A new message brings a deleted thread back for both sides
+    thread.deleted_lo = False
+    thread.deleted_hi = False
+    _incr(thread, f"unread_{thread.side(msg.receiver_id)}")
+    for key, value in listing_card(listing).items():
+        setattr(thread, key, value)
+    _bump_rev(thread)
+    return thread
+
+
+def mark_thread_read(thread, reader_id: int) -> None:
+    if thread is not None and thread.get("unread", reader_id):
+        thread.put("unread", reader_id, 0)
+        _bump_rev(thread)
+
+
+def clear_thread(thread, user_id: int) -> None:
+    """'Delete for me' — hidden until the next message; archive state dropped."""
+    thread.put("deleted", user_id, True)
+    thread.put("archived", user_id, False)
+    thread.put("unread", user_id, 0)
+    _bump_rev(thread)
+
+
+def set_thread_archived(thread, user_id: int, archived: bool) -> None:
+    thread.put("archived", user_id, archived)
+    _bump_rev(thread)
+
+
+def refresh_listing_card(listing) -> None:
+    """Push title / meta / status / cover changes to every thread on `listing`."""
+    values = listing_card(listing)
+    values["rev"] = ConversationThread.rev + 1
+    ConversationThread.query.filter(ConversationThread.listing_id == listing.id).update(
+        values, synchronize_session=False
+    )
+
+
+# =========================
+# Reads
+# =========================
+def inbox_filter(me_id: int, archived: bool):
+    """Threads visible in my inbox (or archive) — one index range per side."""
+    T = ConversationThread
+    return or_(
+        and_(T.user_lo == me_id, T.deleted_lo == False, T.archived_lo == archived),
+        and_(T.user_hi == me_id, T.deleted_hi == False, T.archived_hi == archived),
+    )
+
+
+def other_user_column(me_id: int):
+    T = ConversationThread
+    return case((T.user_lo == me_id, T.user_hi), else_=T.user_lo)
+
+
+def unread_total(me_id: int) -> int:
+    T = ConversationThread
+    lo = db.session.query(func.coalesce(func.sum(T.unread_lo), 0)).filter(
+        T.user_lo == me_id, T.deleted_lo == False
+    ).scalar()
+    hi = db.session.query(func.coalesce(func.sum(T.unread_hi), 0)).filter(
+        T.user_hi == me_id, T.deleted_hi == False
+    ).scalar()
+    return int(lo or 0) + int(hi or 0)
+
+
+# =========================
+# Maintenance
+# =========================
+def backfill_conversation_threads() -> int:
+    """Build summary rows for message threads that have none yet. Returns rows created."""
+    from .message import Message, ArchivedConversation
+    from .listing import Listing
+
+    M = Message
+    lo = case((M.sender_id < M.receiver_id, M.sender_id), else_=M.receiver_id)
+    hi = case((M.sender_id < M.receiver_id, M.receiver_id), else_=M.sender_id)
+
+    def unread_for(user):
+        return func.sum(case((and_(M.receiver_id == user, M.is_read == False,
+                                   M.deleted_by_receiver == False), 1), else_=0))
+
+    def visible_to(user):
+        return func.sum(case((or_(and_(M.sender_id == user, M.deleted_by_sender == False),
+                                  and_(M.receiver_id == user, M.deleted_by_receiver == False)), 1), else_=0))
+
+    groups = (
+        db.session.query(M.listing_id, lo, hi, func.max(M.id),
+                         unread_for(lo), unread_for(hi), visible_to(lo), visible_to(hi))
+        .group_by(M.listing_id, lo, hi)
+        .all()
+    )
+    existing = set(db.session.query(ConversationThread.listing_id,
+                                    ConversationThread.user_lo,
+                                    ConversationThread.user_hi))
+    missing = [g for g in groups if (g[0], g[1], g[2]) not in existing]
+    if not missing:
+        return 0
+
+    last = {m.id: m for m in M.query.filter(M.id.in_([g[3] for g in missing]))}
+    listings = {l.id: l for l in Listing.query.filter(Listing.id.in_({g[0] for g in missing}))}
+    archived = {(a.user_id, a.listing_id, a.other_user_id) for a in ArchivedConversation.query}
+
+    created = 0
+    for listing_id, u_lo, u_hi, last_id, unread_lo, unread_hi, vis_lo, vis_hi in missing:
+        listing, msg = listings.get(listing_id), last.get(last_id)
+        if listing is None or msg is None:
+            continue
+        thread = ConversationThread(
+            listing_id=listing_id, user_lo=u_lo, user_hi=u_hi,
+            last_message_id=msg.id, last_sender_id=msg.sender_id,
+            last_text=msg.text, last_at=msg.created_at,
+            unread_lo=int(unread_lo or 0), unread_hi=int(unread_hi or 0),
+            deleted_lo=not vis_lo, deleted_hi=not vis_hi,
+            archived_lo=(u_lo, listing_id, u_hi) in archived,
+            archived_hi=(u_hi, listing_id, u_lo) in archived,
+            rev=1,
+            **listing_card(listing),
+        )
+        db.session.add(thread)
+        created += 1
+    db.session.commit()
+    return created
@@ -0,0 +1,249 @@
+import logging
+import time
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import Session
+
+from ..extensions import db
+from .listing import Listing
+from .user import User
+
+log = logging.getLogger(__name__)
+
+
+class Counter(db.Model):
+    """
+    Named integer counters shared by every worker (name → value).
+
+    `catalog_version` is bumped (after commit) by any write that can change
+    what the public browse endpoints return; response caches key on it.
+    """
+    __tablename__ = "counters"
+
+    name  = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+
+CATALOG_VERSION = "catalog_version"
+
+# How long a worker trusts its last read of catalog_version. Writes made in
+# this worker invalidate it immediately; other workers' writes show up
+# within this window.
+_VERSION_TTL = 1.0
+
+_memo_lock = threading.Lock()
+_memo = {"value": None, "read_at": 0.0}
+
+
+def ensure_counters(*names) -> set:
+    """Create missing counter rows (value 0). Run once at startup. Returns the names created."""
+    existing = {n for (n,) in db.session.query(Counter.name).filter(Counter.name.in_(names))}
+    created = set(names) - existing
+    for name in created:
+        db.session.add(Counter(name=name, value=0))
+    if created:
+        db.session.commit()
+    return created
+
+
+def _bump(connection, name: str, delta: int = 1) -> None:
+    table = Counter.__table__
+    res = connection.execute(
+        update(table)
+        .where(table.c.name == name)
+        .values(value=table.c.value + delta, updated_at=datetime.now(timezone.utc))
+    )
+    if res.rowcount == 0:
+        connection.execute(table.insert().values(
+            name=name, value=delta, updated_at=datetime.now(timezone.utc),
+        ))
+
+
+def catalog_version() -> int:
+    """Current catalog version (memoized per worker for _VERSION_TTL)."""
+    now = time.monotonic()
+    with _memo_lock:
+        if _memo["value"] is not None and now - _memo["read_at"] < _VERSION_TTL:
+            return _memo["value"]
+    value = db.session.query(Counter.value).filter(Counter.name == CATALOG_VERSION).scalar() or 0
+    with _memo_lock:
+        _memo["value"], _memo["read_at"] = value, now
+    return value
+
+
+def _forget_catalog_version() -> None:
+    with _memo_lock:
+        _memo["value"] = None
+
+
+# =========================
+# Write tracking
+# =========================
+# User columns that show up in catalog-versioned payloads (owner card,
+# /listings/mine owner_verified + limit) or hide listings
+_USER_PUBLIC_ATTRS = (
+    "is_active", "is_suspended", "first_name", "last_name", "avatar_url",
+    "email", "email_verified", "is_verified", "kyc_status", "phone",
+)
+
+
+def _touches_catalog(session) -> bool:
+    from .listing_index import ListingIndex
+    from .booking import Booking
+    from .review import Review
+
+    catalog_types = (Listing, ListingIndex, Booking, Review)
+    for obj in session.new:
+        if isinstance(obj, catalog_types):
+            return True
+    for obj in session.deleted:
+        if isinstance(obj, catalog_types + (User,)):
+            return True
+    for obj in session.dirty:
+        if isinstance(obj, catalog_types):
+            if session.is_modified(obj, include_collections=False):
+                return True
+        elif isinstance(obj, User):
+            attrs = inspect(obj).attrs
+            if any(attrs[a].history.has_changes() for a in _USER_PUBLIC_ATTRS):
+                return True
+    return False
+
+
+# The bump itself runs after commit in its own one-statement transaction:
+# taking the counter row inside the write's transaction would hold its lock
+# until commit and queue every catalog write behind the slowest one.
+@event.listens_for(Session, "after_flush")
+def _mark_catalog_on_flush(session, _ctx):
+    if not session.info.get("catalog_changed") and _touches_catalog(session):
+        session.info["catalog_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _catalog_committed(session):
+    if not session.info.pop("catalog_changed", False):
+        return
+    try:
+        with db.engine.begin() as conn:
+            _bump(conn, CATALOG_VERSION)
+    except Exception:
+        # Cached pages stay stale until their TTL; the write itself is committed
+        log.exception("counter: catalog_version bump failed")
+    _forget_catalog_version()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _catalog_rolled_back(session, _previous):
+    session.info.pop("catalog_changed", None)
+
+
+def bump_catalog_version() -> None:
+    """For bulk UPDATEs that bypass the unit of work (query.update()); bumps on commit."""
+    db.session.info["catalog_changed"] = True
+
+
+# =========================
+# Platform counters (landing page /public/stats)
+# =========================
+PUBLISHED_LISTINGS = "published_listings"
+OWNER_USERS        = "users_owner"
+RESIDENT_USERS     = "users_resident"
+PLATFORM_COUNTERS  = (PUBLISHED_LISTINGS, OWNER_USERS, RESIDENT_USERS)
+
+_ROLE_COUNTERS = {"OWNER": OWNER_USERS, "RESIDENT": RESIDENT_USERS}
+
+
+# Load the old value on assignment so flush-time history always has it,
+# even when the attribute was expired by an earlier commit.
+@event.listens_for(Listing.status, "set", active_history=True)
+def _listing_status_set(target, value, oldvalue, initiator):
+    return value
+
+
+@event.listens_for(User.role, "set", active_history=True)
+def _user_role_set(target, value, oldvalue, initiator):
+    return value
+
+
+def _val(v):
+    return v.value if hasattr(v, "value") else (str(v) if v is not None else None)
+
+
+def _platform_deltas(session) -> dict:
+    deltas: dict[str, int] = {}
+
+    def add(name, n):
+        if name:
+            deltas[name] = deltas.get(name, 0) + n
+
+    for obj in session.new:
+        if isinstance(obj, Listing) and _val(obj.status) == "PUBLISHED":
+            add(PUBLISHED_LISTINGS, 1)
+        elif isinstance(obj, User):
+            add(_ROLE_COUNTERS.get(_val(obj.role)), 1)
+    for obj in session.deleted:
+        if isinstance(obj, Listing) and _val(obj.status) == "PUBLISHED":
+            add(PUBLISHED_LISTINGS, -1)
+        elif isinstance(obj, User):
+            add(_ROLE_COUNTERS.get(_val(obj.role)), -1)
+    for obj in session.dirty:
+        if isinstance(obj, Listing):
+            hist = inspect(obj).attrs.status.history
+            if hist.added and hist.deleted:
+                was, now = _val(hist.deleted[0]), _val(hist.added[0])
+                if was != now and "PUBLISHED" in (was, now):
+                    add(PUBLISHED_LISTINGS, 1 if now == "PUBLISHED" else -1)
+        elif isinstance(obj, User):
+            hist = inspect(obj).attrs.role.history
+            if hist.added and hist.deleted:
+                add(_ROLE_COUNTERS.get(_val(hist.deleted[0])), -1)
+                add(_ROLE_COUNTERS.get(_val(hist.added[0])), 1)
+    return {k: v for k, v in deltas.items() if v}
+
+
+@event.listens_for(Session, "before_flush")
+def _platform_counters_on_flush(session, _ctx, _instances):
+    # before_flush: deleted rows can still be read; the UPDATEs join the
+    # same transaction as the writes they count.
+    for name, delta in _platform_deltas(session).items():
+        _bump(session.connection(), name, delta)
+
+
+def get_counters(*names) -> dict:
+    rows = db.session.query(Counter.name, Counter.value).filter(Counter.name.in_(names)).all()
+    found = dict(rows)
+    return {n: int(found.get(n) or 0) for n in names}
+
+
+def recount_platform_counters() -> None:
+    """
+    Reset the platform counters from exact COUNTs. Runs at startup only when
+    the rows were just created; otherwise it is a repair step
+    (`flask analytics recount-counters`), since a recount racing live
+    before_flush deltas can drop them.
+    """
+    from sqlalchemy import func, select
+
+    ensure_counters(*PLATFORM_COUNTERS)
+    table = Counter.__table__
+    exact = {
+        PUBLISHED_LISTINGS: select(func.count(Listing.id)).where(Listing.status == "PUBLISHED"),
+        OWNER_USERS:        select(func.count(User.id)).where(User.role == "OWNER"),
+        RESIDENT_USERS:     select(func.count(User.id)).where(User.role == "RESIDENT"),
+    }
+    for name, count_q in exact.items():
+        # One atomic statement per counter — no read-modify-write window
+        db.session.execute(
+            update(table)
+            .where(table.c.name == name)
+            .values(value=count_q.scalar_subquery(), updated_at=datetime.now(timezone.utc))
+        )
+    db.session.commit()
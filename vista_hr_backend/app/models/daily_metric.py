@@ -0,0 +1,188 @@
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from ..extensions import db
+
+
+class DailyMetric(db.Model):
+    """
+    One row per (UTC day, metric). Written by rollup_range(); read by the
+    admin time-series API so long-range charts never scan raw tables.
+    """
+    __tablename__ = "daily_metrics"
+
+    id     = db.Column(db.Integer, primary_key=True)
+    day    = db.Column(db.Date, nullable=False)
+    metric = db.Column(db.String(48), nullable=False)
+    value  = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
+    computed_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+    __table_args__ = (
+        db.UniqueConstraint("day", "metric", name="uq_daily_metric"),
+        db.Index("ix_daily_metrics_metric_day", "metric", "day"),
+    )
+
+
+# Rent-bearing booking states (same rule as /admin/analytics revenue)
+REVENUE_STATUSES = ("APPROVED", "ACTIVE", "COMPLETED")
+
+# Metric catalogue — the series API only accepts these names
+METRICS = (
+    "users_new_owner", "users_new_resident", "users_new_admin",
+    "listings_new", "listings_published",
+    "bookings_new", "bookings_pending", "bookings_approved", "bookings_active",
+    "bookings_completed", "bookings_cancelled", "bookings_rejected",
+    "revenue_estimate",
+    "messages_sent",
+)
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _val(v):
+    return v.value if hasattr(v, "value") else str(v or "")
+
+
+def _by_day(col, start, end, *group, where=None):
+    """GROUP BY DATE(col)[, *group] over [start, end] → rows (day, *group, n)."""
+    day = func.date(col)
+    q = (
+        db.session.query(day, *group, func.count())
+        .filter(col >= datetime.combine(start, datetime.min.time()))
+        .filter(col < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+        .group_by(day, *group)
+    )
+    if where is not None:
+        q = q.filter(where)
+    return q.all()
+
+
+def compute_range(start: date, end: date) -> dict:
+    """{(day, metric): value} for every day in [start, end], zeros included."""
+    from .user import User
+    from .listing import Listing
+    from .listing_index import ListingIndex
+    from .booking import Booking
+    from .message import Message
+
+    out = {}
+    d = start
+    while d <= end:
+        for m in METRICS:
+            if m != "listings_published":
+                out[(d, m)] = 0
+        d += timedelta(days=1)
+
+    for day, role, n in _by_day(User.created_at, start, end, User.role):
+        out[(_as_date(day), f"users_new_{_val(role).lower()}")] = int(n)
+
+    for day, n in _by_day(Listing.created_at, start, end):
+        out[(_as_date(day), "listings_new")] = int(n)
+
+    for day, status, n in _by_day(Booking.created_at, start, end, Booking.status):
+        day = _as_date(day)
+        key = (day, f"bookings_{_val(status).lower()}")
+        if key[1] in METRICS:
+            out[key] = int(n)
+        out[(day, "bookings_new")] += int(n)
+
+    bday = func.date(Booking.created_at)
+    revenue = (
+        db.session.query(bday, func.coalesce(func.sum(ListingIndex.monthly_rent), 0))
+        .join(ListingIndex, ListingIndex.listing_id == Booking.listing_id)
+        .filter(Booking.status.in_(REVENUE_STATUSES))
+        .filter(Booking.created_at >= datetime.combine(start, datetime.min.time()))
+        .filter(Booking.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+        .group_by(bday)
+        .all()
+    )
+    for day, total in revenue:
+        out[(_as_date(day), "revenue_estimate")] = int(total or 0)
+
+    for day, n in _by_day(Message.created_at, start, end):
+        out[(_as_date(day), "messages_sent")] = int(n)
+
+    # listings_published is a point-in-time stock with no history to rebuild
+    # from, so it is only recorded for the day(s) being closed right now.
+    today = datetime.now(timezone.utc).date()
+    if end >= today - timedelta(days=1):
+        published = Listing.query.filter(Listing.status == "PUBLISHED").count()
+        for d in (today - timedelta(days=1), today):
+            if start <= d <= end:
+                out[(d, "listings_published")] = published
+    return out
+
+
+def rollup_range(start: date, end: date) -> int:
+    """
+    Recompute and store [start, end]. Idempotent: existing rows for those
+    days are replaced (listings_published history is never overwritten by
+    an older backfill). Returns rows written.
+    """
+    values = compute_range(start, end)
+    metrics = sorted({m for _, m in values})
+    (
+        DailyMetric.query
+        .filter(DailyMetric.day >= start, DailyMetric.day <= end)
+        .filter(DailyMetric.metric.in_(metrics))
+        .delete(synchronize_session=False)
+    )
+    now = datetime.now(timezone.utc)
+    db.session.add_all([
+        DailyMetric(day=d, metric=m, value=v, computed_at=now)
+        for (d, m), v in values.items()
+    ])
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker rolled up the same days concurrently — theirs stands
+        db.session.rollback()
+        return 0
+    return len(values)
+
+
+def ensure_rollups(until: date = None) -> int:
+    """
+    Roll up every closed day after the last stored one (up to `until`).
+    Scheduled job (run.py) — the first run backfills the whole history.
+    """
+    until = until or (datetime.now(timezone.utc).date() - timedelta(days=1))
+    last = db.session.query(func.max(DailyMetric.day)).scalar()
+    if last is None:
+        return backfill_daily_metrics(until=until)
+    last = _as_date(last)
+    if last >= until:
+        return 0
+    return rollup_range(last + timedelta(days=1), until)
+
+
+def backfill_daily_metrics(since: date = None, until: date = None) -> int:
+    """Roll up from `since` (default: first user signup) through `until`."""
+    from .user import User
+
+    until = until or (datetime.now(timezone.utc).date() - timedelta(days=1))
+    if since is None:
+        first = db.session.query(func.min(User.created_at)).scalar()
+        if first is None:
+            return 0
+        since = _as_date(first)
+    total = 0
+    # Month-sized chunks keep each transaction small
+    start = since
+    while start <= until:
+        end = min(start + timedelta(days=30), until)
+        total += rollup_range(start, end)
+        start = end + timedelta(days=1)
+    return total
@@ -38,6 +38,8 @@ class Listing(db.Model):
     highlights = db.Column(db.JSON, nullable=True)          # Step 6
     photos = db.Column(db.JSON, nullable=True)              # Step 7 regular photos
     virtual_tour = db.Column(db.JSON, nullable=True)        # Step 7 optional 360 tour
+    cover_url = db.Column(db.String(500), nullable=True)    # Step 7 canonical cover (utils/photos.py)
+    cover_variants = db.Column(db.JSON, nullable=True)      # {"sm", "md", "lg"} Cloudinary URLs
 
     title = db.Column(db.String(120), nullable=True)        # Step 8
     description = db.Column(db.Text, nullable=True)
@@ -70,6 +72,8 @@ class Listing(db.Model):
             "amenities": self.amenities,
             "highlights": self.highlights,
             "photos": self.photos,
+            "cover_url": self.cover_url,
+            "cover_variants": self.cover_variants,
             "virtualTour": self.virtual_tour or {
                 "enabled": False,
                 "panoUrl": "",
@@ -80,4 +84,36 @@ class Listing(db.Model):
             "student_discount": self.student_discount,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
\ No newline at end of file
+        }
+
+def backfill_listing_covers(batch: int = 500) -> int:
+    """
+    Store cover_url / cover_variants for listings saved before step 7 did,
+    so readers stop falling back to the photos JSON. A Core UPDATE keeps
+    updated_at as it was. Returns rows filled.
+    """
+    from ..utils.photos import cover_variants, pick_cover
+
+    done, last_id = 0, 0
+    while True:
+        rows = (
+            db.session.query(Listing.id, Listing.photos)
+            .filter(Listing.cover_url.is_(None), Listing.id > last_id)
+            .order_by(Listing.id)
+            .limit(batch)
+            .all()
+        )
+        if not rows:
+            return done
+        last_id = rows[-1].id
+        for row in rows:
+            url = pick_cover(row.photos)
+            if not url:
+                continue    # no photos yet; step 7 fills it on save
+            db.session.execute(
+                db.update(Listing)
+                .where(Listing.id == row.id)
+                .values(cover_url=url, cover_variants=cover_variants(url), updated_at=Listing.updated_at)
+            )
+            done += 1
+        db.session.commit()
@@ -0,0 +1,252 @@
+from sqlalchemy import func
+
+from ..extensions import db
+
+
+class ListingIndex(db.Model):
+    """
+    Flat, indexed projection of a listing used by the resident feed.
+
+    One row per listing. The wizard keeps location/capacity/photos as JSON
+    blobs on `listings`, which can't be filtered or sorted in SQL — this table
+    copies out the few scalar fields the feed needs so every filter, the sort
+    and the LIMIT run inside the database.
+
+    Kept in sync by sync_listing_index() on every listing write and by
+    sync_owner_listings() whenever an owner's active/suspended state changes.
+    """
+    __tablename__ = "listing_index"
+
+    listing_id = db.Column(
+        db.Integer,
+        db.ForeignKey("listings.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    owner_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    status = db.Column(db.String(20), nullable=False, default="DRAFT")
+
+    # Normalized (lowercase) filter columns — display values stay in listings.location
+    city       = db.Column(db.String(120), nullable=True)
+    barangay   = db.Column(db.String(120), nullable=True)
+    place_type = db.Column(db.String(30),  nullable=True)
+
+    # Display forms, for card views that skip the JSON blobs
+    city_label     = db.Column(db.String(120), nullable=True)
+    barangay_label = db.Column(db.String(120), nullable=True)
+
+    monthly_rent     = db.Column(db.Integer,      nullable=True)
+    guests           = db.Column(db.SmallInteger, nullable=True)
+    student_discount = db.Column(db.SmallInteger, nullable=True)
+    cover_url        = db.Column(db.String(500),  nullable=True)
+    cover_thumb      = db.Column(db.String(500),  nullable=True)
+
+    # Pin from the step-3 map (location.lat/lng) + its geohash cell
+    lat     = db.Column(db.Float,      nullable=True)
+    lng     = db.Column(db.Float,      nullable=True)
+    geohash = db.Column(db.String(12), nullable=True)
+
+    # Wizard completeness (is_listing_complete), stored so dashboards don't
+    # re-walk the JSON blobs
+    is_complete = db.Column(db.Boolean, nullable=False, default=False, server_default="0")
+
+    # Owner flags — False hides the listing from the feed
+    owner_active = db.Column(db.Boolean, nullable=False, default=True, server_default="1")
+
+    # Mirror of listings.updated_at (feed sort key)
+    updated_at = db.Column(db.DateTime, nullable=True)
+
+    # DB-clock time and count of sync_listing_index / sync_owner_listings
+    # writes — the search index's change cursor (utils/search.py). Both are
+    # row-local, so writers to different listings never wait on each other.
+    # NULL for rows untouched since the columns were added.
+    synced_at = db.Column(db.DateTime,   nullable=True)
+    revision  = db.Column(db.BigInteger, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_listing_index_feed",  "status", "owner_active", "updated_at", "listing_id"),
+        db.Index("ix_listing_index_city",  "status", "city", "updated_at"),
+        db.Index("ix_listing_index_type",  "status", "place_type", "updated_at"),
+        db.Index("ix_listing_index_price", "status", "monthly_rent"),
+        db.Index("ix_listing_index_updated", "updated_at", "listing_id"),
+        db.Index("ix_listing_index_admin", "status", "updated_at", "listing_id"),
+        db.Index("ix_listing_index_geo",   "status", "geohash"),
+        db.Index("ix_listing_index_owner", "owner_id", "status"),
+        db.Index("ix_listing_index_synced", "synced_at", "listing_id", "revision"),
+    )
+
+
+# =========================
+# Normalization helpers
+# =========================
+def normalize_city(value) -> str:
+    """'City of Makati' / 'Makati City' / ' makati ' → search key."""
+    s = str(value or "").strip().lower()
+    if s.startswith("city of "):
+        s = s[len("city of "):].strip()
+    return s
+
+
+def extract_rent(capacity):
+    """monthly_rent with legacy 'price' fallback, as an int (or None)."""
+    cap = capacity if isinstance(capacity, dict) else {}
+    raw = cap.get("monthly_rent") or cap.get("price")
+    try:
+        rent = int(raw)
+    except (TypeError, ValueError):
+        return None
+    return rent if rent > 0 else None
+
+
+def extract_coords(location):
+    """(lat, lng) pinned in the step-3 location JSON, or (None, None)."""
+    from ..utils.geo import parse_coord
+
+    loc = location if isinstance(location, dict) else {}
+    coords = parse_coord(loc.get("lat"), loc.get("lng"))
+    return coords if coords else (None, None)
+
+
+def is_listing_complete(listing) -> bool:
+    # minimal completion rule (matches your step requirements)
+    # NOTE: backend is truth; you can extend later.
+    if not listing.place_type:
+        return False
+    if not listing.space_type:
+        return False
+
+    loc = listing.location or {}
+    if not (loc.get("street") and loc.get("city") and loc.get("zip")):
+        return False
+
+    cap = listing.capacity or {}
+    try:
+        guests = int(cap.get("guests", 0))
+    except Exception:
+        guests = 0
+    if guests < 1:
+        return False
+
+    amenities = listing.amenities or {}
+    a = amenities.get("appliances") or []
+    b = amenities.get("activities") or []
+    c = amenities.get("safety") or []
+    if (len(a) + len(b) + len(c)) < 1:
+        return False
+
+    highlights = listing.highlights or []
+    if len(highlights) < 1:
+        return False
+
+    photos = listing.photos or []
+    if not isinstance(photos, list) or len(photos) < 5:
+        return False
+
+    if not listing.title or len(listing.title.strip()) < 3:
+        return False
+    if not listing.description or len(listing.description.strip()) < 10:
+        return False
+
+    return True
+
+
+def _owner_active(owner) -> bool:
+    if owner is None:
+        return False
+    return bool(getattr(owner, "is_active", True)) and not bool(getattr(owner, "is_suspended", False))
+
+
+# =========================
+# Maintenance
+# =========================
+def _next_revision():
+    return func.coalesce(ListingIndex.revision, 0) + 1
+
+
+def sync_listing_index(listing, owner=None) -> None:
+    """
+    Upsert the projection row for `listing` inside the current transaction.
+    Call right before the handler commits; the caller's commit persists both.
+    """
+    from .user import User
+    from ..utils.geo import encode_geohash
+    from ..utils.photos import listing_cover
+
+    # Flush so listings.updated_at (onupdate) is populated before we mirror it
+    db.session.flush()
+
+    if owner is None:
+        owner = db.session.get(User, listing.owner_id)
+
+    row = db.session.get(ListingIndex, listing.id)
+    if row is None:
+        row = ListingIndex(listing_id=listing.id, revision=1)
+        db.session.add(row)
+    else:
+        row.revision = _next_revision()
+
+    loc = listing.location if isinstance(listing.location, dict) else {}
+    cap = listing.capacity if isinstance(listing.capacity, dict) else {}
+    try:
+        guests = int(cap.get("guests") or 0) or None
+    except (TypeError, ValueError):
+        guests = None
+
+    lat, lng = extract_coords(loc)
+
+    status = listing.status.value if hasattr(listing.status, "value") else str(listing.status or "DRAFT")
+
+    row.owner_id         = listing.owner_id
+    row.status           = status
+    row.city             = normalize_city(loc.get("city")) or None
+    row.barangay         = str(loc.get("barangay") or "").strip().lower() or None
+    row.city_label       = str(loc.get("city") or "").strip() or None
+    row.barangay_label   = str(loc.get("barangay") or "").strip() or None
+    row.place_type       = str(listing.place_type or "").strip().lower() or None
+    row.monthly_rent     = extract_rent(cap)
+    row.guests           = guests
+    row.student_discount = listing.student_discount
+    row.cover_url        = listing_cover(listing)
+    row.cover_thumb      = listing_cover(listing, "sm")
+    row.lat              = lat
+    row.lng              = lng
+    row.geohash          = encode_geohash(lat, lng) if lat is not None else None
+    row.is_complete      = is_listing_complete(listing)
+    row.owner_active     = _owner_active(owner)
+    row.updated_at       = listing.updated_at
+    row.synced_at        = func.now()
+
+    # Inbox threads carry a copy of the listing card
+    from .conversation_thread import refresh_listing_card
+    refresh_listing_card(listing)
+
+
+def sync_owner_listings(owner) -> None:
+    """Refresh owner flags on every indexed listing of `owner` (set-based UPDATE)."""
+    ListingIndex.query.filter(ListingIndex.owner_id == owner.id).update(
+        {"owner_active": _owner_active(owner), "synced_at": func.now(), "revision": _next_revision()},
+        synchronize_session=False,
+    )
+
+
+def backfill_listing_index() -> int:
+    """Index listings that have no projection row yet. Returns rows created."""
+    from .listing import Listing
+    from .user import User
+
+    missing = (
+        db.session.query(Listing, User)
+        .join(User, User.id == Listing.owner_id)
+        .outerjoin(ListingIndex, ListingIndex.listing_id == Listing.id)
+        .filter(ListingIndex.listing_id.is_(None))
+        .all()
+    )
+    for listing, owner in missing:
+        sync_listing_index(listing, owner=owner)
+    if missing:
+        db.session.commit()
+    return len(missing)
@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+
+from ..extensions import db
+
+
+class RealtimeEvent(db.Model):
+    """
+    Cross-worker mailbox for the `db` realtime backend: every worker appends
+    the events it publishes and polls for rows written by the others. Rows
+    are only needed for a few seconds and are pruned by the pollers.
+    """
+    __tablename__ = "realtime_events"
+
+    id      = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    origin  = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    created_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        index=True,
+    )
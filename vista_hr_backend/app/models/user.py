@@ -8,6 +8,10 @@ KYC_STATUS = ("NONE", "PENDING", "APPROVED", "REJECTED")
 
 class User(db.Model):
     __tablename__ = "users"
+    __table_args__ = (
+        # Admin console: filtered, newest-first user pages and the overview counts
+        db.Index("ix_users_active_role_created", "is_active", "role", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
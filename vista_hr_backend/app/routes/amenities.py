@@ -24,7 +24,7 @@ from ..extensions import db
 from ..models.amenity import Amenity
 from ..auth.jwt import require_role
 from ..utils.errors import json_error
-from .notifications import create_notification
+from ..utils.notify import notify_many
 from ..models.user import User
 
 amenities_bp = Blueprint("amenities", __name__)
@@ -156,23 +156,22 @@ def create_custom_amenity():
     )
     db.session.add(amenity)
 
+    # Notify all admins about the new custom amenity — one INSERT for all of them
+    admin_ids = [uid for (uid,) in db.session.query(User.id).filter(User.role == "ADMIN")]
+    owner_name = f"{me.first_name or ''} {me.last_name or ''}".strip() or me.email
+    notify_many(
+        admin_ids,
+        notif_type = "NEW_CUSTOM_AMENITY",
+        title      = f"New custom amenity submitted",
+        body       = f'{owner_name} added "{label}" — review to apply system-wide.',
+    )
+
     try:
         db.session.commit()
     except Exception:
         db.session.rollback()
         return json_error("Database error", 500)
 
-    # Notify all admins about the new custom amenity
-    admins = User.query.filter_by(role="ADMIN").all()
-    owner_name = f"{me.first_name or ''} {me.last_name or ''}".strip() or me.email
-    for admin in admins:
-        create_notification(
-            user_id    = admin.id,
-            notif_type = "NEW_CUSTOM_AMENITY",
-            title      = f"New custom amenity submitted",
-            body       = f'{owner_name} added "{label}" — review to apply system-wide.',
-        )
-
     return jsonify({
         "message": "Created — usable immediately. Pending admin review for system-wide.",
         "amenity": amenity.to_dict()
@@ -215,23 +214,22 @@ def create_custom_highlight():
     )
     db.session.add(hl)
 
+    # Notify admins — one INSERT for all of them
+    admin_ids = [uid for (uid,) in db.session.query(User.id).filter(User.role == "ADMIN")]
+    owner_name = f"{me.first_name or ''} {me.last_name or ''}".strip() or me.email
+    notify_many(
+        admin_ids,
+        notif_type = "NEW_CUSTOM_AMENITY",
+        title      = f"New custom highlight submitted",
+        body       = f'{owner_name} added "{label}" — review to apply system-wide.',
+    )
+
     try:
         db.session.commit()
     except Exception:
         db.session.rollback()
         return json_error("Database error", 500)
 
-    # Notify admins
-    admins = User.query.filter_by(role="ADMIN").all()
-    owner_name = f"{me.first_name or ''} {me.last_name or ''}".strip() or me.email
-    for admin in admins:
-        create_notification(
-            user_id    = admin.id,
-            notif_type = "NEW_CUSTOM_AMENITY",
-            title      = f"New custom highlight submitted",
-            body       = f'{owner_name} added "{label}" — review to apply system-wide.',
-        )
-
     return jsonify({
         "message": "Created — usable immediately. Pending admin review for system-wide.",
         "highlight": hl.to_dict()
@@ -1,15 +1,24 @@
 """
 app/routes/analytics.py
 -----------------------
-Admin-only analytics. Simplified for capstone demo.
+Admin-only analytics. Every figure is a GROUP BY / SUM in SQL — no table
+is loaded into Python.
 """
 from __future__ import annotations
-from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 
-from flask import Blueprint, jsonify
+import click
+from flask import Blueprint, jsonify, request
+from sqlalchemy import func
+
+from ..extensions import db
 from ..auth.jwt import require_role
-from ..models import User, Listing, Booking
+from ..models import User, Listing, Booking, ListingIndex
+from ..models.daily_metric import (
+    METRICS, DailyMetric, backfill_daily_metrics, compute_range, rollup_range,
+)
+from ..utils.cache import TTLCache
+from ..utils.errors import json_error
 
 analytics_bp = Blueprint("analytics", __name__)
 
@@ -18,55 +27,79 @@ def _val(v):
     return v.value if hasattr(v, "value") else str(v or "")
 
 
-@analytics_bp.get("/admin/analytics")
-@require_role("ADMIN")
-def get_analytics():
-    now = datetime.now(timezone.utc)
-    thirty_ago = now - timedelta(days=30)
+# Whole payload cached per 60s time bucket — the dashboard is a snapshot,
+# and admins refreshing it shouldn't each re-run the aggregates.
+_ANALYTICS_BUCKET = 60
+_analytics_cache = TTLCache(maxsize=4, ttl=_ANALYTICS_BUCKET)
+
 
-    users    = User.query.all()
-    listings = Listing.query.all()
-    bookings = Booking.query.all()
+def _grouped(*cols, where=None):
+    """{group value: count} for a GROUP BY over cols[0]'s table."""
+    q = db.session.query(cols[0], func.count()).group_by(cols[0])
+    if where is not None:
+        q = q.filter(where)
+    return {_val(k): int(n) for k, n in q.all()}
+
+
+def _daily_totals(metrics, start, end) -> dict:
+    """
+    {"YYYY-MM-DD": sum of metrics} from rollups, with today computed live.
+    Read-only: closed days are rolled up by the "daily_rollups" job (run.py).
+    """
+    today = datetime.now(timezone.utc).date()
+    rows = (
+        db.session.query(DailyMetric.day, func.sum(DailyMetric.value))
+        .filter(DailyMetric.metric.in_(metrics))
+        .filter(DailyMetric.day >= start, DailyMetric.day <= min(end, today - timedelta(days=1)))
+        .group_by(DailyMetric.day)
+        .all()
+    )
+    out = {str(d)[:10]: int(v or 0) for d, v in rows}
+    if start <= today <= end:
+        live = compute_range(today, today)
+        out[today.isoformat()] = sum(live.get((today, m), 0) for m in metrics)
+    return out
+
+
+def _build_analytics(now):
+    window_start = now - timedelta(days=29)
 
     # ── Users ──
-    role_c = defaultdict(int)
-    kyc_c  = defaultdict(int)
-    stu_c  = defaultdict(int)
-    for u in users:
-        r = _val(u.role)
-        role_c[r] += 1
-        if r == "OWNER":    kyc_c[_val(u.kyc_status)] += 1
-        if r == "RESIDENT": stu_c[_val(u.student_status)] += 1
+    role_c = _grouped(User.role)
+    kyc_c  = _grouped(User.kyc_status,     where=User.role == "OWNER")
+    stu_c  = _grouped(User.student_status, where=User.role == "RESIDENT")
 
     # ── Listings ──
-    lst_status = defaultdict(int)
-    lst_type   = defaultdict(int)
-    city_c     = defaultdict(int)
-    for l in listings:
-        lst_status[l.status or "DRAFT"] += 1
-        lst_type[l.place_type or "Other"] += 1
-        city = ((l.location or {}).get("city") or "").strip()
-        if city: city_c[city] += 1
-
-    top_cities = sorted(city_c.items(), key=lambda x: x[1], reverse=True)[:6]
+    lst_status = _grouped(Listing.status)
+    lst_type = {
+        (k or "Other"): int(n)
+        for k, n in db.session.query(Listing.place_type, func.count()).group_by(Listing.place_type).all()
+    }
+    city_n = func.count(ListingIndex.listing_id)
+    top_cities = (
+        db.session.query(ListingIndex.city_label, city_n)
+        .filter(ListingIndex.city_label.isnot(None), ListingIndex.city_label != "")
+        .group_by(ListingIndex.city_label)
+        .order_by(city_n.desc())
+        .limit(6)
+        .all()
+    )
 
     # ── Bookings ──
-    bk_status = defaultdict(int)
-    revenue = 0
-    for b in bookings:
-        bk_status[b.status or "PENDING"] += 1
-        if b.status in ("APPROVED", "ACTIVE", "COMPLETED") and b.listing:
-            try: revenue += int((b.listing.capacity or {}).get("monthly_rent") or 0)
-            except: pass
-
-    # ── User growth (last 30 days) ──
-    growth = defaultdict(int)
-    for u in users:
-        ts = u.created_at
-        if not ts: continue
-        if ts.tzinfo is None: ts = ts.replace(tzinfo=timezone.utc)
-        if ts >= thirty_ago:
-            growth[ts.strftime("%Y-%m-%d")] += 1
+    bk_status = _grouped(Booking.status)
+    revenue = (
+        db.session.query(func.coalesce(func.sum(ListingIndex.monthly_rent), 0))
+        .select_from(Booking)
+        .join(ListingIndex, ListingIndex.listing_id == Booking.listing_id)
+        .filter(Booking.status.in_(["APPROVED", "ACTIVE", "COMPLETED"]))
+        .scalar()
+    )
+
+    # ── User growth (last 30 days) — closed days from daily_metrics ──
+    growth = _daily_totals(
+        ("users_new_owner", "users_new_resident", "users_new_admin"),
+        window_start.date(), now.date(),
+    )
 
     g_labels, g_values = [], []
     for i in range(29, -1, -1):
@@ -75,33 +108,39 @@ def get_analytics():
         g_values.append(growth.get(d.strftime("%Y-%m-%d"), 0))
 
     # ── Recent bookings ──
-    recent = sorted(bookings, key=lambda b: b.created_at or datetime.min, reverse=True)[:10]
+    recent = (
+        db.session.query(
+            Booking.id, Booking.status, Booking.move_in_date, Booking.created_at,
+            Listing.title, User.first_name, User.last_name, User.email,
+        )
+        .outerjoin(Listing, Listing.id == Booking.listing_id)
+        .outerjoin(User, User.id == Booking.resident_id)
+        .order_by(Booking.created_at.desc())
+        .limit(10)
+        .all()
+    )
     recent_list = []
     for b in recent:
-        lst = b.listing
-        res = b.resident
-        name = ""
-        if res:
-            name = f"{res.first_name or ''} {res.last_name or ''}".strip() or res.email
+        name = f"{b.first_name or ''} {b.last_name or ''}".strip() or (b.email or "")
         recent_list.append({
             "id": b.id,
             "status": b.status,
-            "listing_title": lst.title if lst else "—",
+            "listing_title": b.title if b.title is not None else "—",
             "resident_name": name or "—",
             "move_in_date": b.move_in_date.isoformat() if b.move_in_date else None,
             "created_at": b.created_at.isoformat() if b.created_at else None,
         })
 
-    return jsonify({
+    return {
         "summary": {
-            "total_users":        len(users),
+            "total_users":        sum(role_c.values()),
             "total_owners":       role_c.get("OWNER", 0),
             "total_residents":    role_c.get("RESIDENT", 0),
             "published_listings": lst_status.get("PUBLISHED", 0),
-            "total_listings":     len(listings),
-            "total_bookings":     len(bookings),
+            "total_listings":     sum(lst_status.values()),
+            "total_bookings":     sum(bk_status.values()),
             "pending_bookings":   bk_status.get("PENDING", 0),
-            "revenue_estimate":   revenue,
+            "revenue_estimate":   int(revenue or 0),
         },
         "booking_funnel": {
             "labels": ["Pending","Approved","Active","Completed","Rejected","Cancelled"],
@@ -125,7 +164,142 @@ def get_analytics():
         },
         "top_cities": {
             "labels": [c[0] for c in top_cities],
-            "values": [c[1] for c in top_cities],
+            "values": [int(c[1]) for c in top_cities],
         },
         "recent_bookings": recent_list,
-    }), 200
\ No newline at end of file
+    }
+
+
+@analytics_bp.get("/admin/analytics")
+@require_role("ADMIN")
+def get_analytics():
+    now = datetime.now(timezone.utc)
+    bucket = int(now.timestamp()) // _ANALYTICS_BUCKET
+
+    data = _analytics_cache.get(bucket)
+    if data is None:
+        data = _build_analytics(now)
+        _analytics_cache.set(bucket, data)
+    return jsonify({**data, "generated_bucket": bucket * _ANALYTICS_BUCKET}), 200
+
+# ══════════════════════════════════════════════════════════════
+# Time series from daily_metrics rollups
+# ══════════════════════════════════════════════════════════════
+_RANGES = {"7d": 7, "30d": 30, "90d": 90, "365d": 365}
+_MAX_RANGE_DAYS = 400
+
+
+@analytics_bp.get("/admin/analytics/series")
+@require_role("ADMIN")
+def get_analytics_series():
+    """
+    ?range=7d|30d|90d|365d  (or ?start=YYYY-MM-DD&end=YYYY-MM-DD)
+    &metrics=users_new_owner,bookings_new,...   (default: all)
+    Closed days come from daily_metrics; today is computed live.
+    """
+    today = datetime.now(timezone.utc).date()
+    fields = {}
+
+    raw_metrics = (request.args.get("metrics") or "").strip()
+    metrics = [m.strip() for m in raw_metrics.split(",") if m.strip()] or list(METRICS)
+    unknown = [m for m in metrics if m not in METRICS]
+    if unknown:
+        fields["metrics"] = "Unknown metric(s): " + ", ".join(unknown)
+
+    start = end = None
+    if request.args.get("start") or request.args.get("end"):
+        try:
+            start = datetime.strptime(request.args.get("start", ""), "%Y-%m-%d").date()
+            end = datetime.strptime(request.args.get("end") or today.isoformat(), "%Y-%m-%d").date()
+        except ValueError:
+            fields["start"] = "start/end must be YYYY-MM-DD."
+        else:
+            if start > end or (end - start).days >= _MAX_RANGE_DAYS:
+                fields["start"] = f"Range must be 1-{_MAX_RANGE_DAYS} days."
+    else:
+        days = _RANGES.get((request.args.get("range") or "30d").lower())
+        if not days:
+            fields["range"] = "range must be one of " + ", ".join(_RANGES)
+        else:
+            end = today
+            start = today - timedelta(days=days - 1)
+    if fields:
+        return json_error("Validation failed", 400, fields=fields)
+
+    rows = (
+        db.session.query(DailyMetric.day, DailyMetric.metric, DailyMetric.value)
+        .filter(DailyMetric.metric.in_(metrics))
+        .filter(DailyMetric.day >= start, DailyMetric.day <= min(end, today - timedelta(days=1)))
+        .all()
+    )
+    stored = {(str(d)[:10], m): int(v) for d, m, v in rows}
+    if start <= today <= end:
+        for (d, m), v in compute_range(today, today).items():
+            stored[(d.isoformat(), m)] = v
+
+    labels = []
+    d = start
+    while d <= end:
+        labels.append(d.isoformat())
+        d += timedelta(days=1)
+
+    return jsonify({
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "labels": labels,
+        # None = not recorded (e.g. listings_published before rollups began)
+        "series": {m: [stored.get((day, m)) for day in labels] for m in metrics},
+    }), 200
+
+
+@analytics_bp.cli.command("rollup")
+@click.option("--since", help="First day to (re)compute, YYYY-MM-DD. Default: first signup.")
+@click.option("--days", type=int, help="Recompute only the last N closed days.")
+def rollup_command(since, days):
+    """Backfill / refresh daily_metrics. Safe to re-run."""
+    yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+    if days:
+        written = rollup_range(yesterday - timedelta(days=days - 1), yesterday)
+    else:
+        start = datetime.strptime(since, "%Y-%m-%d").date() if since else None
+        written = backfill_daily_metrics(since=start, until=yesterday)
+    click.echo(f"daily_metrics: {written} rows written")
+
+
+@analytics_bp.cli.command("recount-counters")
+def recount_counters_command():
+    """Reset the platform counters from exact COUNTs. Run when traffic is quiet."""
+    from ..models.counter import PLATFORM_COUNTERS, get_counters, recount_platform_counters
+
+    recount_platform_counters()
+    for name, value in get_counters(*PLATFORM_COUNTERS).items():
+        click.echo(f"{name}: {value}")
+
+
+@analytics_bp.get("/admin/presence")
+@require_role("ADMIN")
+def get_presence():
+    """Users active in the last ?window= seconds (default 15 min), from memory."""
+    from ..utils.presence import ACTIVE_WINDOW, active_now
+
+    window = min(max(request.args.get("window", ACTIVE_WINDOW, type=int), 60), 24 * 3600)
+    return jsonify(active_now(window)), 200
+
+
+@analytics_bp.get("/admin/cache-stats")
+@require_role("ADMIN")
+def get_cache_stats():
+    """Hit/miss counters of this worker's public response cache."""
+    from ..models.counter import catalog_version
+    from ..utils.cache import response_cache
+    from ..utils.realtime import backend_name, broker
+    from ..utils.receipts import receipt_cache
+    from ..utils.scheduler import scheduler
+
+    return jsonify({
+        "catalog_version": catalog_version(),
+        "response_cache": response_cache.stats(),
+        "receipt_cache": receipt_cache.stats(),
+        "realtime": {"backend": backend_name(), **broker.stats()},
+        "scheduler": scheduler.stats(),
+    }), 200
@@ -9,6 +9,7 @@ from authlib.integrations.flask_client import OAuth
 
 from ..extensions import db
 from ..models import User
+from ..models.listing_index import sync_owner_listings
 from ..auth.jwt import create_access_token, require_auth, COOKIE_NAME
 from ..utils.errors import json_error
 from werkzeug.security import generate_password_hash
@@ -190,7 +191,9 @@ def login():
                 # Auto-lift — suspension period ended
                 user.is_suspended    = False
                 user.suspended_until = None
-                try: db.session.commit()
+                try:
+                    sync_owner_listings(user)
+                    db.session.commit()
                 except: db.session.rollback()
                 # Fall through — allow login
             else:
@@ -206,6 +209,8 @@ def login():
 
     # Allow login even if email not verified — actions are gated per role on dashboard
     user.last_login_at = datetime.now(timezone.utc)
+    if was_reactivated:
+        sync_owner_listings(user)
     db.session.commit()
     token = create_access_token(user)
     resp = jsonify({"message": "Logged in", "user": user.to_dict()})
@@ -698,6 +703,7 @@ def google_callback():
     # ── STEP 1b: Reactivate deactivated Google user on re-login ──
     if user and not getattr(user, "is_active", True):
         user.is_active = True
+        sync_owner_listings(user)
         db.session.commit()
 
     # ── STEP 2: Link Google to existing email account ──
@@ -710,6 +716,7 @@ def google_callback():
             # Deactivated email-account? Reactivate on Google link.
             if not getattr(user, "is_active", True):
                 user.is_active = True
+                sync_owner_listings(user)
 
             user.google_id = google_id
             user.avatar_url_google = picture
@@ -1,17 +1,24 @@
 from __future__ import annotations
 
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, Response, request, jsonify, g, send_file
 from sqlalchemy.exc import SQLAlchemyError
 
 from ..extensions import db
 from ..models import Listing, Booking
+from ..models.booking import build_booking_snapshot, serialize_bookings
 from ..models.user import User
 from ..auth.jwt import require_role, require_auth
 from ..utils.errors import json_error
+from ..utils.etag import conditional
+from ..utils.receipts import (
+    FORMATS as RECEIPT_FORMATS, cache_key as receipt_cache_key, receipt,
+    export_status as receipt_export_status, reference as receipt_reference,
+    start_export as start_receipt_export,
+)
 
-from ..routes.notifications import create_notification
+from ..utils.notify import notify
 
 bookings_bp = Blueprint("bookings", __name__)
 
@@ -20,83 +27,19 @@ LIVE_STATUSES    = ("PENDING", "APPROVED", "VIEWING_SCHEDULED", "VIEWING_DECLINE
 RECEIPT_STATUSES = ("APPROVED", "VIEWING_SCHEDULED", "VIEWING_DECLINED", "ACTIVE", "COMPLETED", "MOVED_OUT")
 VIEWING_COOLDOWN_DAYS = 1   # days before resident can rebook after declining
 
-AUTO_CANCEL_PENDING_DAYS  = 3   # PENDING → CANCELLED after 3 days
-AUTO_CANCEL_APPROVED_DAYS = 3   # APPROVED → CANCELLED if no viewing set after 3 days
+# Backend status → owner calendar display status
+CALENDAR_STATUS_MAP = {
+    "APPROVED":           "RESERVED",
+    "VIEWING_SCHEDULED":  "VIEWING",
+    "ACTIVE":             "OCCUPIED",
+    "COMPLETED":          "MOVED_OUT",
+    "MOVED_OUT":          "MOVED_OUT_EARLY",
+}
+CALENDAR_STATUSES = ("APPROVED", "ACTIVE", "COMPLETED")   # shown on the occupancy calendar
+CALENDAR_MAX_DAYS = 62
 
-
-# ── Auto-cancel helper (lazy evaluation) ─────────────────
-def _run_auto_cancels(bookings: list) -> None:
-    """
-    Called after any booking list fetch.
-    Mutates stale bookings in-place and commits once.
-    """
-    now  = datetime.now(timezone.utc)
-    dirty = False
-
-    for b in bookings:
-        status = b.status.value if hasattr(b.status, "value") else str(b.status)
-
-        if status == "PENDING":
-            age = (now - b.created_at.replace(tzinfo=timezone.utc)).days
-            if age >= AUTO_CANCEL_PENDING_DAYS:
-                b.status = "CANCELLED"
-                b.cancel_reason = "Auto-cancelled: no response from owner within 3 days."
-                dirty = True
-                resident = db.session.get(User, b.resident_id)
-                if resident:
-                    create_notification(
-                        user_id=resident.id,
-                        notif_type="BOOKING",
-                        title="Reservation auto-cancelled",
-                        body="Your reservation was automatically cancelled after 3 days with no response.",
-                    )
-
-        elif status == "APPROVED":
-            age = (now - b.approved_at.replace(tzinfo=timezone.utc)).days if b.approved_at else 0
-            if age >= AUTO_CANCEL_APPROVED_DAYS:
-                b.status = "CANCELLED"
-                b.cancel_reason = "Auto-cancelled: no viewing scheduled within 3 days of approval."
-                dirty = True
-                resident = db.session.get(User, b.resident_id)
-                if resident:
-                    create_notification(
-                        user_id=resident.id,
-                        notif_type="BOOKING",
-                        title="Reservation auto-cancelled",
-                        body="Your reservation was cancelled — no viewing was scheduled within 3 days.",
-                    )
-
-        elif status == "VIEWING_SCHEDULED":
-            if b.viewing_date:
-                vd = b.viewing_date if b.viewing_date.tzinfo else b.viewing_date.replace(tzinfo=timezone.utc)
-                if vd < now:
-                    b.status = "VIEWING_DECLINED"
-                    b.viewing_declined_at = now
-                    b.viewing_decline_reason = "Auto-declined: viewing date passed with no response."
-                    dirty = True
-                    resident = db.session.get(User, b.resident_id)
-                    listing  = db.session.get(Listing, b.listing_id)
-                    owner    = db.session.get(User, listing.owner_id) if listing else None
-                    if resident:
-                        create_notification(
-                            user_id=resident.id,
-                            notif_type="BOOKING",
-                            title="Reservation auto-cancelled",
-                            body="Your viewing date has passed with no move-in confirmation.",
-                        )
-                    if owner:
-                        create_notification(
-                            user_id=owner.id,
-                            notif_type="BOOKING",
-                            title="Viewing expired",
-                            body=f"A scheduled viewing has expired with no move-in confirmed.",
-                        )
-
-    if dirty:
-        try:
-            db.session.commit()
-        except SQLAlchemyError:
-            db.session.rollback()
+RECEIPT_EXPORT_MAX_DAYS = 92     # one quarter per ZIP
+RECEIPT_EXPORT_MAX      = 1000   # receipts per ZIP
 
 
 # ══════════════════════════════════════════════════════════
@@ -214,27 +157,63 @@ def create_booking():
         contract_end_date=move_out,
         message=message,
     )
+    booking.freeze_snapshot(listing=listing, resident=user)
+
+    # Notify owner in-app (Listing has no .owner backref — owner_id is enough)
+    listing_title = listing.title or f"Listing #{listing_id}"
+    resident_full = f"{user.first_name or ''} {user.last_name or ''}".strip() or user.email
 
     try:
         db.session.add(booking)
+        notify(
+            user_id=listing.owner_id,
+            notif_type="BOOKING_SUBMITTED",
+            title="New reservation request",
+            body=f"{resident_full} wants to reserve '{listing_title}'",
+        )
         db.session.commit()
     except SQLAlchemyError:
         db.session.rollback()
         return json_error("Database error", 500)
 
-    # Notify owner in-app — use db.session.get (Listing has no .owner backref)
-    owner = db.session.get(User, listing.owner_id)
-    listing_title = listing.title or f"Listing #{listing_id}"
-    resident_full = f"{user.first_name or ''} {user.last_name or ''}".strip() or user.email
+    return jsonify({"message": "Reservation request submitted", "booking": booking.to_dict()}), 201
 
-    create_notification(
-        user_id=owner.id,
-        notif_type="BOOKING_SUBMITTED",
-        title="New reservation request",
-        body=f"{resident_full} wants to reserve '{listing_title}'",
-    )
 
-    return jsonify({"message": "Reservation request submitted", "booking": booking.to_dict()}), 201
+def _lean() -> bool:
+    """?lean=1 — list rows without free text / document URLs."""
+    return request.args.get("lean", "").lower() in ("1", "true")
+
+
+# ══════════════════════════════════════════════════════════
+# ADMIN: All bookings (paginated)
+# GET /bookings?status=ACTIVE,APPROVED&page=1&per_page=50&lean=1
+# ══════════════════════════════════════════════════════════
+
+@bookings_bp.get("/bookings")
+@require_role("ADMIN")
+def admin_bookings():
+    page     = max(1, request.args.get("page", 1, type=int))
+    per_page = max(1, min(request.args.get("per_page", 50, type=int), 200))
+    statuses = [x.strip().upper() for x in (request.args.get("status") or "").split(",") if x.strip()]
+
+    query = Booking.query
+    if statuses:
+        query = query.filter(Booking.status.in_(statuses))
+
+    total = query.order_by(None).count()
+    bookings = (
+        query
+        .order_by(Booking.created_at.desc(), Booking.id.desc())
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+        .all()
+    )
+    return jsonify({
+        "bookings": serialize_bookings(bookings, lean=_lean()),
+        "total":    total,
+        "page":     page,
+        "per_page": per_page,
+    }), 200
 
 
 # ══════════════════════════════════════════════════════════
@@ -274,8 +253,7 @@ def my_bookings():
         .order_by(Booking.created_at.desc())
         .all()
     )
-    _run_auto_cancels(bookings)
-    return jsonify({"bookings": [b.to_dict() for b in bookings]}), 200
+    return jsonify({"bookings": serialize_bookings(bookings, lean=_lean())}), 200
 
 
 # ══════════════════════════════════════════════════════════
@@ -328,6 +306,12 @@ def owner_cancel_booking(booking_id: int):
     booking.status = "CANCELLED"
     if note:
         booking.owner_note = note
+    notify(
+        user_id=booking.resident_id,
+        notif_type="BOOKING",
+        title="Reservation cancelled by owner",
+        body=f'Your reservation was cancelled by the property owner.{" Reason: " + note if note else ""}',
+    )
 
     try:
         db.session.commit()
@@ -335,14 +319,6 @@ def owner_cancel_booking(booking_id: int):
         db.session.rollback()
         return json_error("Database error", 500)
 
-    resident = db.session.get(User, booking.resident_id)
-    if resident:
-        create_notification(
-            user_id=resident.id,
-            notif_type="BOOKING",
-            title="Reservation cancelled by owner",
-            body=f'Your reservation was cancelled by the property owner.{" Reason: " + note if note else ""}',
-        )
     return jsonify({"message": "Reservation cancelled", "booking": booking.to_dict()}), 200
 
 
@@ -353,20 +329,30 @@ def owner_cancel_booking(booking_id: int):
 @bookings_bp.get("/bookings/<int:booking_id>/receipt")
 @require_auth
 def booking_receipt(booking_id: int):
-    """Return receipt data for a reservation. Only the booking's resident
-    or the listing's owner may access it."""
+    """Return receipt data (or ?format=html|pdf, the rendered receipt) for a
+    reservation. Only the booking's resident or the listing's owner may
+    access it."""
     user = g.current_user
     booking = db.session.get(Booking, booking_id)
     if not booking:
         return json_error("Reservation not found", 404)
 
-    listing = db.session.get(Listing, booking.listing_id)
-    if not listing:
-        return json_error("Listing not found", 404)
+    # Frozen at creation / approval; rows from before the snapshot column
+    # (not yet backfilled) are built from the live rows.
+    snap = booking.snapshot
+    if not snap:
+        listing = db.session.get(Listing, booking.listing_id)
+        if not listing:
+            return json_error("Listing not found", 404)
+        snap = build_booking_snapshot(
+            listing,
+            db.session.get(User, booking.resident_id),
+            db.session.get(User, listing.owner_id),
+        )
 
     # Access guard: resident who owns the booking OR owner of the listing
     is_resident = booking.resident_id == user.id
-    is_owner = listing.owner_id == user.id
+    is_owner = snap["owner"]["id"] == user.id
     if not is_resident and not is_owner:
         return json_error("Forbidden", 403)
 
@@ -375,70 +361,103 @@ def booking_receipt(booking_id: int):
     if status_val not in RECEIPT_STATUSES:
         return json_error("Receipt is not available for this reservation status.", 400)
 
-    # ── Build reference number: VHRA-YYYYMMDD-00001 ──
-    created = booking.created_at or datetime.now(timezone.utc)
-    ref = f"VHRA-{created.strftime('%Y%m%d')}-{booking.id:05d}"
-
-    # ── Resident name ──
-    resident = db.session.get(User, booking.resident_id)
-    resident_first = (resident.first_name or "").strip() if resident else ""
-    resident_last = (resident.last_name or "").strip() if resident else ""
-    resident_name = f"{resident_first} {resident_last}".strip() or (resident.email if resident else "—")
-
-    # ── Owner name ──
-    owner = db.session.get(User, listing.owner_id)
-    owner_first = (owner.first_name or "").strip() if owner else ""
-    owner_last = (owner.last_name or "").strip() if owner else ""
-    owner_name = f"{owner_first} {owner_last}".strip() or (owner.email if owner else "—")
-
-    # ── Listing details ──
-    location = listing.location or {}
-    address_parts = [
-        location.get("address", ""),
-        location.get("barangay", ""),
-        location.get("city", ""),
-    ]
-    full_address = ", ".join(p for p in address_parts if p) or "—"
-
-    capacity = listing.capacity or {}
-    monthly_rent = capacity.get("monthly_rent") or capacity.get("price")
-
-    # ── Status display label ──
-    STATUS_LABELS = {
-        "PENDING":           "Pending",
-        "APPROVED":          "Approved",
-        "VIEWING_SCHEDULED": "Viewing Scheduled",
-        "VIEWING_DECLINED":  "Viewing Declined",
-        "ACTIVE":            "Occupied",
-        "COMPLETED":         "Moved Out",
-        "MOVED_OUT":         "Moved Out (Early)",
-        "REJECTED":          "Rejected",
-        "CANCELLED":         "Cancelled",
-    }
-    display_status = STATUS_LABELS.get(status_val, status_val)
+    # ?format=html|pdf → rendered document; default JSON fields
+    fmt = (request.args.get("format") or "").lower()
+    if fmt and fmt not in RECEIPT_FORMATS:
+        return json_error("Validation failed", 400, fields={"format": "Must be html or pdf."})
+    if not fmt:
+        return jsonify({"receipt": receipt(booking, "data", snap)}), 200
+
+    resp = Response(receipt(booking, fmt, snap), mimetype=RECEIPT_FORMATS[fmt])
+    resp.headers["Content-Disposition"] = f'inline; filename="{receipt_reference(booking)}.{fmt}"'
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
 
+# ══════════════════════════════════════════════════════════
+# OWNER: Bulk receipt export
+# POST /bookings/receipts/export?from=YYYY-MM-DD&to=YYYY-MM-DD&format=pdf|html
+#   → 202 {job_id}; ZIP of the receipts of every reservation made in the
+#     window (default: this month, at most RECEIPT_EXPORT_MAX_DAYS) on the
+#     owner's listings, built by a background thread (utils/receipts.py)
+# GET /bookings/receipts/export/<job_id>
+#   → 202 while building, then the ZIP (kept for receipts.EXPORT_TTL)
+# ══════════════════════════════════════════════════════════
+
+@bookings_bp.post("/bookings/receipts/export")
+@require_role("OWNER")
+def export_receipts():
+    user = g.current_user
+    fmt = (request.args.get("format") or "pdf").lower()
+    if fmt not in RECEIPT_FORMATS:
+        return json_error("Validation failed", 400, fields={"format": "Must be html or pdf."})
+    start, end, err = _calendar_window(RECEIPT_EXPORT_MAX_DAYS)
+    if err:
+        return err
+
+    bookings = (
+        Booking.query
+        .join(Listing, Booking.listing_id == Listing.id)
+        .filter(
+            Listing.owner_id == user.id,
+            Booking.status.in_(RECEIPT_STATUSES),
+            Booking.created_at >= start,
+            Booking.created_at < end + timedelta(days=1),
+        )
+        .order_by(Booking.created_at, Booking.id)
+        .limit(RECEIPT_EXPORT_MAX + 1)
+        .all()
+    )
+    if len(bookings) > RECEIPT_EXPORT_MAX:
+        return json_error(f"More than {RECEIPT_EXPORT_MAX} receipts in this range — pick a shorter one.", 400)
+    if not bookings:
+        return json_error("No receipts in this date range.", 404)
+
+    # Everything the background thread needs is extracted here
+    items = []
+    for b in bookings:
+        snap = b.snapshot or build_booking_snapshot(
+            db.session.get(Listing, b.listing_id), db.session.get(User, b.resident_id), user
+        )
+        items.append({"key": receipt_cache_key(b, fmt), "data": receipt(b, "data", snap)})
+
+    job_id = start_receipt_export(user.id, items, fmt)
     return jsonify({
-        "receipt": {
-            "reference": ref,
-            "resident_name": resident_name,
-            "listing_title": listing.title or "Untitled listing",
-            "listing_address": full_address,
-            "owner_name": owner_name,
-            "move_in_date": booking.move_in_date.isoformat() if booking.move_in_date else None,
-            "monthly_rent": float(monthly_rent) if monthly_rent else None,
-            "status": display_status,
-            "approved_at": booking.approved_at.isoformat() if booking.approved_at else None,
-            "created_at": created.isoformat() if created else None,
-        }
-    }), 200
+        "job_id": job_id,
+        "count": len(items),
+        "status_url": f"/api/bookings/receipts/export/{job_id}",
+    }), 202
+
+
+@bookings_bp.get("/bookings/receipts/export/<job_id>")
+@require_role("OWNER")
+def download_receipt_export(job_id: str):
+    state, path = receipt_export_status(job_id, g.current_user.id)
+    if state is None:
+        return json_error("Export not found", 404)
+    if state == "failed":
+        return json_error("Export failed — please try again.", 500)
+    if state == "pending":
+        resp, status = jsonify({"job_id": job_id, "status": "pending"}), 202
+        resp.headers["Retry-After"] = "2"
+        return resp, status
+    return send_file(path, mimetype="application/zip", as_attachment=True, download_name="receipts.zip")
 
 
 # ══════════════════════════════════════════════════════════
 # OWNER: Bookings for my listings (calendar-ready)
 # ══════════════════════════════════════════════════════════
 
+def _owner_bookings_version():
+    """Catalog version — bumped by every booking write, including the expiry job."""
+    from ..models.counter import catalog_version
+
+    return catalog_version()
+
+
 @bookings_bp.get("/bookings/for-owner")
 @require_role("OWNER")
+@conditional(_owner_bookings_version)
 def owner_bookings():
     user = g.current_user
     bookings = (
@@ -448,27 +467,17 @@ def owner_bookings():
         .order_by(Booking.created_at.desc())
         .all()
     )
-    _run_auto_cancels(bookings)
 
     out = []
-    for b in bookings:
-        d = b.to_dict()
+    for d in serialize_bookings(bookings, lean=_lean()):
         listing_snap = d.get("listing") or {}
 
-        # Map backend status → calendar display status
-        status_map = {
-            "APPROVED":           "RESERVED",
-            "VIEWING_SCHEDULED":  "VIEWING",
-            "ACTIVE":             "OCCUPIED",
-            "COMPLETED":          "MOVED_OUT",
-            "MOVED_OUT":          "MOVED_OUT_EARLY",
-        }
-        calendar_status = status_map.get(d.get("status"), d.get("status"))
+        calendar_status = CALENDAR_STATUS_MAP.get(d.get("status"), d.get("status"))
 
         out.append({
             **d,
             "calendar_status": calendar_status,
-            "unit": listing_snap.get("title") or f"Listing #{b.listing_id}",
+            "unit": listing_snap.get("title") or f"Listing #{d['listing_id']}",
             "guest": d.get("resident_name") or "Unknown",
             "start": d.get("move_in_date"),
             "end": d.get("move_out_date"),
@@ -479,6 +488,127 @@ def owner_bookings():
     return jsonify({"bookings": out}), 200
 
 
+# ══════════════════════════════════════════════════════════
+# OWNER: Occupancy calendar for a date window
+# GET /bookings/calendar?from=YYYY-MM-DD&to=YYYY-MM-DD&listing_id=
+# Only bookings whose stay [move_in, move_out | contract_end] overlaps
+# the window (default: this month, at most CALENDAR_MAX_DAYS), plus a
+# per-day occupancy array for each listing in the answer. Stays with no
+# move-in date are placed on today (no_dates: true).
+# ══════════════════════════════════════════════════════════
+
+def _calendar_window(max_days: int = CALENDAR_MAX_DAYS):
+    today = date.today()
+    try:
+        start = date.fromisoformat(request.args["from"]) if request.args.get("from") else today.replace(day=1)
+        if request.args.get("to"):
+            end = date.fromisoformat(request.args["to"])
+        else:
+            end = (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    except ValueError:
+        return None, None, json_error("Validation failed", 400, fields={"from": "Dates must be YYYY-MM-DD."})
+    if end < start:
+        return None, None, json_error("Validation failed", 400, fields={"to": "'to' must not be before 'from'."})
+    if (end - start).days + 1 > max_days:
+        return None, None, json_error("Validation failed", 400, fields={"to": f"Window is limited to {max_days} days."})
+    return start, end, None
+
+
+@bookings_bp.get("/bookings/calendar")
+@require_role("OWNER")
+@conditional(_owner_bookings_version)
+def owner_calendar():
+    from sqlalchemy.orm import load_only
+    from ..utils.photos import listing_cover
+
+    start, end, err = _calendar_window()
+    if err:
+        return err
+
+    listings_q = (
+        Listing.query
+        .options(load_only(Listing.id, Listing.title, Listing.cover_url, Listing.cover_variants, Listing.photos))
+        .filter(Listing.owner_id == g.current_user.id)
+    )
+    listing_id = request.args.get("listing_id", type=int)
+    if listing_id:
+        listings_q = listings_q.filter(Listing.id == listing_id)
+    listings = {l.id: l for l in listings_q.all()}
+    if listing_id and not listings:
+        return json_error("Listing not found", 404)
+
+    # Stay end: actual move-out, else contract end, else the move-in day itself
+    stay_end = db.func.coalesce(Booking.move_out_date, Booking.contract_end_date, Booking.move_in_date)
+    in_window = db.and_(Booking.move_in_date <= end, stay_end >= start)
+    # Stays without a move-in date are shown on today (no_dates), so they
+    # belong to whichever window contains today
+    today = date.today()
+    if start <= today <= end:
+        in_window = db.or_(in_window, Booking.move_in_date.is_(None))
+    rows = []
+    if listings:
+        rows = (
+            db.session.query(
+                Booking.id, Booking.listing_id, Booking.status, Booking.approved_at,
+                Booking.move_in_date, stay_end.label("stay_end"),
+                User.first_name, User.last_name, User.email,
+            )
+            .join(User, User.id == Booking.resident_id)
+            # (listing_id, move_in_date) index bounds the scan; stay_end filters the rest
+            .filter(Booking.listing_id.in_(listings))
+            .filter(in_window)
+            .filter(Booking.status.in_(CALENDAR_STATUSES))
+            .order_by(Booking.move_in_date, Booking.id)
+            .all()
+        )
+
+    ndays = (end - start).days + 1
+    # Precedence when stays overlap on a day
+    rank = {"OCCUPIED": 3, "RESERVED": 2, "MOVED_OUT": 1}
+    days = {}
+    bookings = []
+    for r in rows:
+        listing = listings[r.listing_id]
+        no_dates = r.move_in_date is None
+        stay_from = today if no_dates else r.move_in_date
+        # COALESCE over Date columns can come back as a string / datetime depending on the driver
+        stay_to = today if no_dates else date.fromisoformat(str(r.stay_end)[:10])
+        status = CALENDAR_STATUS_MAP.get(r.status, r.status)
+
+        occ = days.setdefault(r.listing_id, [None] * ndays)
+        for i in range(max((stay_from - start).days, 0), min((stay_to - start).days, ndays - 1) + 1):
+            if rank.get(status, 0) > rank.get(occ[i], 0):
+                occ[i] = status
+
+        bookings.append({
+            "id": r.id,
+            "listing_id": r.listing_id,
+            "status": r.status,
+            "calendar_status": status,
+            "unit": listing.title or f"Listing #{r.listing_id}",
+            "guest": f"{(r.first_name or '').strip()} {(r.last_name or '').strip()}".strip() or r.email,
+            "start": stay_from.isoformat(),
+            "end": stay_to.isoformat(),
+            "no_dates": no_dates,
+            "image": listing_cover(listing, "sm"),
+            "approved_at": r.approved_at.isoformat() if r.approved_at else None,
+        })
+
+    return jsonify({
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "listings": [
+            {
+                "listing_id": lid,
+                "title": listings[lid].title or f"Listing #{lid}",
+                "days": occ,
+            }
+            for lid, occ in days.items()
+        ],
+        "bookings": bookings,
+    }), 200
+
+
 # ══════════════════════════════════════════════════════════
 # OWNER: Update booking status (ACTIVE / COMPLETED)
 # ══════════════════════════════════════════════════════════
@@ -542,23 +672,22 @@ def update_booking_status(booking_id: int):
     if data.get("note"):
         booking.owner_note = (data.get("note") or "").strip() or None
 
-    try:
-        db.session.commit()
-    except SQLAlchemyError:
-        db.session.rollback()
-        return json_error("Database error", 500)
-
     # Notify resident of status change
-    resident = db.session.get(User, booking.resident_id)
     listing_title = listing.title or f"Listing #{booking.listing_id}"
     notif_map = {
         "ACTIVE":    ("You've been moved in!", f"Your booking for '{listing_title}' is now active."),
         "COMPLETED": ("Booking completed",     f"Your stay at '{listing_title}' has been marked complete."),
         "CANCELLED": ("Booking cancelled",     f"Your booking for '{listing_title}' was cancelled by the owner."),
     }
-    if resident and new_status in notif_map:
+    if new_status in notif_map:
         title, body = notif_map[new_status]
-        create_notification(user_id=resident.id, notif_type="BOOKING", title=title, body=body)
+        notify(user_id=booking.resident_id, notif_type="BOOKING", title=title, body=body)
+
+    try:
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return json_error("Database error", 500)
 
     return jsonify({"message": f"Booking marked as {new_status}", "booking": booking.to_dict()}), 200
 
@@ -592,25 +721,23 @@ def resident_move_out(booking_id: int):
     else:
         booking.days_early = None
 
-    try:
-        db.session.commit()
-    except SQLAlchemyError:
-        db.session.rollback()
-        return json_error("Database error", 500)
-
     # Notify owner
     listing = db.session.get(Listing, booking.listing_id)
     if listing:
-        owner = db.session.get(User, listing.owner_id)
         resident_name = f"{user.first_name or ''} {user.last_name or ''}".strip() or user.email
         listing_title = listing.title or f"Listing #{booking.listing_id}"
-        if owner:
-            create_notification(
-                user_id=owner.id,
-                notif_type="BOOKING",
-                title="Resident has moved out",
-                body=f"{resident_name} has moved out of '{listing_title}'.",
-            )
+        notify(
+            user_id=listing.owner_id,
+            notif_type="BOOKING",
+            title="Resident has moved out",
+            body=f"{resident_name} has moved out of '{listing_title}'.",
+        )
+
+    try:
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return json_error("Database error", 500)
 
     return jsonify({"message": "Move-out recorded.", "booking": booking.to_dict()}), 200
 
@@ -690,26 +817,25 @@ def viewing_response(booking_id: int):
     if booking.status != "VIEWING_SCHEDULED":
         return json_error("Viewing response is only valid for scheduled viewings.", 400)
 
-    listing = db.session.get(Listing, booking.listing_id)
-    owner   = db.session.get(User, listing.owner_id) if listing else None
+    listing  = db.session.get(Listing, booking.listing_id)
+    owner_id = listing.owner_id if listing else None
     listing_title = listing.title if listing else f"Listing #{booking.listing_id}"
 
     if action == "CONFIRM":
         # Persist confirmation so refresh doesn't re-show the prompt
         booking.viewing_confirmed_at = datetime.now(timezone.utc)
+        # Notify owner
+        notify(
+            user_id=owner_id,
+            notif_type="BOOKING",
+            title="Resident confirmed viewing",
+            body=f"{user.first_name or user.email} confirmed the viewing for '{listing_title}'.",
+        )
         try:
             db.session.commit()
         except SQLAlchemyError:
             db.session.rollback()
             return json_error("Database error.", 500)
-        # Notify owner
-        if owner:
-            create_notification(
-                user_id=owner.id,
-                notif_type="BOOKING",
-                title="Resident confirmed viewing",
-                body=f"{user.first_name or user.email} confirmed the viewing for '{listing_title}'.",
-            )
         return jsonify({"message": "Viewing confirmed.", "booking": booking.to_dict()}), 200
 
     # DECLINE
@@ -722,21 +848,20 @@ def viewing_response(booking_id: int):
     booking.viewing_declined_at     = now
     booking.viewing_decline_reason  = reason
 
+    # Notify owner
+    notify(
+        user_id=owner_id,
+        notif_type="BOOKING",
+        title="Resident declined viewing",
+        body=f"{user.first_name or user.email} declined the viewing for '{listing_title}'. Reason: {reason}",
+    )
+
     try:
         db.session.commit()
     except SQLAlchemyError:
         db.session.rollback()
         return json_error("Database error.", 500)
 
-    # Notify owner
-    if owner:
-        create_notification(
-            user_id=owner.id,
-            notif_type="BOOKING",
-            title="Resident declined viewing",
-            body=f"{user.first_name or user.email} declined the viewing for '{listing_title}'. Reason: {reason}",
-        )
-
     return jsonify({"message": "Viewing declined.", "booking": booking.to_dict()}), 200  
 # ══════════════════════════════════════════════════════════
 # RESIDENT: Upload payment proof
@@ -768,25 +893,23 @@ def upload_payment_proof(booking_id: int):
     booking.payment_proof_url = proof_url
     booking.payment_verified = False  # Reset verification on new upload
 
-    try:
-        db.session.commit()
-    except SQLAlchemyError:
-        db.session.rollback()
-        return json_error("Database error", 500)
-
     # Notify owner that proof has been submitted
     listing = db.session.get(Listing, booking.listing_id)
     if listing:
-        owner = db.session.get(User, listing.owner_id)
         resident_name = f"{user.first_name or ''} {user.last_name or ''}".strip() or user.email
         listing_title = listing.title or f"Listing #{booking.listing_id}"
-        if owner:
-            create_notification(
-                user_id=owner.id,
-                notif_type="BOOKING",
-                title="Payment proof submitted",
-                body=f"{resident_name} uploaded proof of payment for '{listing_title}'.",
-            )
+        notify(
+            user_id=listing.owner_id,
+            notif_type="BOOKING",
+            title="Payment proof submitted",
+            body=f"{resident_name} uploaded proof of payment for '{listing_title}'.",
+        )
+
+    try:
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return json_error("Database error", 500)
 
     return jsonify({"message": "Payment proof submitted.", "booking": booking.to_dict()}), 200
 
@@ -830,15 +953,11 @@ def _owner_update_booking(booking_id: int, new_status: str, note: str = None):
     # Record the exact timestamp when the booking was approved or rejected
     if new_status in ("APPROVED", "REJECTED"):
         booking.approved_at = datetime.now(timezone.utc)
-
-    try:
-        db.session.commit()
-    except SQLAlchemyError:
-        db.session.rollback()
-        return json_error("Database error", 500)
+    # Approval is the last time the snapshot is taken — receipts quote it
+    if new_status == "APPROVED":
+        booking.freeze_snapshot(listing=listing, owner=user)
 
     # Notify resident
-    resident = booking.resident
     listing_title = listing.title or f"Listing #{booking.listing_id}"
 
     notif_map = {
@@ -847,9 +966,15 @@ def _owner_update_booking(booking_id: int, new_status: str, note: str = None):
         "COMPLETED":         ("Moved out",            f"Your stay at '{listing_title}' has ended."),
         "CANCELLED":         ("Reservation cancelled", f"Your reservation for '{listing_title}' was cancelled by the owner." + (f" Reason: {booking.cancel_reason}" if booking.cancel_reason else "")),
     }
-    if resident and new_status in notif_map:
+    if new_status in notif_map:
         title, body = notif_map[new_status]
-        create_notification(user_id=resident.id, notif_type="BOOKING", title=title, body=body)
+        notify(user_id=booking.resident_id, notif_type="BOOKING", title=title, body=body)
+
+    try:
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return json_error("Database error", 500)
 
     return jsonify({"message": f"Reservation {new_status.lower()}", "booking": booking.to_dict()}), 200
 
@@ -892,25 +1017,25 @@ def verify_payment(booking_id: int):
         if not booking.move_in_date:
             booking.move_in_date = date.today()
 
+    # Notify resident
+    listing_title = listing.title or f"Listing #{booking.listing_id}"
+    if verified:
+        notify(
+            user_id=booking.resident_id,
+            notif_type="PAYMENT_VERIFIED",
+            title="Payment confirmed!",
+            body=f"Your payment for '{listing_title}' has been verified. Welcome!",
+        )
+    else:
+        notify(
+            user_id=booking.resident_id,
+            notif_type="PAYMENT_REJECTED",
+            title="Payment not verified",
+            body=f"Your payment proof for '{listing_title}' was not accepted." + (f" Reason: {note}" if note else ""),
+        )
+
     try:
         db.session.commit()
-        # Notify resident
-        resident = booking.resident
-        listing_title = listing.title or f"Listing #{booking.listing_id}"
-        if verified:
-            create_notification(
-                user_id=resident.id,
-                notif_type="PAYMENT_VERIFIED",
-                title="Payment confirmed!",
-                body=f"Your payment for '{listing_title}' has been verified. Welcome!",
-            )
-        else:
-            create_notification(
-                user_id=resident.id,
-                notif_type="PAYMENT_REJECTED",
-                title="Payment not verified",
-                body=f"Your payment proof for '{listing_title}' was not accepted." + (f" Reason: {note}" if note else ""),
-            )
         return jsonify({"message": "Payment status updated.", "booking": booking.to_dict()}), 200
     except SQLAlchemyError:
         db.session.rollback()
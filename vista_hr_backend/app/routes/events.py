@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+import queue
+import time
+
+from flask import Blueprint, Response, current_app, g, stream_with_context
+
+from ..extensions import db
+from ..auth.jwt import require_auth
+from ..utils.errors import json_error
+from ..utils.realtime import broker, ensure_started
+from ..utils.presence import touch_seen
+
+events_bp = Blueprint("events", __name__)
+
+# Comment line sent when nothing happened — keeps proxies from timing out
+HEARTBEAT_SECONDS = 15
+
+
+def _frame(event_type: str, data) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+# ══════════════════════════════════════════════
+# GET /events
+# Server-Sent Events stream for the current user:
+#   message · read · typing · notification · booking
+# The stream ends after REALTIME_STREAM_SECONDS; EventSource reconnects
+# on its own (retry hint below) and the page resyncs on "ready".
+#
+# Every open stream pins one gthread thread, so a worker serves at most
+# REALTIME_MAX_STREAMS of them and answers 503 above that — the page
+# keeps polling and tries again later (shared/realtime.js).
+# ══════════════════════════════════════════════
+@events_bp.get("/events")
+@require_auth
+def event_stream():
+    user_id = g.current_user.id
+    role = g.current_user.role.value if hasattr(g.current_user.role, "value") else str(g.current_user.role)
+    lifetime = int(current_app.config.get("REALTIME_STREAM_SECONDS", 120))
+    max_streams = int(current_app.config.get("REALTIME_MAX_STREAMS", 16))
+    ensure_started()
+
+    # Don't hold a pooled DB connection for the life of the stream
+    db.session.remove()
+
+    q = broker.subscribe(user_id, limit=max_streams)
+    if q is None:
+        resp, status = json_error("Too many live connections — falling back to polling.", 503)
+        resp.headers["Retry-After"] = "60"
+        return resp, status
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            yield _frame("ready", {"user_id": user_id})
+            deadline = time.monotonic() + lifetime
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                touch_seen(user_id, role)           # an open stream counts as online
+                try:
+                    evt = q.get(timeout=min(HEARTBEAT_SECONDS, remaining))
+                except queue.Empty:
+                    yield ": ping\n\n"
+                    continue
+                yield _frame(evt["type"], evt["data"])
+        finally:
+            broker.unsubscribe(user_id, q)
+
+    resp = Response(stream_with_context(generate()), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"     # nginx / Railway proxy: don't buffer
+    return resp
@@ -9,7 +9,6 @@ Handles:
 """
 
 from __future__ import annotations
-import threading
 from datetime import datetime, timezone
 
 from flask import Blueprint, request, jsonify, g
@@ -17,9 +16,10 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from ..extensions import db
 from ..models import User, Listing
+from ..models.listing_index import sync_listing_index
 from ..auth.jwt import require_role, require_auth
 from ..utils.errors import json_error
-from ..routes.notifications import create_notification
+from ..utils.notify import notify, email_on_commit
 from ..utils.mail import (
     send_kyc_approved_email,
     send_kyc_rejected_email,
@@ -28,10 +28,6 @@ from ..utils.mail import (
 )
 
 
-def _send_async(fn, *args, **kwargs):
-    t = threading.Thread(target=fn, args=args, kwargs=kwargs, daemon=True)
-    t.start()
-
 
 kyc_bp = Blueprint("kyc", __name__)
 
@@ -213,25 +209,20 @@ def admin_kyc_approve(user_id: int):
     user.kyc_reject_reason = None
     user.is_verified       = True
 
-    try:
-        db.session.commit()
-    except SQLAlchemyError:
-        db.session.rollback()
-        return json_error("Database error", 500)
-
-    # In-app notification
-    create_notification(
+    # In-app notification + email, sent once the review is committed
+    notify(
         user_id=user.id,
         notif_type="KYC",
         title="Identity verified!",
         body="Your identity documents have been approved. Your account is now verified.",
     )
+    email_on_commit(send_kyc_approved_email, user.email, _name(user))
 
-    # Email (non-fatal)
     try:
-        _send_async(send_kyc_approved_email, user.email, _name(user))
-    except Exception:
-        pass
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return json_error("Database error", 500)
 
     return jsonify({"message": "KYC approved", "user_id": user_id}), 200
 
@@ -255,24 +246,20 @@ def admin_kyc_reject(user_id: int):
     user.kyc_reject_reason = reason
     user.is_verified       = False
 
-    try:
-        db.session.commit()
-    except SQLAlchemyError:
-        db.session.rollback()
-        return json_error("Database error", 500)
-
-    # In-app notification
-    create_notification(
+    # In-app notification + email, sent once the review is committed
+    notify(
         user_id=user.id,
         notif_type="KYC",
         title="Identity verification rejected",
         body=f"Your documents were not accepted. Reason: {reason}",
     )
+    email_on_commit(send_kyc_rejected_email, user.email, reason, _name(user))
 
     try:
-        _send_async(send_kyc_rejected_email, user.email, reason, _name(user))
-    except Exception:
-        pass
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return json_error("Database error", 500)
 
     return jsonify({"message": "KYC rejected", "user_id": user_id}), 200
 
@@ -381,24 +368,20 @@ def admin_student_approve(user_id: int):
     user.student_reviewed_at   = datetime.now(timezone.utc)
     user.student_reject_reason = None
 
-    try:
-        db.session.commit()
-    except SQLAlchemyError:
-        db.session.rollback()
-        return json_error("Database error", 500)
-
-    # In-app notification
-    create_notification(
+    # In-app notification + email, sent once the review is committed
+    notify(
         user_id=user.id,
         notif_type="STUDENT",
         title="Student verified!",
         body="Your student documents have been approved. You can now access student discounts on eligible listings.",
     )
+    email_on_commit(send_student_approved_email, user.email, _name(user))
 
     try:
-        _send_async(send_student_approved_email, user.email, _name(user))
-    except Exception:
-        pass
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return json_error("Database error", 500)
 
     return jsonify({"message": "Student verified", "user_id": user_id}), 200
 
@@ -422,24 +405,20 @@ def admin_student_reject(user_id: int):
     user.student_reviewed_at   = datetime.now(timezone.utc)
     user.student_reject_reason = reason
 
-    try:
-        db.session.commit()
-    except SQLAlchemyError:
-        db.session.rollback()
-        return json_error("Database error", 500)
-
-    # In-app notification
-    create_notification(
+    # In-app notification + email, sent once the review is committed
+    notify(
         user_id=user.id,
         notif_type="STUDENT",
         title="Student verification rejected",
         body=f"Your student documents were not accepted. Reason: {reason}",
     )
+    email_on_commit(send_student_rejected_email, user.email, reason, _name(user))
 
     try:
-        _send_async(send_student_rejected_email, user.email, reason, _name(user))
-    except Exception:
-        pass
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return json_error("Database error", 500)
 
     return jsonify({"message": "Student verification rejected", "user_id": user_id}), 200
 
@@ -481,6 +460,7 @@ def set_student_discount(listing_id: int):
     listing.capacity = capacity
 
     try:
+        sync_listing_index(listing, owner=user)
         db.session.commit()
         pct = capacity.get("student_discount_pct")
         return jsonify({"message": "Student discount updated", "student_discount_pct": pct}), 200
@@ -13,8 +13,19 @@ from sqlalchemy.exc import SQLAlchemyError
 from ..extensions import db
 from ..models import Listing
 from ..models.user import User
+from ..models.listing_index import (
+    ListingIndex, is_listing_complete, normalize_city, sync_listing_index,
+)
 from ..auth.jwt import require_role
 from ..utils.errors import json_error
+from ..utils.cache import catalog_cached
+from ..utils.cursor import encode_cursor, decode_cursor
+from ..utils.etag import catalog_etag, conditional
+from ..utils.fields import columns_for, parse_projection, row_to_dict
+from ..utils.photos import apply_cover, listing_cover
+from ..utils.geo import (
+    cover_bbox, haversine_many, parse_bbox, parse_coord, radius_bbox, cluster_precision,
+)
 
 listings_bp = Blueprint("listings", __name__)
 
@@ -82,91 +93,112 @@ def _active_owner_listings_count(user) -> int:
     )
 
 
-def _is_listing_complete(listing: Listing) -> bool:
-    # minimal completion rule (matches your step requirements)
-    # NOTE: backend is truth; you can extend later.
-    if not listing.place_type:
-        return False
-    if not listing.space_type:
-        return False
+# =========================
+# OWNER: Dashboard list
+# =========================
+# Live booking state by rank — an occupied unit wins over a reserved one.
+# (Status strings can't be MAX()ed: "ACTIVE" < "APPROVED".)
+_LIVE_STATUS_BY_RANK = {2: "ACTIVE", 1: "APPROVED"}
 
-    loc = listing.location or {}
-    if not (loc.get("street") and loc.get("city") and loc.get("zip")):
-        return False
 
-    cap = listing.capacity or {}
-    try:
-        guests = int(cap.get("guests", 0))
-    except Exception:
-        guests = 0
-    if guests < 1:
-        return False
+def _live_rank(status_col):
+    from sqlalchemy import case
 
-    amenities = listing.amenities or {}
-    a = amenities.get("appliances") or []
-    b = amenities.get("activities") or []
-    c = amenities.get("safety") or []
-    if (len(a) + len(b) + len(c)) < 1:
-        return False
+    return case((status_col == "ACTIVE", 2), (status_col == "APPROVED", 1), else_=0)
 
-    highlights = listing.highlights or []
-    if len(highlights) < 1:
-        return False
 
-    photos = listing.photos or []
-    if not isinstance(photos, list) or len(photos) < 5:
-        return False
+def _booking_rollup():
+    """
+    Per-listing booking state as a grouped subquery: live_rank (see
+    _LIVE_STATUS_BY_RANK; 0 = none) and pending request count.
+    """
+    from sqlalchemy import case, func
+    from ..models.booking import Booking as _Bk
+
+    return (
+        db.session.query(
+            _Bk.listing_id.label("listing_id"),
+            func.max(_live_rank(_Bk.status)).label("live_rank"),
+            func.sum(case((_Bk.status == "PENDING", 1), else_=0)).label("pending"),
+        )
+        .group_by(_Bk.listing_id)
+        .subquery()
+    )
 
-    if not listing.title or len(listing.title.strip()) < 3:
-        return False
-    if not listing.description or len(listing.description.strip()) < 10:
-        return False
 
-    return True
+def _live_booking_status(listing_ids) -> dict:
+    """{listing_id: "ACTIVE" | "APPROVED"} for the given listings, one query."""
+    from sqlalchemy import func
+    from ..models.booking import Booking as _Bk
+
+    if not listing_ids:
+        return {}
+    rows = (
+        db.session.query(_Bk.listing_id, func.max(_live_rank(_Bk.status)))
+        .filter(_Bk.listing_id.in_(listing_ids), _Bk.status.in_(["ACTIVE", "APPROVED"]))
+        .group_by(_Bk.listing_id)
+        .all()
+    )
+    return {lid: _LIVE_STATUS_BY_RANK[rank] for lid, rank in rows}
+
+
+def _my_listings_projected(user, fields) -> list:
+    """Owner dashboard rows with only `fields` selected (listing_index join)."""
+    rows = (
+        db.session.query(*columns_for(fields))
+        .select_from(Listing)
+        .outerjoin(ListingIndex, ListingIndex.listing_id == Listing.id)
+        .filter(Listing.owner_id == user.id)
+        .order_by(Listing.updated_at.desc())
+        .all()
+    )
+    out = [row_to_dict(r, fields) for r in rows]
+
+    if "booking_status" in fields and out:
+        live = _live_booking_status([d["id"] for d in out])
+        for d in out:
+            d["booking_status"] = live.get(d["id"])
+    return out
 
 
-# =========================
-# OWNER: Dashboard list
-# =========================
 @listings_bp.get("/listings/mine")
 @require_role("OWNER")
+@conditional(catalog_etag)
 def my_listings():
     user = g.current_user
+    try:
+        fields = parse_projection(request.args, extra=("booking_status",))
+    except ValueError as e:
+        return json_error("Validation failed", 400, fields={"fields": str(e)})
 
-    listings = (
-        Listing.query
+    if fields:
+        return jsonify({
+            "listings": _my_listings_projected(user, fields),
+            "limit": _owner_listing_limit(user),
+            "active_count": _active_owner_listings_count(user),
+            "owner_verified": bool(getattr(user, "is_verified", False)),
+        }), 200
+
+    rows = (
+        db.session.query(Listing, ListingIndex.is_complete)
+        .outerjoin(ListingIndex, ListingIndex.listing_id == Listing.id)
         .filter(Listing.owner_id == user.id)
         .order_by(Listing.updated_at.desc())
         .all()
     )
+    live = _live_booking_status([l.id for l, _ in rows])
 
     out = []
-    for l in listings:
+    for l, stored_complete in rows:
         d = l.to_dict()
 
-        # cover extraction
         photos = d.get("photos") or []
-        cover = None
-        if isinstance(photos, list) and photos:
-            # if photos are objects, pick isCover first
-            if isinstance(photos[0], dict):
-                cover_obj = next((p for p in photos if isinstance(p, dict) and p.get("isCover")), None)
-                cover = (cover_obj or photos[0]).get("url") if isinstance((cover_obj or photos[0]), dict) else None
-            else:
-                # if photos are strings
-                cover = photos[0]
+        cover = listing_cover(l)
 
         # compute "badge" state
         status = d.get("status") or "DRAFT"
-        complete = _is_listing_complete(l)
-
-        # Check for active/approved booking on this listing
-        from ..models.booking import Booking as _Bk
-        active_bk = _Bk.query.filter(
-            _Bk.listing_id == l.id,
-            _Bk.status.in_(["ACTIVE", "APPROVED"])
-        ).first()
-        booking_status = active_bk.status if active_bk else None
+        complete = stored_complete if stored_complete is not None else is_listing_complete(l)
+        booking_status = live.get(l.id)
 
         out.append({
             "id": d.get("id"),
@@ -191,6 +223,77 @@ def my_listings():
     }), 200
 
 
+@listings_bp.get("/listings/mine/summary")
+@require_role("OWNER")
+@conditional(catalog_etag)
+def my_listings_summary():
+    """
+    Owner dashboard in two queries: every listing with its booking state and
+    stored completeness flag, plus per-status counts.
+    """
+    from sqlalchemy import func
+
+    user = g.current_user
+    bk = _booking_rollup()
+
+    rows = (
+        db.session.query(
+            Listing.id, Listing.title, Listing.status, Listing.current_step,
+            Listing.created_at, Listing.updated_at,
+            ListingIndex.city_label, ListingIndex.barangay_label,
+            ListingIndex.monthly_rent, ListingIndex.cover_url, ListingIndex.cover_thumb,
+            ListingIndex.is_complete,
+            bk.c.live_rank, bk.c.pending,
+        )
+        .outerjoin(ListingIndex, ListingIndex.listing_id == Listing.id)
+        .outerjoin(bk, bk.c.listing_id == Listing.id)
+        .filter(Listing.owner_id == user.id)
+        .order_by(Listing.updated_at.desc())
+        .all()
+    )
+
+    by_status = dict(
+        db.session.query(Listing.status, func.count(Listing.id))
+        .filter(Listing.owner_id == user.id)
+        .group_by(Listing.status)
+        .all()
+    )
+    counts = {s: int(by_status.get(s, 0)) for s in ("DRAFT", "READY", "PUBLISHED", "ARCHIVED")}
+
+    out = []
+    for r in rows:
+        out.append({
+            "id": r.id,
+            "status": r.status or "DRAFT",
+            "current_step": r.current_step or 1,
+            "updated_at": r.updated_at.isoformat() if r.updated_at else None,
+            "created_at": r.created_at.isoformat() if r.created_at else None,
+            "title": r.title or "",
+            "city": r.city_label or "",
+            "barangay": r.barangay_label or "",
+            "price": r.monthly_rent,
+            "cover": r.cover_url,
+            "thumb": r.cover_thumb,
+            "complete": bool(r.is_complete),
+            "booking_status": _LIVE_STATUS_BY_RANK.get(r.live_rank),   # ACTIVE/APPROVED/None
+            "pending_requests": int(r.pending or 0),
+        })
+
+    return jsonify({
+        "listings": out,
+        "counts": {
+            **counts,
+            "total": sum(counts.values()),
+            "occupied": sum(1 for d in out if d["booking_status"] == "ACTIVE"),
+            "reserved": sum(1 for d in out if d["booking_status"] == "APPROVED"),
+            "pending_requests": sum(d["pending_requests"] for d in out),
+        },
+        "limit": _owner_listing_limit(user),
+        "active_count": counts["DRAFT"] + counts["READY"],
+        "owner_verified": bool(getattr(user, "is_verified", False)),
+    }), 200
+
+
 # =========================
 # Read / Resume endpoints
 # =========================
@@ -232,10 +335,13 @@ def delete_listing(listing_id: int):
         from ..models.booking import Booking
         from ..models.review  import Review
         from ..models.message import Message
+        from ..models.conversation_thread import ConversationThread
 
         Booking.query.filter_by(listing_id=listing_id).delete(synchronize_session=False)
         Review.query.filter_by(listing_id=listing_id).delete(synchronize_session=False)
         Message.query.filter_by(listing_id=listing_id).delete(synchronize_session=False)
+        ConversationThread.query.filter_by(listing_id=listing_id).delete(synchronize_session=False)
+        ListingIndex.query.filter_by(listing_id=listing_id).delete(synchronize_session=False)
 
         db.session.delete(listing)
         db.session.commit()
@@ -310,6 +416,7 @@ def create_step1():
 
     try:
         db.session.add(listing)
+        sync_listing_index(listing, owner=user)
         db.session.commit()
         return jsonify({
             "message": "Draft listing created",
@@ -356,6 +463,7 @@ def update_step1(listing_id: int):
     listing.status = "DRAFT"
 
     try:
+        sync_listing_index(listing)
         db.session.commit()
         return jsonify({
             "message": "Step 1 saved",
@@ -384,6 +492,7 @@ def update_step2(listing_id: int):
     listing.current_step = max(listing.current_step or 1, 2)
     listing.status = "DRAFT"  # unfinished stays draft
 
+    sync_listing_index(listing)
     return _commit_or_500({"message": "Step 2 saved", "listing": listing.to_dict()}, 200)
 
 
@@ -416,15 +525,25 @@ def update_step3(listing_id: int):
     elif not re.fullmatch(r"^\d{4}$", zip_code):
         fields["zip"] = "ZIP must be a 4-digit code."
 
+    # Map pin is optional, but if sent it must be a real coordinate
+    coords = None
+    if data.get("lat") not in (None, "") or data.get("lng") not in (None, ""):
+        coords = parse_coord(data.get("lat"), data.get("lng"))
+        if not coords:
+            fields["lat"] = "Invalid map coordinates."
+
     if fields:
         return json_error("Validation failed", 400, fields=fields)
 
     listing.location = {**data, "province": province, "zip": zip_code}
+    if coords:
+        listing.location["lat"], listing.location["lng"] = coords
     listing.current_step = max(listing.current_step or 1, 3)
     listing.status = "DRAFT"
 
 
     
+    sync_listing_index(listing)
     return _commit_or_500({"message": "Step 3 saved", "listing": listing.to_dict()}, 200)
 
 
@@ -466,6 +585,7 @@ def update_step4(listing_id: int):
     listing.current_step = max(listing.current_step or 1, 4)
     listing.status = "DRAFT"
 
+    sync_listing_index(listing)
     return _commit_or_500({"message": "Step 4 saved", "listing": listing.to_dict()}, 200)
 
 
@@ -499,6 +619,7 @@ def update_step5(listing_id: int):
     listing.current_step = max(listing.current_step or 1, 5)
     listing.status = "DRAFT"
 
+    sync_listing_index(listing)
     return _commit_or_500({"message": "Step 5 saved", "listing": listing.to_dict()}, 200)
 
 
@@ -525,6 +646,7 @@ def update_step6(listing_id: int):
     listing.current_step = max(listing.current_step or 1, 6)
     listing.status = "DRAFT"
 
+    sync_listing_index(listing)
     return _commit_or_500({"message": "Step 6 saved", "listing": listing.to_dict()}, 200)
 
 
@@ -554,6 +676,7 @@ def update_step7(listing_id: int):
     enabled = bool(pano_url)
 
     listing.photos = photos
+    apply_cover(listing)
     listing.virtual_tour = {
         "enabled": enabled,
         "panoUrl": pano_url,
@@ -562,6 +685,7 @@ def update_step7(listing_id: int):
     listing.current_step = max(listing.current_step or 1, 7)
     listing.status = "DRAFT"
 
+    sync_listing_index(listing)
     return _commit_or_500({"message": "Step 7 saved", "listing": listing.to_dict()}, 200)
 
 # =========================
@@ -608,7 +732,7 @@ def update_step8(listing_id: int):
     # unfinished = DRAFT
     # finished = READY (if owner not verified)
     user = g.current_user
-    if _is_listing_complete(listing):
+    if is_listing_complete(listing):
         if bool(getattr(user, "is_verified", False)) and bool(getattr(user, "email_verified", False)):
             listing.status = "PUBLISHED"
         else:
@@ -616,6 +740,7 @@ def update_step8(listing_id: int):
     else:
         listing.status = "DRAFT"
 
+    sync_listing_index(listing)
     return _commit_or_500({"message": "Step 8 saved", "listing": listing.to_dict()}, 200)
 
 
@@ -676,6 +801,7 @@ def update_step9(listing_id: int):
     listing.current_step = max(listing.current_step or 1, 9)
     listing.status = "DRAFT"  # stays DRAFT until Step 10 (preview/finish)
 
+    sync_listing_index(listing)
     return _commit_or_500({"message": "Step 9 saved", "listing": listing.to_dict()}, 200)
 
 
@@ -701,7 +827,7 @@ def submit_for_verification(listing_id: int):
             code="EMAIL_NOT_VERIFIED"
         )
 
-    if not _is_listing_complete(listing):
+    if not is_listing_complete(listing):
         return json_error("Listing not complete", 400, fields={"listing": "Complete all steps before submitting."})
 
     if user.is_verified:
@@ -710,6 +836,7 @@ def submit_for_verification(listing_id: int):
     else:
         listing.status = "READY"
         msg = "Ready (blocked until owner verification)"
+    sync_listing_index(listing, owner=user)
 
     return _commit_or_500(
         {"message": msg, "listing": listing.to_dict(), "owner_verified": bool(user.is_verified)},
@@ -719,7 +846,7 @@ def submit_for_verification(listing_id: int):
 
 # =========================
 # Resident feed (PUBLISHED only)
-# Supports: city, type, min_price, max_price, limit
+# Supports: city, type, min_price, max_price, limit, cursor (keyset paging)
 # =========================
 # ══ OWNER — Pull (unpublish) a listing ══════════════════════
 @listings_bp.post("/listings/<int:listing_id>/pull")
@@ -744,6 +871,7 @@ def pull_listing(listing_id: int):
 
     listing.status = "READY"
     try:
+        sync_listing_index(listing)
         db.session.commit()
         return jsonify({"message": "Listing unpublished", "status": "READY"}), 200
     except Exception:
@@ -751,168 +879,414 @@ def pull_listing(listing_id: int):
         return json_error("Database error", 500)
 
 
-@listings_bp.get("/listings/feed")
-def resident_feed():
-    city = (request.args.get("city") or "").strip().lower()
-    place_type = (request.args.get("type") or "").strip().lower()
-    min_price = request.args.get("min_price", 0, type=int)
-    max_price = request.args.get("max_price", 0, type=int)
-    limit = request.args.get("limit", 30, type=int)
-    limit = max(1, min(limit, 60))
+def _feed_item(l: Listing, idx: ListingIndex) -> dict:
+    """Resident card payload — scalar fields come from the listing_index row."""
+    d = l.to_dict()
+    loc = d.get("location") or {}
+
+    # Virtual tour URL — stored inside photos JSON as virtualTour.panoUrl
+    vt = d.get("virtualTour") or {}
+    tour_url = vt.get("panoUrl") or vt.get("pano_url") or None
+
+    return {
+        "id": d["id"],
+        "title": d.get("title") or "Untitled space",
+        "place_type": d.get("place_type") or "",
+        "location": loc,
+        "city": loc.get("city") or "",
+        "barangay": loc.get("barangay") or "",
+        "lat": idx.lat,
+        "lng": idx.lng,
+        "price": idx.monthly_rent,
+        "student_discount": d.get("student_discount") or 0,
+        "cover": idx.cover_url,
+        "thumb": idx.cover_thumb,
+        "photos": d.get("photos") or [],
+        "status": d.get("status"),
+        "capacity": d.get("capacity") or {},
+        "amenities": d.get("amenities"),
+        "highlights": d.get("highlights"),
+        "description": d.get("description"),
+        "tour_url": tour_url,
+        "has_tour": bool(tour_url),
+    }
 
+
+def _feed_base_query():
+    """PUBLISHED listings of active owners that aren't already reserved/occupied."""
     from ..models.booking import Booking as _Bk
-    from sqlalchemy import exists
 
     # Exclude listings that already have an APPROVED or ACTIVE booking
     booked_subq = (
         db.session.query(_Bk.listing_id)
         .filter(_Bk.status.in_(["APPROVED", "ACTIVE"]))
-        .subquery()
+    )
+    return (
+        db.session.query(Listing, ListingIndex)
+        .join(ListingIndex, ListingIndex.listing_id == Listing.id)
+        .filter(ListingIndex.status == "PUBLISHED")
+        .filter(ListingIndex.owner_active == True)  # noqa: E712
+        .filter(~ListingIndex.listing_id.in_(booked_subq))
     )
 
-    listings = (
-    Listing.query
-        .join(User, User.id == Listing.owner_id)
-        .filter(Listing.status == "PUBLISHED")
-        .filter(~Listing.id.in_(booked_subq))
-        .filter(User.is_suspended == False)
-        .filter(User.is_active == True)
-        .order_by(Listing.updated_at.desc())
-        .limit(200)
+
+@listings_bp.get("/listings/feed")
+@conditional(catalog_etag)
+@catalog_cached
+def resident_feed():
+    city = normalize_city(request.args.get("city"))
+    place_type = (request.args.get("type") or "").strip().lower()
+    min_price = request.args.get("min_price", 0, type=int)
+    max_price = request.args.get("max_price", 0, type=int)
+    limit = request.args.get("limit", 30, type=int)
+    limit = max(1, min(limit, 60))
+    cursor = (request.args.get("cursor") or "").strip()
+    try:
+        fields = parse_projection(request.args)
+    except ValueError as e:
+        return json_error("Validation failed", 400, fields={"fields": str(e)})
+
+    from sqlalchemy import and_, or_
+
+    # Filter, sort and limit on the flat listing_index projection —
+    # no JSON parsing and no fixed scan window.
+    q = _feed_base_query()
+    if fields:
+        # Sparse fieldset: only the requested columns (+ the sort key) are selected
+        q = q.with_entities(
+            *columns_for(fields),
+            ListingIndex.updated_at.label("_ts"),
+            ListingIndex.listing_id.label("_id"),
+        )
+    if city:
+        # Substring, like the old JSON scan: "manila" finds "Metro Manila".
+        # The display label keeps the "City of" prefix the key drops.
+        raw_city = request.args.get("city").strip()
+        q = q.filter(or_(
+            ListingIndex.city.contains(city, autoescape=True),
+            ListingIndex.city_label.contains(raw_city, autoescape=True),
+        ))
+    if place_type:
+        q = q.filter(ListingIndex.place_type == place_type)
+    if min_price:
+        q = q.filter(ListingIndex.monthly_rent >= min_price)
+    if max_price:
+        q = q.filter(ListingIndex.monthly_rent <= max_price)
+
+    # Keyset pagination — resume strictly after the (updated_at, id) of the
+    # last row the client saw, so page N costs the same as page 1.
+    if cursor:
+        try:
+            after_ts, after_id = decode_cursor(cursor)
+        except ValueError:
+            return json_error("Validation failed", 400, fields={"cursor": "Invalid cursor."})
+        q = q.filter(or_(
+            ListingIndex.updated_at < after_ts,
+            and_(ListingIndex.updated_at == after_ts, ListingIndex.listing_id < after_id),
+        ))
+
+    rows = (
+        q.order_by(ListingIndex.updated_at.desc(), ListingIndex.listing_id.desc())
+        .limit(limit + 1)
         .all()
     )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
-    out = []
-    for l in listings:
-        d = l.to_dict()
+    if fields:
+        next_cursor = encode_cursor(rows[-1]._ts, rows[-1]._id) if has_more else None
+        out = [row_to_dict(r, fields) for r in rows]
+    else:
+        next_cursor = encode_cursor(rows[-1][1].updated_at, rows[-1][1].listing_id) if has_more else None
+        out = [_feed_item(l, idx) for l, idx in rows]
+    return jsonify({"listings": out, "total": len(out), "next_cursor": next_cursor}), 200
 
-        # Filter: city (JSON field)
-        if city:
-            loc_city = ((d.get("location") or {}).get("city") or "").strip().lower()
-            if city not in loc_city:
-                continue
-
-        # Filter: type
-        if place_type:
-            pt = (d.get("place_type") or "").strip().lower()
-            if pt != place_type:
-                continue
-
-        # Extract price: prefer monthly_rent, fall back to price
-        cap = d.get("capacity") or {}
-        price = cap.get("monthly_rent") or cap.get("price") or None
-
-        # Filter: price range
-        if min_price and (price is None or price < min_price):
-            continue
-        if max_price and (price is None or price > max_price):
-            continue
-
-        # Cover photo
-        photos = d.get("photos") or []
-        cover = None
-        if isinstance(photos, list) and photos:
-            cover = photos[0].get("url") if isinstance(photos[0], dict) else photos[0]
 
-        # Virtual tour URL — stored inside photos JSON as virtualTour.panoUrl
-        vt = d.get("virtualTour") or {}
-        tour_url = vt.get("panoUrl") or vt.get("pano_url") or None
+# =========================
+# Resident keyword search — in-process BM25 index (app/utils/search.py)
+# =========================
+@listings_bp.get("/listings/search")
+def search_listings():
+    from ..utils.search import listing_search
 
-        out.append({
-            "id": d["id"],
-            "title": d.get("title") or "Untitled space",
-            "place_type": d.get("place_type") or "",
-            "location": d.get("location") or {},
-            "city": (d.get("location") or {}).get("city") or "",
-            "barangay": (d.get("location") or {}).get("barangay") or "",
-            "price": price,
-            "student_discount": d.get("student_discount") or 0,
-            "cover": cover,
-            "photos": d.get("photos") or [],
-            "status": d.get("status"),
-            "capacity": cap,
-            "amenities": d.get("amenities"),
-            "highlights": d.get("highlights"),
-            "description": d.get("description"),
-            "tour_url": tour_url,
-            "has_tour": bool(tour_url),
-        })
+    q = (request.args.get("q") or "").strip()
+    limit = request.args.get("limit", 20, type=int)
+    limit = max(1, min(limit, 60))
+    if not q:
+        return json_error("Validation failed", 400, fields={"q": "q is required"})
+    if len(q) > 200:
+        return json_error("Validation failed", 400, fields={"q": "Max 200 characters."})
 
-        if len(out) >= limit:
-            break
+    listing_search.refresh()
+    # Over-fetch a little: hits may have been reserved or pulled since indexing
+    hits = listing_search.search(q, limit=limit * 2)
+    if not hits:
+        return jsonify({"listings": [], "total": 0, "q": q}), 200
 
-    return jsonify({"listings": out, "total": len(out)}), 200
+    scores = dict(hits)
+    rows = _feed_base_query().filter(ListingIndex.listing_id.in_(scores)).all()
+    rows.sort(key=lambda r: scores[r[1].listing_id], reverse=True)
 
-# ══ ADMIN — All listings (paginated, filterable) ══════════════
-@listings_bp.get("/admin/listings")
-@require_role("ADMIN")
-def admin_list_listings():
-    from ..models.booking import Booking as _Bk2
-    page = request.args.get("page", 1, type=int)
-    per_page = min(request.args.get("per_page", 20, type=int), 100)
-    status_filter = (request.args.get("status") or "").strip().upper() or None
-    city_q = (request.args.get("city") or "").strip().lower()
-    owner_q = (request.args.get("owner") or "").strip().lower()
+    out = []
+    for l, idx in rows[:limit]:
+        item = _feed_item(l, idx)
+        item["score"] = round(scores[idx.listing_id], 4)
+        out.append(item)
+    return jsonify({"listings": out, "total": len(out), "q": q}), 200
+
+
+# =========================
+# Map queries — geohash-covered range scans on listing_index
+# =========================
+def _in_cells(q, cells):
+    from sqlalchemy import or_
+
+    cells = [c for c in cells if c]
+    if not cells:
+        return q.filter(ListingIndex.geohash.isnot(None))
+    return q.filter(or_(*[ListingIndex.geohash.startswith(c) for c in cells]))
+
+
+def _hydrate(ids) -> dict:
+    rows = _feed_base_query().filter(ListingIndex.listing_id.in_(ids)).all()
+    return {idx.listing_id: _feed_item(l, idx) for l, idx in rows}
 
-    q = Listing.query
-    if status_filter:
-        q = q.filter(Listing.status == status_filter)
 
-    all_listings = q.order_by(Listing.updated_at.desc()).all()
+@listings_bp.get("/listings/near")
+def listings_near():
+    """Published listings within radius_km of (lat, lng), nearest first."""
+    coords = parse_coord(request.args.get("lat"), request.args.get("lng"))
+    radius = request.args.get("radius_km", 2.0, type=float)
+    limit = max(1, min(request.args.get("limit", 30, type=int), 100))
+    place_type = (request.args.get("type") or "").strip().lower()
 
+    fields = {}
+    if not coords:
+        fields["lat"] = "lat and lng are required."
+    if radius is None or not (0 < radius <= 50):
+        fields["radius_km"] = "radius_km must be between 0 and 50."
+    if fields:
+        return json_error("Validation failed", 400, fields=fields)
+    lat, lng = coords
+
+    # Candidate cells → (id, lat, lng) tuples only; rank in Python, hydrate the page
+    cand = _feed_base_query().with_entities(ListingIndex.listing_id, ListingIndex.lat, ListingIndex.lng)
+    cand = _in_cells(cand, cover_bbox(radius_bbox(lat, lng, radius)))
+    if place_type:
+        cand = cand.filter(ListingIndex.place_type == place_type)
+    cand = cand.all()
+
+    dists = haversine_many(lat, lng, [(r[1], r[2]) for r in cand])
+    ranked = sorted(
+        ((d, r[0]) for d, r in zip(dists, cand) if d <= radius),
+        key=lambda t: (t[0], t[1]),
+    )[:limit]
+
+    items = _hydrate([lid for _, lid in ranked])
     out = []
-    for l in all_listings:
-        d = l.to_dict()
-        loc = d.get("location") or {}
-        city = (loc.get("city") or "").lower()
-        cap = d.get("capacity") or {}
-        price = cap.get("monthly_rent") or cap.get("price") or None
+    for d, lid in ranked:
+        item = items.get(lid)
+        if item:
+            item["distance_km"] = round(d, 3)
+            out.append(item)
+    return jsonify({
+        "listings": out,
+        "total": len(out),
+        "center": {"lat": lat, "lng": lng},
+        "radius_km": radius,
+    }), 200
 
-        if city_q and city_q not in city:
-            continue
 
-        photos = d.get("photos") or []
-        cover = None
-        if isinstance(photos, list) and photos:
-            cover = photos[0].get("url") if isinstance(photos[0], dict) else photos[0]
+@listings_bp.get("/listings/bbox")
+def listings_in_bbox():
+    """Published listings pinned inside a map viewport (bbox=min_lng,min_lat,max_lng,max_lat)."""
+    bbox = parse_bbox(request.args.get("bbox"))
+    limit = max(1, min(request.args.get("limit", 100, type=int), 200))
+    if not bbox:
+        return json_error("Validation failed", 400,
+                          fields={"bbox": "Expected min_lng,min_lat,max_lng,max_lat."})
+    min_lng, min_lat, max_lng, max_lat = bbox
+
+    q = _in_cells(_feed_base_query(), cover_bbox(bbox))
+    rows = (
+        q.filter(ListingIndex.lat.between(min_lat, max_lat))
+        .filter(ListingIndex.lng.between(min_lng, max_lng))
+        .order_by(ListingIndex.updated_at.desc(), ListingIndex.listing_id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    truncated = len(rows) > limit
+    out = [_feed_item(l, idx) for l, idx in rows[:limit]]
+    return jsonify({"listings": out, "total": len(out), "truncated": truncated}), 200
+
+
+@listings_bp.get("/listings/clusters")
+def listing_clusters():
+    """
+    Map markers aggregated on the server: one entry per geohash cell of the
+    zoom level's grid (count, price range, centroid). Output size depends on
+    the viewport and zoom, not on how many listings exist.
+    """
+    from sqlalchemy import func
+
+    bbox = parse_bbox(request.args.get("bbox"))
+    zoom = request.args.get("zoom", type=int)
+    if not bbox or zoom is None or not (0 <= zoom <= 22):
+        fields = {}
+        if not bbox:
+            fields["bbox"] = "Expected min_lng,min_lat,max_lng,max_lat."
+        if zoom is None or not (0 <= zoom <= 22):
+            fields["zoom"] = "zoom must be an integer 0-22."
+        return json_error("Validation failed", 400, fields=fields)
+    min_lng, min_lat, max_lng, max_lat = bbox
+    precision = cluster_precision(bbox, zoom)
+
+    cell = func.substr(ListingIndex.geohash, 1, precision)
+    q = _feed_base_query().with_entities(
+        cell.label("cell"),
+        func.count(ListingIndex.listing_id),
+        func.min(ListingIndex.monthly_rent),
+        func.max(ListingIndex.monthly_rent),
+        func.avg(ListingIndex.lat),
+        func.avg(ListingIndex.lng),
+        func.min(ListingIndex.listing_id),
+    )
+    rows = (
+        _in_cells(q, cover_bbox(bbox))
+        .filter(ListingIndex.lat.between(min_lat, max_lat))
+        .filter(ListingIndex.lng.between(min_lng, max_lng))
+        .group_by(cell)
+        .all()
+    )
 
-        # Get owner info
-        from ..models.user import User as _User
-        owner = db.session.get(_User, l.owner_id)
-        owner_name = ""
-        owner_email = ""
-        if owner:
-            owner_name = f"{owner.first_name or ''} {owner.last_name or ''}".strip() or owner.email
-            owner_email = owner.email or ""
+    clusters = []
+    for key, count, price_min, price_max, lat, lng, first_id in rows:
+        clusters.append({
+            "key": key,
+            "count": int(count),
+            "price_min": price_min,
+            "price_max": price_max,
+            "lat": round(float(lat), 6),
+            "lng": round(float(lng), 6),
+            # Single-listing cells can be drawn as a plain marker
+            "listing_id": first_id if count == 1 else None,
+        })
+    return jsonify({
+        "clusters": clusters,
+        "total": sum(c["count"] for c in clusters),
+        "zoom": zoom,
+        "precision": precision,
+    }), 200
 
-        if owner_q and owner_q not in owner_name.lower() and owner_q not in owner_email.lower():
-            continue
+# ══ ADMIN — All listings (paginated, filterable) ══════════════
+@listings_bp.get("/admin/listings")
+@require_role("ADMIN")
+def admin_list_listings():
+    """
+    Filters, count and paging all run in SQL over listing_index ⨝ listings ⨝
+    users. Pass ?cursor= (from next_cursor) for keyset paging with constant
+    page cost; ?page= still works for the numbered pager.
+    """
+    from sqlalchemy import and_, func, or_
+    from ..models.booking import Booking as _Bk2
 
-        # Latest booking status
-        latest_bk = _Bk2.query.filter_by(listing_id=l.id).order_by(_Bk2.created_at.desc()).first()
+    page = max(1, request.args.get("page", 1, type=int))
+    per_page = max(1, min(request.args.get("per_page", 20, type=int), 100))
+    status_filter = (request.args.get("status") or "").strip().upper() or None
+    city_q = normalize_city(request.args.get("city"))
+    owner_q = (request.args.get("owner") or "").strip()
+    cursor = (request.args.get("cursor") or "").strip()
+
+    q = (
+        db.session.query(
+            Listing.id, Listing.title, Listing.status, Listing.place_type, Listing.owner_id,
+            Listing.created_at, Listing.updated_at,
+            ListingIndex.city_label, ListingIndex.barangay_label,
+            ListingIndex.monthly_rent, ListingIndex.cover_url, ListingIndex.updated_at.label("sort_ts"),
+            User.first_name, User.last_name, User.email,
+        )
+        .select_from(ListingIndex)
+        .join(Listing, Listing.id == ListingIndex.listing_id)
+        .join(User, User.id == ListingIndex.owner_id)
+    )
+    if status_filter:
+        q = q.filter(ListingIndex.status == status_filter)
+    if city_q:
+        q = q.filter(ListingIndex.city.contains(city_q, autoescape=True))
+    if owner_q:
+        full_name = func.coalesce(User.first_name, "") + " " + func.coalesce(User.last_name, "")
+        q = q.filter(or_(
+            full_name.contains(owner_q, autoescape=True),
+            User.email.contains(owner_q, autoescape=True),
+        ))
+
+    total = q.order_by(None).with_entities(func.count(ListingIndex.listing_id)).scalar() or 0
+
+    if cursor:
+        try:
+            after_ts, after_id = decode_cursor(cursor)
+        except ValueError:
+            return json_error("Validation failed", 400, fields={"cursor": "Invalid cursor."})
+        q = q.filter(or_(
+            ListingIndex.updated_at < after_ts,
+            and_(ListingIndex.updated_at == after_ts, ListingIndex.listing_id < after_id),
+        ))
+
+    q = q.order_by(ListingIndex.updated_at.desc(), ListingIndex.listing_id.desc())
+    if not cursor:
+        q = q.offset((page - 1) * per_page)
+    rows = q.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = encode_cursor(rows[-1].sort_ts, rows[-1].id) if has_more else None
+
+    # Latest booking per listing on this page — one windowed query
+    latest = {}
+    if rows:
+        ranked = (
+            db.session.query(
+                _Bk2.listing_id.label("listing_id"),
+                _Bk2.status.label("status"),
+                func.row_number().over(
+                    partition_by=_Bk2.listing_id,
+                    order_by=(_Bk2.created_at.desc(), _Bk2.id.desc()),
+                ).label("rn"),
+            )
+            .filter(_Bk2.listing_id.in_([r.id for r in rows]))
+            .subquery()
+        )
+        latest = dict(
+            db.session.query(ranked.c.listing_id, ranked.c.status).filter(ranked.c.rn == 1).all()
+        )
 
+    out = []
+    for r in rows:
+        owner_name = f"{r.first_name or ''} {r.last_name or ''}".strip() or r.email
         out.append({
-            "id": d["id"],
-            "title": d.get("title") or "Untitled",
-            "status": d.get("status"),
-            "place_type": d.get("place_type") or "",
-            "city": loc.get("city") or "",
-            "barangay": loc.get("barangay") or "",
-            "price": price,
-            "cover": cover,
-            "owner_id": l.owner_id,
+            "id": r.id,
+            "title": r.title or "Untitled",
+            "status": r.status,
+            "place_type": r.place_type or "",
+            "city": r.city_label or "",
+            "barangay": r.barangay_label or "",
+            "price": r.monthly_rent,
+            "monthly_rent": r.monthly_rent,
+            "cover": r.cover_url,
+            "owner_id": r.owner_id,
             "owner_name": owner_name,
-            "owner_email": owner_email,
-            "booking_status": latest_bk.status if latest_bk else None,
-            "created_at": d.get("created_at"),
-            "updated_at": d.get("updated_at"),
+            "owner_email": r.email or "",
+            "booking_status": latest.get(r.id),
+            "created_at": r.created_at.isoformat() if r.created_at else None,
+            "updated_at": r.updated_at.isoformat() if r.updated_at else None,
         })
 
-    total = len(out)
-    start = (page - 1) * per_page
-    paginated = out[start:start + per_page]
-
-    return jsonify({"listings": paginated, "total": total, "page": page, "per_page": per_page}), 200
+    return jsonify({
+        "listings": out,
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "next_cursor": next_cursor,
+    }), 200
 
 
 @listings_bp.post("/admin/listings/<int:listing_id>/status")
@@ -930,6 +1304,7 @@ def admin_update_listing_status(listing_id: int):
 
     listing.status = new_status
     try:
+        sync_listing_index(listing)
         db.session.commit()
         return jsonify({"message": f"Listing status set to {new_status}", "status": new_status}), 200
     except Exception:
@@ -939,48 +1314,29 @@ def admin_update_listing_status(listing_id: int):
 # =========================
 # PUBLIC STATS — no auth required
 # Used by the roles page to show live platform numbers
-# Cached in-memory for 5 minutes to avoid DB hammering
+# Counts come from the counters table (kept exact by flush hooks in
+# models/counter.py); min price is an index lookup on listing_index.
 # =========================
-import time as _time
-
-_stats_cache = {"data": None, "ts": 0}
-_STATS_TTL   = 300  # 5 minutes
-
 @listings_bp.get("/public/stats")
 def public_stats():
-    now = _time.time()
-    if _stats_cache["data"] and now - _stats_cache["ts"] < _STATS_TTL:
-        return jsonify(_stats_cache["data"]), 200
-
-    from ..models.user import User
+    from sqlalchemy import func
+    from ..models.counter import (
+        OWNER_USERS, PUBLISHED_LISTINGS, RESIDENT_USERS, get_counters,
+    )
 
-    total_listings  = Listing.query.filter(Listing.status == "PUBLISHED").count()
-    total_owners    = User.query.filter(User.role == "OWNER").count()
-    total_residents = User.query.filter(User.role == "RESIDENT").count()
+    counts = get_counters(PUBLISHED_LISTINGS, OWNER_USERS, RESIDENT_USERS)
 
-    # Lowest price across published listings (from capacity JSON)
-    published = (
-        Listing.query
-        .filter(Listing.status == "PUBLISHED")
-        .limit(200)
-        .all()
+    # MIN over the (status, monthly_rent) index — a single index seek
+    min_price = (
+        db.session.query(func.min(ListingIndex.monthly_rent))
+        .filter(ListingIndex.status == "PUBLISHED", ListingIndex.monthly_rent.isnot(None))
+        .scalar()
     )
-    prices = []
-    for l in published:
-        cap = l.capacity or {}
-        if isinstance(cap, dict):
-            p = cap.get("monthly_rent") or cap.get("price")
-            if p and isinstance(p, (int, float)) and p > 0:
-                prices.append(p)
-
-    min_price = int(min(prices)) if prices else None
 
     data = {
-        "total_listings":   total_listings,
-        "total_owners":     total_owners,
-        "total_residents":  total_residents,
-        "min_price":        min_price,
+        "total_listings":   counts[PUBLISHED_LISTINGS],
+        "total_owners":     counts[OWNER_USERS],
+        "total_residents":  counts[RESIDENT_USERS],
+        "min_price":        int(min_price) if min_price else None,
     }
-    _stats_cache["data"] = data
-    _stats_cache["ts"]   = now
-    return jsonify(data), 200
\ No newline at end of file
+    return jsonify(data), 200
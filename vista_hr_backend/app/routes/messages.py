@@ -2,171 +2,252 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 from flask import Blueprint, request, jsonify, g
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, case, func
 from sqlalchemy.exc import SQLAlchemyError
 
 from ..extensions import db
 from ..models import Message, Listing, User
-from ..models.message import MESSAGE_MAX_LENGTH, ArchivedConversation
+from ..models.message import MESSAGE_MAX_LENGTH
+from ..models.conversation_thread import (
+    ConversationThread, find_thread, record_message, mark_thread_read,
+    clear_thread, set_thread_archived, inbox_filter, other_user_column, unread_total,
+)
 from ..auth.jwt import require_role
-from ..routes.notifications import create_notification
+from ..utils.notify import notify
 from ..utils.errors import json_error
+from ..utils.cursor import encode_cursor, decode_cursor
+from ..utils.etag import conditional
+from ..utils.realtime import publish, publish_on_commit
+from ..utils import presence
 
 messages_bp = Blueprint("messages", __name__)
 
 
-def _other_user_id(msg, me_id):
-    """Return the ID of the other participant in a message."""
-    return msg.receiver_id if msg.sender_id == me_id else msg.sender_id
+def _thread_filter(me_id, listing_id, other_user_id):
+    """Messages of one thread that are still visible to me."""
+    return and_(
+        Message.listing_id == listing_id,
+        or_(
+            and_(Message.sender_id == me_id,         Message.receiver_id == other_user_id,
+                 Message.deleted_by_sender == False),
+            and_(Message.sender_id == other_user_id, Message.receiver_id == me_id,
+                 Message.deleted_by_receiver == False),
+        ),
+    )
+
+
+def _ints(row):
+    return tuple(int(v or 0) for v in row)
 
 
-def _my_messages_query(me_id):
-    """Base query: all messages where I am sender or receiver."""
-    return Message.query.filter(
-        or_(Message.sender_id == me_id, Message.receiver_id == me_id)
+def _inbox_version():
+    """
+    Thread count + revision sum over my summary rows. Names and avatars
+    shown in the inbox are covered by the catalog version.
+    """
+    from ..models.counter import catalog_version
+
+    me_id = g.current_user.id
+    T = ConversationThread
+    row = (
+        db.session.query(func.count(T.id), func.sum(T.rev), func.max(T.id))
+        .filter(or_(T.user_lo == me_id, T.user_hi == me_id))
+        .one()
+    )
+    return _ints(row), catalog_version()
+
+
+def _thread_version(listing_id, other_user_id):
+    """
+    The thread summary's revision — bumped by every send, read marking and
+    delete in the thread, so read receipts on my messages are covered too.
+    Threads without a summary row fall back to aggregates over messages.
+    """
+    from ..models.counter import catalog_version
+
+    me_id = g.current_user.id
+    thread = find_thread(listing_id, me_id, other_user_id)
+    if thread is not None:
+        return (thread.id, thread.rev, bool(thread.get("deleted", me_id))), catalog_version()
+
+    row = (
+        db.session.query(
+            func.count(Message.id),
+            func.max(Message.id),
+            func.sum(case((and_(Message.sender_id == me_id, Message.is_read == True), 1), else_=0)),
+        )
+        .filter(_thread_filter(me_id, listing_id, other_user_id))
+        .one()
     )
+    return _ints(row), catalog_version()
+
+
+def _int_arg(name):
+    """Positive int query arg, None when absent. Raises ValueError when malformed."""
+    raw = (request.args.get(name) or "").strip()
+    if not raw:
+        return None
+    value = int(raw)
+    if value < 0:
+        raise ValueError(name)
+    return value
 
 
 # ══════════════════════════════════════════════
 # GET /messages/conversations
-# List all conversation threads for the current user
+# List conversation threads for the current user
+# Supports: archived, limit, cursor (keyset paging, newest first)
 # ══════════════════════════════════════════════
 @messages_bp.get("/messages/conversations")
 @require_role("OWNER", "RESIDENT")
+@conditional(_inbox_version)
 def list_conversations():
     me = g.current_user
-
-    # Get all messages involving me
-    all_msgs = (
-        _my_messages_query(me.id)
-        .order_by(Message.created_at.desc())
-        .all()
-    )
+    T  = ConversationThread
 
     show_archived = request.args.get("archived", "").lower() == "true"
+    try:
+        limit = min(max(int(request.args.get("limit", 50)), 1), 100)
+    except (TypeError, ValueError):
+        return json_error("Validation failed", 400, fields={"limit": "Must be an integer."})
+
+    other_id = other_user_column(me.id)
+    q = (
+        db.session.query(T, User)
+        .join(User, User.id == other_id)
+        .filter(inbox_filter(me.id, show_archived))
+    )
 
-    # Load archived thread keys for this user
-    archived_rows = ArchivedConversation.query.filter_by(user_id=me.id).all()
-    archived_keys = {(r.listing_id, r.other_user_id) for r in archived_rows}
-
-    # Group into unique (listing_id, other_user_id) threads
-    seen = {}
-    for msg in all_msgs:
-        # Skip messages deleted by this user
-        is_sender = msg.sender_id == me.id
-        if is_sender and bool(msg.deleted_by_sender): continue
-        if not is_sender and bool(msg.deleted_by_receiver): continue
-
-        other_id = _other_user_id(msg, me.id)
-        key = (msg.listing_id, other_id)
-        if key not in seen:
-            seen[key] = msg  # most recent message per thread
+    cursor = (request.args.get("cursor") or "").strip()
+    if cursor:
+        try:
+            after_ts, after_id = decode_cursor(cursor)
+        except ValueError:
+            return json_error("Validation failed", 400, fields={"cursor": "Invalid cursor."})
+        q = q.filter(or_(
+            T.last_at < after_ts,
+            and_(T.last_at == after_ts, T.id < after_id),
+        ))
+
+    rows = q.order_by(T.last_at.desc(), T.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
     threads = []
-    for (listing_id, other_id), last_msg in seen.items():
-        # Unread count — messages FROM other TO me that are unread
-        unread = Message.query.filter_by(
-            listing_id=listing_id,
-            sender_id=other_id,
-            receiver_id=me.id,
-            is_read=False,
-        ).count()
-
-        other_user = db.session.get(User, other_id)
-        listing    = db.session.get(Listing, listing_id)
-
-        if not other_user or not listing:
-            continue
-
+    for thread, other_user in rows:
         first = (other_user.first_name or "").strip()
         last  = (other_user.last_name  or "").strip()
         other_name = f"{first} {last}".strip() or other_user.email
         initials = ((first[:1] + last[:1]) if first or last else other_user.email[:2]).upper()
-
-        location = listing.location or {}
-        city     = location.get("city", "")
-        capacity = listing.capacity or {}
-        rent     = capacity.get("monthly_rent")
-        rent_str = f"₱{int(rent):,}/mo" if rent else ""
-        prop_meta = f"{city} · {rent_str}".strip(" ·") if city or rent_str else ""
-
-        photos = listing.photos or []
-        cover = None
-        if isinstance(photos, list) and photos:
-            cover = photos[0].get("url") if isinstance(photos[0], dict) else photos[0]
-
-        other_role     = other_user.role.value if hasattr(other_user.role, "value") else str(other_user.role)
-        listing_status = listing.status.value if hasattr(listing.status, "value") else str(listing.status)
+        other_role = other_user.role.value if hasattr(other_user.role, "value") else str(other_user.role)
 
         threads.append({
-            "listing_id":      listing_id,
-            "other_user_id":   other_id,
+            "listing_id":      thread.listing_id,
+            "other_user_id":   other_user.id,
             "other_name":      other_name,
             "initials":        initials,
             "other_email":     other_user.email,
             "other_phone":     other_user.phone or "",
             "other_role":      other_role,
             "other_avatar":    other_user.avatar_url or "",
-            "unread":          unread,
-            "last_message":    last_msg.text,
-            "last_time":       last_msg.created_at.isoformat() if last_msg.created_at else None,
-            "listing_title":   listing.title or f"Listing #{listing_id}",
-            "listing_meta":    prop_meta,
-            "listing_status":  listing_status,
-            "listing_cover":   cover,
+            "unread":          thread.get("unread", me.id),
+            "last_message":    thread.last_text,
+            "last_time":       thread.last_at.isoformat() if thread.last_at else None,
+            "listing_title":   thread.listing_title or f"Listing #{thread.listing_id}",
+            "listing_meta":    thread.listing_meta or "",
+            "listing_status":  thread.listing_status,
+            "listing_cover":   thread.listing_cover,
+            "is_archived":     show_archived,
         })
 
-    # Filter by archived status
-    threads = [
-        t for t in threads
-        if show_archived == ((t["listing_id"], t["other_user_id"]) in archived_keys)
-    ]
-    # Add archived flag to each thread
-    for t in threads:
-        t["is_archived"] = (t["listing_id"], t["other_user_id"]) in archived_keys
-
-    # Sort by last message time descending
-    threads.sort(key=lambda t: t["last_time"] or "", reverse=True)
-    return jsonify({"conversations": threads}), 200
+    next_cursor = encode_cursor(rows[-1][0].last_at, rows[-1][0].id) if has_more else None
+    return jsonify({"conversations": threads, "next_cursor": next_cursor}), 200
 
 
 # ══════════════════════════════════════════════
 # GET /messages/conversations/<listing_id>/<other_user_id>
-# Fetch all messages in a specific thread
+# Fetch messages in a specific thread
+#   (no args)           → whole thread
+#   ?limit=N            → newest N
+#   ?before_id=X&limit= → N older than X (history paging)
+#   ?after_id=X         → only messages newer than X (polling)
+# read_upto is the newest of my messages the other side has read.
 # ══════════════════════════════════════════════
 @messages_bp.get("/messages/conversations/<int:listing_id>/<int:other_user_id>")
 @require_role("OWNER", "RESIDENT")
+@conditional(_thread_version)
 def get_thread(listing_id: int, other_user_id: int):
     me = g.current_user
 
-    messages = (
-        Message.query
-        .filter(
-            Message.listing_id == listing_id,
-            or_(
-                and_(Message.sender_id == me.id,         Message.receiver_id == other_user_id,
-                     Message.deleted_by_sender == False),
-                and_(Message.sender_id == other_user_id, Message.receiver_id == me.id,
-                     Message.deleted_by_receiver == False),
-            )
-        )
-        .order_by(Message.created_at.asc())
-        .all()
-    )
-
-    # Mark all unread messages from other user as read
-    unread_ids = [m.id for m in messages if m.sender_id == other_user_id and not m.is_read]
-    if unread_ids:
-        Message.query.filter(Message.id.in_(unread_ids)).update(
-            {"is_read": True}, synchronize_session=False
+    try:
+        after_id  = _int_arg("after_id")
+        before_id = _int_arg("before_id")
+        limit     = _int_arg("limit")
+    except ValueError:
+        return json_error(
+            "Validation failed", 400,
+            fields={"after_id": "after_id, before_id and limit must be non-negative integers."},
         )
+    if after_id is not None and before_id is not None:
+        return json_error("Use either after_id or before_id, not both.", 400)
+    if before_id is not None and limit is None:
+        limit = 50
+    if limit is not None:
+        limit = min(max(limit, 1), 200)
+
+    q = Message.query.filter(_thread_filter(me.id, listing_id, other_user_id))
+    has_more = False
+    if after_id is not None:
+        q = q.filter(Message.id > after_id).order_by(Message.id.asc())
+        if limit is not None:
+            q = q.limit(limit)
+        messages = q.all()
+    elif limit is not None:
+        if before_id is not None:
+            q = q.filter(Message.id < before_id)
+        messages = q.order_by(Message.id.desc()).limit(limit + 1).all()
+        has_more = len(messages) > limit
+        messages = messages[:limit][::-1]
+    else:
+        messages = q.order_by(Message.id.asc()).all()
+    # Serialize before the commit below expires the loaded rows
+    payload = [m.to_dict(me_id=me.id) for m in messages]
+
+    # Opening the thread reads everything the other user sent me. The summary
+    # row says whether there's anything to mark, so polls don't write.
+    thread = find_thread(listing_id, me.id, other_user_id)
+    if thread is None or thread.get("unread", me.id):
+        Message.query.filter(
+            Message.listing_id == listing_id,
+            Message.sender_id == other_user_id,
+            Message.receiver_id == me.id,
+            Message.is_read == False,
+        ).update({"is_read": True}, synchronize_session=False)
+        mark_thread_read(thread, me.id)
+        seen_upto = thread.last_message_id if thread is not None else None
+        publish_on_commit(other_user_id, "read", {
+            "listing_id": listing_id, "other_user_id": me.id, "read_upto": seen_upto,
+        })
         try:
             db.session.commit()
         except SQLAlchemyError:
             db.session.rollback()
 
+    read_upto = (
+        db.session.query(func.max(Message.id))
+        .filter(
+            Message.listing_id == listing_id,
+            Message.sender_id == me.id,
+            Message.receiver_id == other_user_id,
+            Message.is_read == True,
+        )
+        .scalar()
+    )
+
     return jsonify({
-        "messages": [m.to_dict(me_id=me.id) for m in messages]
+        "messages":  payload,
+        "read_upto": read_upto,
+        "has_more":  has_more,
     }), 200
 
 
@@ -177,31 +258,36 @@ def get_thread(listing_id: int, other_user_id: int):
 @messages_bp.post("/messages/typing")
 @require_role("OWNER", "RESIDENT")
 def set_typing():
-    """POST { receiver_id, listing_id } — marks sender as typing for 4s."""
-    from datetime import timedelta
+    """POST { receiver_id, listing_id } — marks sender as typing for 4s (in memory)."""
     me   = g.current_user
     data = request.get_json(silent=True) or {}
-    me.typing_until = datetime.now(timezone.utc) + timedelta(seconds=4)
-    try:
-        db.session.commit()
-    except SQLAlchemyError:
-        db.session.rollback()
+
+    receiver_id = data.get("receiver_id") or data.get("other_user_id")
+    listing_id  = data.get("listing_id")
+    if not isinstance(receiver_id, int) or receiver_id == me.id:
+        receiver_id = None
+    if not isinstance(listing_id, int):
+        listing_id = None
+
+    presence.set_typing(me.id, receiver_id, listing_id)
+    if receiver_id:
+        publish(receiver_id, "typing", {
+            "user_id": me.id, "listing_id": listing_id, "expires_in": presence.TYPING_TTL,
+        })
     return jsonify({"ok": True}), 200
 
 
 @messages_bp.get("/messages/typing/<int:other_user_id>")
 @require_role("OWNER", "RESIDENT")
 def get_typing(other_user_id: int):
-    """GET — returns whether other_user is currently typing."""
-    other = db.session.get(User, other_user_id)
-    if not other:
-        return jsonify({"is_typing": False}), 200
-    if other.typing_until is None:
-        is_typing = False
-    else:
-        until = other.typing_until if other.typing_until.tzinfo else other.typing_until.replace(tzinfo=timezone.utc)
-        is_typing = until > datetime.now(timezone.utc)
-    return jsonify({"is_typing": is_typing}), 200
+    """GET [?listing_id=] — is other_user typing to me, plus their online state."""
+    listing_id = request.args.get("listing_id", type=int)
+    seen = presence.last_seen(other_user_id)
+    return jsonify({
+        "is_typing": presence.is_typing(other_user_id, g.current_user.id, listing_id),
+        "online":    presence.is_online(other_user_id),
+        "last_seen": datetime.fromtimestamp(seen, timezone.utc).isoformat() if seen else None,
+    }), 200
 
 
 @messages_bp.post("/messages")
@@ -248,16 +334,24 @@ def send_message():
 
     try:
         db.session.add(msg)
-        db.session.commit()
-        # Notify the receiver in-app
+        record_message(msg, listing)
+        presence.clear_typing(me.id, receiver_id)
+        # Receiver + the sender's other open tabs
+        for uid, other_id in ((receiver_id, me.id), (me.id, receiver_id)):
+            publish_on_commit(uid, "message", {
+                "listing_id": listing_id, "other_user_id": other_id,
+                "message": msg.to_dict(me_id=uid),
+            })
+        # Notify the receiver in-app — same commit as the message
         sender_name = f"{me.first_name or ''} {me.last_name or ''}".strip() or me.email
         listing_title = listing.title or f"Listing #{listing_id}"
-        create_notification(
+        notify(
             user_id=receiver_id,
             notif_type="NEW_MESSAGE",
             title=f"New message from {sender_name}",
             body=f'Re: {listing_title} — "{text[:60]}{"…" if len(text) > 60 else ""}"',
         )
+        db.session.commit()
 
         return jsonify({
             "message": "Sent",
@@ -276,12 +370,7 @@ def send_message():
 @require_role("OWNER", "RESIDENT")
 def unread_count():
     me = g.current_user
-    count = Message.query.filter_by(
-        receiver_id=me.id,
-        is_read=False,
-        deleted_by_receiver=False,
-    ).count()
-    return jsonify({"unread": count}), 200
+    return jsonify({"unread": unread_total(me.id)}), 200
 
 # ══════════════════════════════════════════════
 # DELETE /messages/conversations/<lid>/<oid>
@@ -316,12 +405,10 @@ def delete_conversation(listing_id: int, other_user_id: int):
         else:
             msg.deleted_by_receiver = True
 
-    # Also remove archive entry if it exists
-    ArchivedConversation.query.filter_by(
-        user_id=me.id,
-        listing_id=listing_id,
-        other_user_id=other_user_id,
-    ).delete()
+    # Hide the thread (and drop its archive state) for me
+    thread = find_thread(listing_id, me.id, other_user_id)
+    if thread is not None:
+        clear_thread(thread, me.id)
 
     try:
         db.session.commit()
@@ -341,23 +428,14 @@ def archive_conversation(listing_id: int, other_user_id: int):
     """Archive a thread for the current user. Hides it from main inbox."""
     me = g.current_user
 
-    existing = ArchivedConversation.query.filter_by(
-        user_id=me.id,
-        listing_id=listing_id,
-        other_user_id=other_user_id,
-    ).first()
-
-    if existing:
+    thread = find_thread(listing_id, me.id, other_user_id)
+    if thread is None or thread.get("deleted", me.id):
+        return json_error("Conversation not found.", 404)
+    if thread.get("archived", me.id):
         return json_error("Conversation already archived.", 400)
 
-    archive = ArchivedConversation(
-        user_id=me.id,
-        listing_id=listing_id,
-        other_user_id=other_user_id,
-    )
-
+    set_thread_archived(thread, me.id, True)
     try:
-        db.session.add(archive)
         db.session.commit()
         return jsonify({"message": "Conversation archived."}), 200
     except SQLAlchemyError:
@@ -375,17 +453,12 @@ def unarchive_conversation(listing_id: int, other_user_id: int):
     """Move a conversation back to the main inbox."""
     me = g.current_user
 
-    row = ArchivedConversation.query.filter_by(
-        user_id=me.id,
-        listing_id=listing_id,
-        other_user_id=other_user_id,
-    ).first()
-
-    if not row:
+    thread = find_thread(listing_id, me.id, other_user_id)
+    if thread is None or not thread.get("archived", me.id):
         return json_error("Conversation is not archived.", 404)
 
+    set_thread_archived(thread, me.id, False)
     try:
-        db.session.delete(row)
         db.session.commit()
         return jsonify({"message": "Conversation unarchived."}), 200
     except SQLAlchemyError:
@@ -1,19 +1,34 @@
 from flask import Blueprint, jsonify, g
+from sqlalchemy import case, func
 
 from ..utils.errors import json_error
 from ..extensions import db
 from ..models.notification import Notification
 from ..auth.jwt import require_role
+from ..utils.etag import conditional
 
 notifications_bp = Blueprint("notifications", __name__)
 
-def create_notification(user_id: int, notif_type: str, title: str, body: str = None):
-    notif = Notification(user_id=user_id, type=notif_type, title=title, body=body)
-    db.session.add(notif)
-    db.session.commit()
+# Notifications are created with utils.notify.notify() / notify_many(),
+# inside the caller's transaction.
+
+def _notifications_version():
+    """(count, max id, unread) — changes on insert, delete and mark-read."""
+    row = (
+        db.session.query(
+            func.count(Notification.id),
+            func.max(Notification.id),
+            func.sum(case((Notification.is_read == False, 1), else_=0)),  # noqa: E712
+        )
+        .filter(Notification.user_id == g.current_user.id)
+        .one()
+    )
+    return tuple(int(v or 0) for v in row)
+
 
 @notifications_bp.get("/notifications")
 @require_role("RESIDENT", "OWNER", "ADMIN")
+@conditional(_notifications_version)
 def get_notifications():
     user = g.current_user
     notifs = (
@@ -23,7 +23,9 @@ from ..models import Listing, Booking
 from ..models.review import Review
 from ..models.user import User
 from ..auth.jwt import require_auth, require_role
+from ..utils.cache import catalog_cached
 from ..utils.errors import json_error
+from ..utils.etag import catalog_etag, conditional
 
 reviews_bp = Blueprint("reviews", __name__)
 
@@ -35,6 +37,8 @@ VALID_TYPES = {"LISTING", "OWNER", "RESIDENT", "SYSTEM"}
 # ══════════════════════════════════════════════════════════════
 
 @reviews_bp.get("/listings/<int:listing_id>/public")
+@conditional(catalog_etag)
+@catalog_cached
 def listing_public(listing_id: int):
     listing = db.session.get(Listing, listing_id)
     if not listing or listing.status != "PUBLISHED":
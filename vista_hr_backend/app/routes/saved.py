@@ -4,8 +4,10 @@ from sqlalchemy.exc import SQLAlchemyError
 from ..extensions import db
 from ..models.saved_listing import SavedListing
 from ..models.listing import Listing
+from ..models.listing_index import ListingIndex
 from ..auth.jwt import require_auth
 from ..utils.errors import json_error
+from ..utils.fields import columns_for, parse_projection, row_to_dict
 
 saved_bp = Blueprint("saved", __name__)
 
@@ -48,6 +50,10 @@ def list_saved():
     page = request.args.get("page", 1, type=int)
     per_page = request.args.get("per_page", 50, type=int)
     per_page = min(per_page, 100)
+    try:
+        fields = parse_projection(request.args, extra=("saved_at",))
+    except ValueError as e:
+        return json_error("Validation failed", 400, fields={"fields": str(e)})
 
     query = (
         db.session.query(SavedListing, Listing)
@@ -58,6 +64,22 @@ def list_saved():
     )
 
     total = query.count()
+
+    if fields:
+        # Sparse fieldset — select only the requested columns
+        results = (
+            query.outerjoin(ListingIndex, ListingIndex.listing_id == Listing.id)
+            .with_entities(*columns_for(fields), SavedListing.saved_at.label("saved_at"))
+            .offset((page - 1) * per_page).limit(per_page).all()
+        )
+        listings = [row_to_dict(r, fields + ["saved_at"]) for r in results]
+        return jsonify({
+            "listings": listings,
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+        }), 200
+
     results = query.offset((page - 1) * per_page).limit(per_page).all()
 
     listings = []
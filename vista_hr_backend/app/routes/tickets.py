@@ -7,7 +7,7 @@ from ..models.ticket import Ticket
 from ..models.user import User
 from ..auth.jwt import require_auth, require_role
 from ..utils.errors import json_error
-from ..routes.notifications import create_notification
+from ..utils.notify import notify
 
 tickets_bp = Blueprint("tickets", __name__)
 
@@ -143,23 +143,23 @@ def admin_update_ticket(ticket_id):
     if new_status:
         ticket.status = new_status
 
-    try:
-        db.session.commit()
-    except SQLAlchemyError:
-        db.session.rollback()
-        return json_error("Database error.", 500)
-
-    # Notify AFTER commit — read status from committed state
+    # Notify in the same commit as the update
     status_val = ticket.status.value if hasattr(ticket.status, "value") else str(ticket.status)
     notif_body = f"Status: {status_val}"
     if reply:
         notif_body += f" — {reply[:100]}"
 
-    create_notification(
+    notify(
         user_id=ticket.user_id,
         notif_type="TICKET",
         title=f"Update on your ticket: {ticket.subject[:60]}",
         body=notif_body,
     )
 
+    try:
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return json_error("Database error.", 500)
+
     return jsonify({"message": "Ticket updated.", "ticket": ticket.to_dict()}), 200
\ No newline at end of file
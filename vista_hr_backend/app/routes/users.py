@@ -6,6 +6,7 @@ import cloudinary.uploader
 
 from ..extensions import db
 from ..models import User
+from ..models.listing_index import sync_owner_listings
 from ..auth.jwt import require_role
 from ..utils.errors import json_error
 
@@ -120,16 +121,126 @@ def split_name(full_name: str):
     return first, last
 
 
+# Admin user list filters: ?status= value → predicate
+_STATUS_FILTERS = {
+    "ACTIVE":      lambda: db.and_(User.is_suspended == False, User.is_verified == True),   # noqa: E712
+    "PENDING":     lambda: db.and_(User.is_suspended == False, User.is_verified == False),  # noqa: E712
+    "SUSPENDED":   lambda: User.is_suspended == True,  # noqa: E712
+    "DEACTIVATED": lambda: User.is_active == False,    # noqa: E712
+}
+
+
 @users_bp.get("/users")
 @require_role("ADMIN")
 def list_users():
-    # Exclude deactivated users by default; ?include_deactivated=true shows all
+    """
+    One page of users, newest first.
+      ?page=1&per_page=20   (max 100)
+      ?q=                   name / email contains
+      ?role=ADMIN|OWNER|RESIDENT
+      ?status=ACTIVE|PENDING|SUSPENDED|DEACTIVATED
+    Deactivated users are excluded unless ?include_deactivated=true or
+    ?status=DEACTIVATED.
+    """
+    page     = max(1, request.args.get("page", 1, type=int))
+    per_page = max(1, min(request.args.get("per_page", 20, type=int), 100))
+    keyword  = (request.args.get("q") or "").strip()
+    role     = (request.args.get("role") or "").strip().upper()
+    status   = (request.args.get("status") or "").strip().upper()
+
+    if role and role not in VALID_ROLES:
+        return json_error(f"Invalid role. Must be one of: {', '.join(sorted(VALID_ROLES))}", 400)
+    if status and status not in _STATUS_FILTERS:
+        return json_error(f"Invalid status. Must be one of: {', '.join(_STATUS_FILTERS)}", 400)
+
     include_deactivated = request.args.get("include_deactivated", "").lower() == "true"
     query = User.query
-    if not include_deactivated:
-        query = query.filter(User.is_active == True)  # noqa: E712
-    users = query.order_by(User.created_at.desc()).all()
-    return jsonify({"users": [serialize_user(u) for u in users]}), 200
+    if status == "DEACTIVATED":
+        query = query.filter(_STATUS_FILTERS[status]())
+    else:
+        if not include_deactivated:
+            query = query.filter(User.is_active == True)  # noqa: E712
+        if status:
+            query = query.filter(_STATUS_FILTERS[status]())
+    if role:
+        query = query.filter(User.role == role)
+    if keyword:
+        like = f"%{keyword}%"
+        query = query.filter(db.or_(
+            User.email.ilike(like),
+            User.first_name.ilike(like),
+            User.last_name.ilike(like),
+            (User.first_name + " " + User.last_name).ilike(like),
+        ))
+
+    total = query.order_by(None).count()
+    users = (
+        query.order_by(User.created_at.desc(), User.id.desc())
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+        .all()
+    )
+    return jsonify({
+        "users":    [serialize_user(u) for u in users],
+        "total":    total,
+        "page":     page,
+        "per_page": per_page,
+        "pages":    max(1, -(-total // per_page)),
+    }), 200
+
+
+# ══════════════════════════════════════════════
+# GET /admin/overview
+# Dashboard counts computed in the database (one aggregate pass over
+# users) plus the newest sign-ups and who is active right now.
+# ══════════════════════════════════════════════
+@users_bp.get("/admin/overview")
+@require_role("ADMIN")
+def admin_overview():
+    from sqlalchemy import case, func
+    from ..utils.presence import active_now
+
+    def _count(cond):
+        return func.coalesce(func.sum(case((cond, 1), else_=0)), 0)
+
+    active = User.is_active == True  # noqa: E712
+    row = db.session.query(
+        _count(active),
+        _count(db.and_(active, User.role == "ADMIN")),
+        _count(db.and_(active, User.role == "OWNER")),
+        _count(db.and_(active, User.role == "RESIDENT")),
+        _count(db.and_(active, User.is_suspended == True)),  # noqa: E712
+        _count(db.and_(active, User.is_suspended == False, User.is_verified == False)),  # noqa: E712
+        _count(User.is_active == False),  # noqa: E712
+        _count(db.and_(active, User.kyc_status == "PENDING")),
+        _count(db.and_(active, User.student_status == "PENDING")),
+    ).one()
+    total, admins, owners, residents, suspended, pending, deactivated, kyc_pending, student_pending = (
+        int(v or 0) for v in row
+    )
+
+    recent = (
+        User.query.filter(active)
+        .order_by(User.created_at.desc(), User.id.desc())
+        .limit(5)
+        .all()
+    )
+
+    return jsonify({
+        "users": {
+            "total":       total,
+            "admins":      admins,
+            "owners":      owners,
+            "residents":   residents,
+            "suspended":   suspended,
+            "pending":     pending,
+            "deactivated": deactivated,
+        },
+        "pending_kyc":     kyc_pending,
+        "pending_student": student_pending,
+        "recent_users":    [serialize_user(u) for u in recent],
+        "active_now":      active_now(),
+    }), 200
 
 
 @users_bp.post("/users")
@@ -254,6 +365,7 @@ def update_user(user_id):
             user.suspension_reason = None
 
     try:
+        sync_owner_listings(user)
         db.session.commit()
         return jsonify({"message": "User updated", "user": serialize_user(user)}), 200
     except SQLAlchemyError:
@@ -299,6 +411,7 @@ def patch_user(user_id: int):
             user.suspension_reason = None
 
     try:
+        sync_owner_listings(user)
         db.session.commit()
         return jsonify({"message": "Updated", "user": serialize_user(user)}), 200
     except Exception:
@@ -325,6 +438,7 @@ def delete_user(user_id):
     user.token_version = int(user.token_version or 0) + 1
 
     try:
+        sync_owner_listings(user)
         db.session.commit()
         return jsonify({"message": "User deactivated", "user": serialize_user(user)}), 200
     except SQLAlchemyError:
@@ -346,6 +460,7 @@ def reactivate_user(user_id: int):
     user.is_active = True
 
     try:
+        sync_owner_listings(user)
         db.session.commit()
         return jsonify({"message": "User reactivated", "user": serialize_user(user)}), 200
     except SQLAlchemyError:
@@ -525,6 +640,7 @@ def deactivate_own_account():
     user.token_version = int(user.token_version or 0) + 1
 
     try:
+        sync_owner_listings(user)
         db.session.commit()
         from flask import make_response
         from ..auth.jwt import clear_auth_cookie
@@ -0,0 +1,110 @@
+"""
+app/utils/booking_expiry.py
+---------------------------
+Scheduled job that expires bookings nobody acted on:
+
+    PENDING            created_at   older than AUTO_CANCEL_PENDING_DAYS   → CANCELLED
+    APPROVED           approved_at  older than AUTO_CANCEL_APPROVED_DAYS  → CANCELLED
+    VIEWING_SCHEDULED  viewing_date in the past                           → VIEWING_DECLINED
+
+Each rule selects a batch of ids through the (status, deadline) index,
+moves them with one UPDATE and queues the notifications and realtime
+events for the same commit. Bulk UPDATEs bypass the ORM flush hooks, so
+the booking events and catalog version bump are done explicitly here.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+
+from ..extensions import db
+from ..models.booking import Booking
+from ..models.listing import Listing
+from .notify import notify
+from .realtime import publish_on_commit
+
+AUTO_CANCEL_PENDING_DAYS  = 3   # PENDING → CANCELLED after 3 days
+AUTO_CANCEL_APPROVED_DAYS = 3   # APPROVED → CANCELLED if no viewing set after 3 days
+
+BATCH_SIZE = 500
+
+
+def _rules(now: datetime):
+    """(from status, deadline column, cutoff, new values, [(recipient, title, body)])"""
+    return (
+        (
+            "PENDING", Booking.created_at, now - timedelta(days=AUTO_CANCEL_PENDING_DAYS),
+            {"status": "CANCELLED",
+             "cancel_reason": "Auto-cancelled: no response from owner within 3 days."},
+            [("resident", "Reservation auto-cancelled",
+              "Your reservation was automatically cancelled after 3 days with no response.")],
+        ),
+        (
+            "APPROVED", Booking.approved_at, now - timedelta(days=AUTO_CANCEL_APPROVED_DAYS),
+            {"status": "CANCELLED",
+             "cancel_reason": "Auto-cancelled: no viewing scheduled within 3 days of approval."},
+            [("resident", "Reservation auto-cancelled",
+              "Your reservation was cancelled — no viewing was scheduled within 3 days.")],
+        ),
+        (
+            "VIEWING_SCHEDULED", Booking.viewing_date, now,
+            {"status": "VIEWING_DECLINED", "viewing_declined_at": now,
+             "viewing_decline_reason": "Auto-declined: viewing date passed with no response."},
+            [("resident", "Reservation auto-cancelled",
+              "Your viewing date has passed with no move-in confirmation."),
+             ("owner", "Viewing expired",
+              "A scheduled viewing has expired with no move-in confirmed.")],
+        ),
+    )
+
+
+def _expire_batch(status, deadline, cutoff, values, notices) -> int:
+    from ..models.counter import bump_catalog_version
+
+    rows = db.session.execute(
+        select(Booking.id, Booking.listing_id, Booking.resident_id, Listing.owner_id)
+        .join(Listing, Listing.id == Booking.listing_id)
+        .where(Booking.status == status, deadline < cutoff)
+        .order_by(deadline)
+        .limit(BATCH_SIZE)
+        # Rows an owner is updating right now are left for the next run
+        .with_for_update(of=Booking, skip_locked=True)
+    ).all()
+    if not rows:
+        db.session.rollback()
+        return 0
+
+    db.session.execute(
+        update(Booking)
+        .where(Booking.id.in_([r.id for r in rows]), Booking.status == status)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    new_status = values["status"]
+    for r in rows:
+        recipients = {"resident": r.resident_id, "owner": r.owner_id}
+        for who, title, body in notices:
+            notify(recipients[who], "BOOKING", title, body)
+        event = {"booking_id": r.id, "listing_id": r.listing_id, "status": new_status}
+        publish_on_commit(r.resident_id, "booking", event)
+        publish_on_commit(r.owner_id, "booking", event)
+    bump_catalog_version()
+    db.session.commit()
+    return len(rows)
+
+
+def expire_stale_bookings(now: datetime = None) -> dict:
+    """Apply every expiry rule until nothing is due. Returns {from status: count}."""
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)   # stored naive UTC
+    done = {}
+    for status, deadline, cutoff, values, notices in _rules(now):
+        total = 0
+        while True:
+            n = _expire_batch(status, deadline, cutoff, values, notices)
+            total += n
+            if n < BATCH_SIZE:
+                break
+        if total:
+            done[status] = total
+    return done
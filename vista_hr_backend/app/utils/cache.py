@@ -0,0 +1,102 @@
+"""
+app/utils/cache.py
+------------------
+Per-worker response cache for public, anonymous-safe GET endpoints.
+
+Entries are keyed by (endpoint, catalog_version, normalized query string),
+so any write that bumps the catalog version (see models/counter.py) makes
+every older entry unreachable — no explicit invalidation is needed. Stale
+entries simply age out of the LRU or hit their TTL.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, request
+
+
+class TTLCache:
+    """Bounded LRU with a per-entry TTL. Thread-safe."""
+
+    def __init__(self, maxsize: int = 512, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 3) if total else None,
+            }
+
+
+# Shared by every catalog_cached endpoint; keys are namespaced per endpoint
+response_cache = TTLCache(maxsize=1024, ttl=300.0)
+
+
+def _normalized_args() -> tuple:
+    """Query params sorted, blanks dropped — ?a=1&b= and ?b=&a=1 share an entry."""
+    return tuple(sorted(
+        (k, v.strip()) for k, vs in request.args.lists() for v in vs if v.strip()
+    ))
+
+
+def catalog_cached(fn):
+    """
+    Cache a public GET view's 200 responses until the catalog changes.
+    Only use on views whose output doesn't depend on who is asking.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        from ..models.counter import catalog_version
+
+        key = (request.endpoint, catalog_version(), tuple(sorted(kwargs.items())), _normalized_args())
+        hit = response_cache.get(key)
+        if hit is not None:
+            return Response(hit, status=200, mimetype="application/json")
+
+        rv = fn(*args, **kwargs)
+        resp, status = (rv if isinstance(rv, tuple) else (rv, 200))[:2]
+        if status == 200 and isinstance(resp, Response):
+            response_cache.set(key, resp.get_data())
+        return rv
+    return wrapper
@@ -0,0 +1,33 @@
+"""
+Opaque keyset-pagination cursors.
+
+A cursor is the (timestamp, id) sort key of the last row on a page, packed
+as url-safe base64 so clients treat it as an opaque token. The next page is
+then a plain indexed range read:  WHERE (ts, id) < (:ts, :id)  — the cost of
+page N doesn't grow with N the way OFFSET does.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+
+
+def encode_cursor(ts: datetime, row_id: int) -> str:
+    # Columns are stored naive-UTC — normalize aware values so comparisons match
+    if ts is not None and ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    raw = json.dumps({"t": ts.isoformat() if ts else None, "i": int(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str):
+    """Return (datetime | None, id). Raises ValueError on a malformed token."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if not isinstance(data, dict):
+            raise ValueError("Invalid cursor")
+        ts = datetime.fromisoformat(data["t"]) if data.get("t") else None
+        return ts, int(data["i"])
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
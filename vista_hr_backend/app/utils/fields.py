@@ -0,0 +1,99 @@
+"""
+app/utils/fields.py
+-------------------
+Sparse fieldsets for listing list endpoints.
+
+    ?view=card            → CARD_FIELDS (title, thumbnail, city, price …)
+    ?fields=id,title,lat  → exactly those fields
+    ?view=full / nothing  → the endpoint's usual full payload
+
+Requested fields are mapped to columns on listings / listing_index and put
+straight into the SELECT, so a card page never loads the JSON blobs
+(photos, amenities, description …) at all.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+
+CARD_FIELDS = ("id", "title", "place_type", "city", "price", "thumb", "student_discount")
+
+_registry = None
+
+
+def listing_fields() -> dict:
+    """Public field name → SQL column (listings joined to listing_index)."""
+    global _registry
+    if _registry is None:
+        from ..models.listing import Listing
+        from ..models.listing_index import ListingIndex
+
+        _registry = {
+            "id":               Listing.id,
+            "title":            Listing.title,
+            "status":           Listing.status,
+            "current_step":     Listing.current_step,
+            "place_type":       Listing.place_type,
+            "space_type":       Listing.space_type,
+            "city":             ListingIndex.city_label,
+            "barangay":         ListingIndex.barangay_label,
+            "price":            ListingIndex.monthly_rent,
+            "guests":           ListingIndex.guests,
+            "cover":            ListingIndex.cover_url,
+            "thumb":            ListingIndex.cover_thumb,
+            "student_discount": Listing.student_discount,
+            "lat":              ListingIndex.lat,
+            "lng":              ListingIndex.lng,
+            "created_at":       Listing.created_at,
+            "updated_at":       Listing.updated_at,
+            "description":      Listing.description,
+            "location":         Listing.location,
+            "capacity":         Listing.capacity,
+            "amenities":        Listing.amenities,
+            "highlights":       Listing.highlights,
+            "photos":           Listing.photos,
+        }
+    return _registry
+
+
+def parse_projection(args, extra=()):
+    """
+    Field names requested by ?view= / ?fields=, or None for the full payload.
+    `extra` lists endpoint-specific virtual fields that are also accepted.
+    Raises ValueError(message) on an unknown view or field.
+    """
+    raw = (args.get("fields") or "").strip()
+    view = (args.get("view") or "").strip().lower()
+
+    if raw:
+        names = list(dict.fromkeys(n.strip() for n in raw.split(",") if n.strip()))
+        allowed = set(listing_fields()) | set(extra)
+        unknown = [n for n in names if n not in allowed]
+        if unknown:
+            raise ValueError("Unknown field(s): " + ", ".join(unknown))
+        if "id" not in names:
+            names.insert(0, "id")
+        return names
+    if view in ("", "full"):
+        return None
+    if view == "card":
+        return list(CARD_FIELDS)
+    raise ValueError("view must be 'card' or 'full'.")
+
+
+def columns_for(names) -> list:
+    reg = listing_fields()
+    return [reg[n].label(n) for n in names if n in reg]
+
+
+def _plain(value):
+    if hasattr(value, "value"):       # Enum members
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def row_to_dict(row, names) -> dict:
+    """Labelled result row → {field: JSON-ready value} for the registry fields."""
+    mapping = row._mapping
+    return {n: _plain(mapping[n]) for n in names if n in mapping}
@@ -0,0 +1,171 @@
+"""
+app/utils/geo.py
+----------------
+Geohash cells + haversine helpers for the listing map/radius endpoints.
+
+listing_index.geohash stores a 9-character geohash (~5 m cell). Because a
+geohash prefix is the enclosing coarser cell, "everything inside cell X" is
+a plain B-tree range scan (geohash LIKE 'X%'), and covering a circle or a
+map viewport is just a handful of such prefixes.
+"""
+from __future__ import annotations
+
+import math
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+
+# Cap on prefixes per covering — keeps the generated OR-list short
+_MAX_COVER_CELLS = 16
+
+
+def parse_coord(lat, lng):
+    """(lat, lng) as floats, or None if either is missing/out of range."""
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+    if not (math.isfinite(lat) and math.isfinite(lng)):
+        return None
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+        return None
+    return lat, lng
+
+
+def parse_bbox(raw):
+    """
+    'min_lng,min_lat,max_lng,max_lat' (same order as locations._CITY_BBOX)
+    → tuple of floats, or None if malformed.
+    """
+    try:
+        parts = [float(p) for p in str(raw or "").split(",")]
+    except ValueError:
+        return None
+    if len(parts) != 4 or not all(math.isfinite(p) for p in parts):
+        return None
+    min_lng, min_lat, max_lng, max_lat = parts
+    if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+        return None
+    return min_lng, min_lat, max_lng, max_lat
+
+
+# =========================
+# Geohash
+# =========================
+def encode_geohash(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    out, bits, ch, even = [], 0, 0, True
+    while len(out) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                ch, lng_lo = (ch << 1) | 1, mid
+            else:
+                ch, lng_hi = ch << 1, mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch, lat_lo = (ch << 1) | 1, mid
+            else:
+                ch, lat_hi = ch << 1, mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            out.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(out)
+
+
+def cell_size(precision: int):
+    """(width_deg, height_deg) of a geohash cell at `precision`."""
+    total = 5 * precision
+    lng_bits = (total + 1) // 2
+    lat_bits = total // 2
+    return 360.0 / (1 << lng_bits), 180.0 / (1 << lat_bits)
+
+
+def _cells_at(bbox, precision: int):
+    min_lng, min_lat, max_lng, max_lat = bbox
+    w, h = cell_size(precision)
+    i0, i1 = math.floor((min_lng + 180) / w), math.floor((max_lng + 180) / w)
+    j0, j1 = math.floor((min_lat + 90) / h), math.floor((max_lat + 90) / h)
+    return i0, i1, j0, j1, w, h
+
+
+def cover_bbox(bbox, max_cells: int = _MAX_COVER_CELLS) -> list[str]:
+    """
+    Geohash prefixes whose union covers `bbox` — the finest precision that
+    needs at most `max_cells` cells.
+    """
+    best = [""]
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        i0, i1, j0, j1, w, h = _cells_at(bbox, precision)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > max_cells:
+            break
+        cells = set()
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                lng = min(-180 + (i + 0.5) * w, 180.0)
+                lat = min(-90 + (j + 0.5) * h, 90.0)
+                cells.add(encode_geohash(lat, lng, precision))
+        best = sorted(cells)
+    return best
+
+
+# Map zoom → geohash length used as the cluster grid. Each step roughly
+# matches a cell spanning a marker-sized patch of a ~1000px viewport.
+_ZOOM_PRECISION = (
+    (3, 1), (5, 2), (8, 3), (10, 4), (13, 5), (15, 6), (17, 7),
+)
+
+
+# Hard ceiling on grid cells per viewport, whatever zoom the client claims
+_MAX_CLUSTER_CELLS = 400
+
+
+def cluster_precision(bbox, zoom: int) -> int:
+    """Grid (geohash length) for clustering `bbox` at map `zoom`."""
+    precision = 8
+    for max_zoom, p in _ZOOM_PRECISION:
+        if zoom <= max_zoom:
+            precision = p
+            break
+    while precision > 1:
+        i0, i1, j0, j1, _, _ = _cells_at(bbox, precision)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) <= _MAX_CLUSTER_CELLS:
+            break
+        precision -= 1
+    return precision
+
+
+# =========================
+# Distance
+# =========================
+def radius_bbox(lat: float, lng: float, radius_km: float):
+    """Bounding box (min_lng, min_lat, max_lng, max_lat) of a circle."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlng = min(math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)), 180.0)
+    return (max(lng - dlng, -180.0), max(lat - dlat, -90.0),
+            min(lng + dlng, 180.0), min(lat + dlat, 90.0))
+
+
+def haversine_many(lat: float, lng: float, points) -> list[float]:
+    """
+    Distances (km) from (lat, lng) to every (lat, lng) in `points`, in order.
+    The origin's trig terms are hoisted out of the loop.
+    """
+    rlat = math.radians(lat)
+    rlng = math.radians(lng)
+    cos0 = math.cos(rlat)
+    sin, cos, asin, sqrt, rad = math.sin, math.cos, math.asin, math.sqrt, math.radians
+    d = 2 * EARTH_RADIUS_KM
+    out = []
+    for plat, plng in points:
+        p = rad(plat)
+        a = sin((p - rlat) / 2) ** 2 + cos0 * cos(p) * sin((rad(plng) - rlng) / 2) ** 2
+        out.append(d * asin(min(1.0, sqrt(a))))
+    return out
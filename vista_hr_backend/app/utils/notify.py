@@ -0,0 +1,89 @@
+"""
+app/utils/notify.py
+-------------------
+In-app notifications as part of the request's unit of work:
+
+    notify(user_id, "BOOKING", "Reservation approved", body)
+    notify_many(admin_ids, "NEW_CUSTOM_AMENITY", title, body)
+    email_on_commit(send_kyc_approved_email, user.email, name)
+    db.session.commit()
+
+Queued notifications are written with one multi-row INSERT when the
+session commits, and dropped if it rolls back. The realtime
+"notification" events and queued emails go out only after the commit
+succeeded, so nobody is told about something that never happened.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+log = logging.getLogger(__name__)
+
+_OUTBOX = "notification_outbox"
+_EMAILS = "email_outbox"
+
+
+def _session(session):
+    from ..extensions import db
+
+    return session if session is not None else db.session()
+
+
+def notify(user_id: int, notif_type: str, title: str, body: str = None, session=None) -> None:
+    """Queue one notification; it is inserted when the session commits."""
+    notify_many([user_id], notif_type, title, body, session=session)
+
+
+def notify_many(user_ids, notif_type: str, title: str, body: str = None, session=None) -> None:
+    """Queue the same notification for several users (one row each, one INSERT)."""
+    outbox = _session(session).info.setdefault(_OUTBOX, [])
+    now = datetime.now(timezone.utc)
+    for uid in dict.fromkeys(u for u in user_ids if u):
+        outbox.append({
+            "user_id": int(uid), "type": notif_type, "title": title,
+            "body": body, "is_read": False, "created_at": now,
+        })
+
+
+def email_on_commit(send_fn, *args, session=None) -> None:
+    """Send an email in the background once the current transaction commits."""
+    _session(session).info.setdefault(_EMAILS, []).append((send_fn, args))
+
+
+# =========================
+# Session hooks
+# =========================
+@event.listens_for(Session, "before_commit")
+def _write_outbox(session):
+    rows = session.info.pop(_OUTBOX, None)
+    if not rows:
+        return
+    from ..models.notification import Notification
+    from .realtime import publish_on_commit
+
+    session.execute(Notification.__table__.insert(), rows)
+    for row in rows:
+        publish_on_commit(row["user_id"], "notification", {
+            "type": row["type"], "title": row["title"], "body": row["body"],
+            "is_read": False, "created_at": row["created_at"].isoformat(),
+        }, session=session)
+
+
+@event.listens_for(Session, "after_commit")
+def _send_emails(session):
+    for send_fn, args in session.info.pop(_EMAILS, None) or ():
+        try:
+            threading.Thread(target=send_fn, args=args, daemon=True).start()
+        except Exception:
+            log.exception("notify: could not start email thread")
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_outbox(session, _previous):
+    session.info.pop(_OUTBOX, None)
+    session.info.pop(_EMAILS, None)
@@ -0,0 +1,74 @@
+"""
+app/utils/photos.py
+-------------------
+Canonical cover photo + Cloudinary size variants for listings.
+
+Step 7 stores the cover once (listings.cover_url / cover_variants); every
+reader goes through listing_cover() instead of re-scanning the photos JSON.
+"""
+from __future__ import annotations
+
+import re
+
+# Cloudinary delivery transformations, inserted right after /upload/
+COVER_SIZES = {
+    "sm": "c_fill,g_auto,w_320,h_240,q_auto,f_auto",    # cards, inbox, booking rows
+    "md": "c_fill,g_auto,w_640,h_480,q_auto,f_auto",    # listing grid / detail header
+    "lg": "c_limit,w_1280,q_auto,f_auto",               # gallery / full screen
+}
+
+_CLOUDINARY_RE = re.compile(r"^(https?://res\.cloudinary\.com/[^/]+/image/upload/)(.+)$")
+
+
+def _photo_url(photo):
+    if isinstance(photo, dict):
+        return photo.get("url") or photo.get("secure_url") or None
+    return photo or None
+
+
+def pick_cover(photos):
+    """The photo flagged isCover, else the first one — URL or None."""
+    if not isinstance(photos, list) or not photos:
+        return None
+    flagged = next((p for p in photos if isinstance(p, dict) and p.get("isCover")), None)
+    return _photo_url(flagged or photos[0])
+
+
+def cloudinary_variant(url: str, transform: str) -> str:
+    """URL with `transform` applied; non-Cloudinary URLs come back unchanged."""
+    m = _CLOUDINARY_RE.match(url or "")
+    if not m:
+        return url
+    return f"{m.group(1)}{transform}/{m.group(2)}"
+
+
+def cover_variants(url):
+    if not url:
+        return None
+    return {size: cloudinary_variant(url, t) for size, t in COVER_SIZES.items()}
+
+
+def apply_cover(listing) -> None:
+    """Recompute listing.cover_url / cover_variants from listing.photos."""
+    url = pick_cover(listing.photos)
+    listing.cover_url = url
+    listing.cover_variants = cover_variants(url)
+
+
+def listing_cover(listing, size: str = None):
+    """
+    Cover URL for `listing` — the `size` variant ("sm" | "md" | "lg") when
+    given. Falls back to the photos JSON for rows saved before step 7
+    stored the cover.
+    """
+    if listing is None:
+        return None
+    url = listing.cover_url
+    if not url:
+        url = pick_cover(listing.photos)
+        if not url:
+            return None
+        return cloudinary_variant(url, COVER_SIZES[size]) if size else url
+    if size:
+        return (listing.cover_variants or {}).get(size) or url
+    return url
@@ -0,0 +1,148 @@
+"""
+app/utils/presence.py
+---------------------
+Ephemeral per-user state that never touches the database:
+
+    typing      sender → receiver (+ listing), expires after TYPING_TTL
+    last seen   every authenticated request / open event stream
+    active now  users seen within ACTIVE_WINDOW (admin overview)
+
+Each worker keeps a full replica in a TTL dict; changes are mirrored to
+the other workers over the realtime socket transport (last-seen updates
+are throttled to one datagram per user per SEEN_SYNC_EVERY). With the
+`local` / `db` realtime backends every worker only sees its own traffic.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+from .realtime import broadcast, on_channel
+
+TYPING_TTL      = 4          # seconds
+SEEN_TTL        = 15 * 60    # keep last-seen around this long
+ONLINE_WINDOW   = 60         # "online" = seen within this many seconds
+ACTIVE_WINDOW   = 15 * 60    # admin "active now"
+SEEN_SYNC_EVERY = 20         # min seconds between last-seen broadcasts per user
+
+
+class TTLStore:
+    """Thread-safe dict whose entries expire at an absolute wall-clock time."""
+
+    def __init__(self, purge_every: int = 1024):
+        self._lock = threading.Lock()
+        self._data: dict = {}
+        self._writes = 0
+        self._purge_every = purge_every
+
+    def set(self, key, value, ttl: float = None, expires_at: float = None) -> None:
+        expires_at = expires_at if expires_at is not None else time.time() + ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._writes += 1
+            if self._writes % self._purge_every == 0:
+                self._purge(time.time())
+
+    def get(self, key, default=None):
+        with self._lock:
+            hit = self._data.get(key)
+        if hit is None or hit[1] <= time.time():
+            return default
+        return hit[0]
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def items(self, prefix: str):
+        """Live (key, value) pairs whose string key starts with `prefix`."""
+        now = time.time()
+        with self._lock:
+            return [(k, v) for k, (v, exp) in self._data.items() if exp > now and k.startswith(prefix)]
+
+    def _purge(self, now: float) -> None:
+        for k in [k for k, (_, exp) in self._data.items() if exp <= now]:
+            del self._data[k]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+store = TTLStore()
+_last_sync: dict[int, float] = {}
+
+
+def _apply(data: dict) -> None:
+    """Change received from another worker."""
+    if data.get("delete"):
+        store.delete(data["key"])
+    else:
+        store.set(data["key"], data["value"], expires_at=data["expires_at"])
+
+
+on_channel("presence", _apply)
+
+
+def _put(key: str, value, ttl: float, share: bool = True) -> None:
+    expires_at = time.time() + ttl
+    store.set(key, value, expires_at=expires_at)
+    if share:
+        broadcast("presence", {"key": key, "value": value, "expires_at": expires_at})
+
+
+# =========================
+# Typing
+# =========================
+def set_typing(user_id: int, to_user_id: int = None, listing_id: int = None) -> None:
+    _put(f"typing:{user_id}:{to_user_id or 0}", listing_id or 0, TYPING_TTL)
+
+
+def clear_typing(user_id: int, to_user_id: int = None) -> None:
+    key = f"typing:{user_id}:{to_user_id or 0}"
+    store.delete(key)
+    broadcast("presence", {"key": key, "delete": True})
+
+
+def is_typing(user_id: int, to_user_id: int, listing_id: int = None) -> bool:
+    """Is `user_id` typing to `to_user_id` (in `listing_id`'s thread, when given)?"""
+    for key in (f"typing:{user_id}:{to_user_id}", f"typing:{user_id}:0"):
+        where = store.get(key)
+        if where is not None and (not listing_id or where in (0, listing_id)):
+            return True
+    return False
+
+
+# =========================
+# Last seen / online
+# =========================
+def touch_seen(user_id: int, role: str = None) -> None:
+    now = time.time()
+    share = now - _last_sync.get(user_id, 0) >= SEEN_SYNC_EVERY
+    if share:
+        _last_sync[user_id] = now
+    _put(f"seen:{user_id}", {"at": now, "role": role}, SEEN_TTL, share=share)
+
+
+def last_seen(user_id: int):
+    """Epoch seconds of the user's last activity, or None."""
+    hit = store.get(f"seen:{user_id}")
+    return hit["at"] if hit else None
+
+
+def is_online(user_id: int) -> bool:
+    at = last_seen(user_id)
+    return at is not None and time.time() - at <= ONLINE_WINDOW
+
+
+def active_now(window: int = ACTIVE_WINDOW) -> dict:
+    """{"total": n, "by_role": {role: n}} for users seen within `window` seconds."""
+    cutoff = time.time() - window
+    by_role: dict[str, int] = {}
+    total = 0
+    for _, v in store.items("seen:"):
+        if v["at"] >= cutoff:
+            total += 1
+            role = v.get("role") or "UNKNOWN"
+            by_role[role] = by_role.get(role, 0) + 1
+    return {"total": total, "by_role": by_role, "window_seconds": window}
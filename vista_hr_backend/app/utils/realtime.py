@@ -0,0 +1,361 @@
+"""
+app/utils/realtime.py
+---------------------
+Per-user push events for the SSE channel (GET /api/events).
+
+    publish(user_id, "typing", {...})            # right now
+    publish_on_commit(user_id, "message", {...}) # when the current DB transaction commits
+
+Events land in an in-process broker (one queue per open stream) and are
+fanned out to the other workers by the transport picked with
+REALTIME_BACKEND:
+
+    local   this process only (single worker, dev server)
+    socket  one unix datagram socket per worker in REALTIME_SOCKET_DIR (default)
+    db      realtime_events rows polled by every worker (workers on several hosts)
+
+Delivery is best effort: a stream whose queue is full drops events, and
+clients resync with a normal fetch whenever the stream (re)connects.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+log = logging.getLogger(__name__)
+
+EVENT_TYPES = ("message", "read", "typing", "notification", "booking")
+
+_origin = {"pid": None, "value": None}
+
+
+def origin() -> str:
+    """Identifies this worker process; fan-out skips events that came from ourselves."""
+    pid = os.getpid()
+    if _origin["pid"] != pid:
+        _origin["pid"], _origin["value"] = pid, f"{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:8]}"
+    return _origin["value"]
+
+
+class Broker:
+    """In-process pub/sub: user id → the queues of that user's open streams."""
+
+    def __init__(self, queue_size: int = 256):
+        self._queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subs: dict[int, set] = {}
+        self.delivered = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def subscribe(self, user_id: int, limit: int = None):
+        """New queue for one stream, or None when `limit` streams are already open."""
+        q = queue.Queue(maxsize=self._queue_size)
+        with self._lock:
+            if limit is not None and sum(len(s) for s in self._subs.values()) >= limit:
+                self.rejected += 1
+                return None
+            self._subs.setdefault(int(user_id), set()).add(q)
+        return q
+
+    def unsubscribe(self, user_id: int, q: queue.Queue) -> None:
+        with self._lock:
+            subs = self._subs.get(int(user_id))
+            if subs is not None:
+                subs.discard(q)
+                if not subs:
+                    del self._subs[int(user_id)]
+
+    def deliver(self, user_id: int, evt: dict) -> int:
+        with self._lock:
+            targets = list(self._subs.get(int(user_id), ()))
+        for q in targets:
+            try:
+                q.put_nowait(evt)
+                self.delivered += 1
+            except queue.Full:
+                self.dropped += 1
+        return len(targets)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users":     len(self._subs),
+                "streams":   sum(len(s) for s in self._subs.values()),
+                "delivered": self.delivered,
+                "dropped":   self.dropped,
+                "rejected":  self.rejected,
+            }
+
+
+broker = Broker()
+
+
+# =========================
+# Fan-out transports
+# =========================
+class _LocalTransport:
+    name = "local"
+
+    def start(self, on_event) -> None:
+        pass
+
+    def send(self, evt: dict) -> None:
+        pass
+
+
+class _SocketTransport:
+    """
+    Each worker binds <dir>/<pid>.sock and sends every event to all the
+    other sockets in the directory. Sockets nobody listens on any more
+    (dead workers) are removed on the first failed send.
+    """
+    name = "socket"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, f"{os.getpid()}.sock")
+        self._rx = None
+        self._tx = None
+
+    def start(self, on_event) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._rx = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._rx.bind(self.path)
+        self._tx = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._tx.setblocking(False)     # a stalled worker must not stall requests
+
+        def loop():
+            while True:
+                try:
+                    on_event(json.loads(self._rx.recv(1 << 16)))
+                except Exception:
+                    log.exception("realtime: bad datagram")
+
+        threading.Thread(target=loop, name="realtime-socket", daemon=True).start()
+
+    def send(self, evt: dict) -> None:
+        data = json.dumps(evt, default=str).encode()
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if not name.endswith(".sock") or path == self.path:
+                continue
+            try:
+                self._tx.sendto(data, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except OSError:
+                pass                    # peer's buffer full — best effort
+
+
+class _DbTransport:
+    """Append to realtime_events; a poller thread delivers the other workers' rows."""
+    name = "db"
+
+    RETENTION = timedelta(minutes=5)
+
+    def __init__(self, app, interval: float = 1.0):
+        self.app = app
+        self.interval = interval
+
+    def start(self, on_event) -> None:
+        from ..extensions import db
+        from ..models.realtime_event import RealtimeEvent
+
+        table = RealtimeEvent.__table__
+        with self.app.app_context():
+            with db.engine.connect() as conn:
+                last = conn.execute(select(db.func.max(table.c.id))).scalar() or 0
+
+        def loop():
+            nonlocal last
+            pruned_at = 0.0
+            while True:
+                time.sleep(self.interval)
+                try:
+                    with self.app.app_context(), db.engine.begin() as conn:
+                        rows = conn.execute(
+                            select(table.c.id, table.c.payload)
+                            .where(table.c.id > last, table.c.origin != origin())
+                            .order_by(table.c.id)
+                        ).all()
+                        for row_id, payload in rows:
+                            last = max(last, row_id)
+                            on_event(json.loads(payload))
+                        if time.monotonic() - pruned_at > 60:
+                            cutoff = datetime.now(timezone.utc) - self.RETENTION
+                            conn.execute(table.delete().where(table.c.created_at < cutoff))
+                            pruned_at = time.monotonic()
+                except Exception:
+                    log.exception("realtime: poll failed")
+
+        threading.Thread(target=loop, name="realtime-db", daemon=True).start()
+
+    def send(self, evt: dict) -> None:
+        from ..extensions import db
+        from ..models.realtime_event import RealtimeEvent
+
+        # Own short transaction — never part of the request's unit of work
+        with db.engine.begin() as conn:
+            conn.execute(RealtimeEvent.__table__.insert().values(
+                user_id=evt["user_id"], origin=origin(),
+                payload=json.dumps(evt, default=str),
+                created_at=datetime.now(timezone.utc),
+            ))
+
+
+_transport = None
+_start_lock = threading.Lock()
+
+
+def _make_transport(app):
+    backend = (app.config.get("REALTIME_BACKEND") or "socket").lower()
+    if backend == "db":
+        return _DbTransport(app)
+    if backend == "socket" and hasattr(socket, "AF_UNIX"):
+        directory = app.config.get("REALTIME_SOCKET_DIR") or os.path.join(
+            tempfile.gettempdir(), "vista-hr-realtime"
+        )
+        return _SocketTransport(directory)
+    return _LocalTransport()
+
+
+# Non-event messages sharing the transport (e.g. presence) — kind → handler
+_channels = {}
+
+
+def on_channel(kind: str, handler) -> None:
+    _channels[kind] = handler
+
+
+def _remote_event(evt: dict) -> None:
+    if evt.get("origin") == origin():
+        return
+    kind = evt.get("kind")
+    if kind:
+        handler = _channels.get(kind)
+        if handler is not None:
+            handler(evt["data"])
+        return
+    broker.deliver(evt["user_id"], evt)
+
+
+def ensure_started():
+    """Start this worker's transport on first use (after gunicorn forks)."""
+    global _transport
+    if _transport is not None:
+        return _transport
+    with _start_lock:
+        if _transport is None:
+            app = current_app._get_current_object()
+            transport = _make_transport(app)
+            try:
+                transport.start(_remote_event)
+            except OSError:
+                log.exception("realtime: %s backend unavailable, using local", transport.name)
+                transport = _LocalTransport()
+            _transport = transport
+    return _transport
+
+
+def backend_name() -> str:
+    return _transport.name if _transport is not None else "idle"
+
+
+# =========================
+# Publishing
+# =========================
+def publish(user_id: int, event_type: str, data: dict = None) -> None:
+    """Push an event to every open stream of `user_id`, on any worker."""
+    if not user_id:
+        return
+    evt = {"user_id": int(user_id), "type": event_type, "data": data or {}, "origin": origin()}
+    transport = ensure_started()
+    broker.deliver(user_id, evt)
+    try:
+        transport.send(evt)
+    except Exception:
+        log.exception("realtime: fan-out failed")
+
+
+def broadcast(kind: str, data: dict) -> None:
+    """
+    Mirror ephemeral state to the other workers. Only the socket transport
+    carries these — nothing ephemeral is ever written to the database.
+    """
+    transport = ensure_started()
+    if transport.name != "socket":
+        return
+    try:
+        transport.send({"kind": kind, "user_id": 0, "data": data, "origin": origin()})
+    except Exception:
+        log.exception("realtime: broadcast failed")
+
+
+def publish_on_commit(user_id: int, event_type: str, data: dict = None, session=None) -> None:
+    """Queue an event that is published only if the current transaction commits."""
+    from ..extensions import db
+
+    session = session if session is not None else db.session()
+    session.info.setdefault("realtime_events", []).append((user_id, event_type, data))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session):
+    pending = session.info.pop("realtime_events", None)
+    for user_id, event_type, data in pending or ():
+        try:
+            publish(user_id, event_type, data)
+        except Exception:
+            log.exception("realtime: publish failed")
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_rolled_back(session, _previous):
+    session.info.pop("realtime_events", None)
+
+
+# =========================
+# Booking status changes
+# =========================
+@event.listens_for(Session, "after_flush")
+def _booking_status_events(session, _ctx):
+    # Covers every write path (owner actions, auto-cancels, move-out …)
+    from sqlalchemy import inspect
+    from ..models.booking import Booking
+    from ..models.listing import Listing
+
+    changed = [
+        b for b in list(session.new) + list(session.dirty)
+        if isinstance(b, Booking) and inspect(b).attrs.status.history.has_changes()
+    ]
+    if not changed:
+        return
+    owners = dict(session.connection().execute(
+        select(Listing.id, Listing.owner_id).where(Listing.id.in_({b.listing_id for b in changed}))
+    ).all())
+    for b in changed:
+        data = {"booking_id": b.id, "listing_id": b.listing_id, "status": b.status}
+        publish_on_commit(b.resident_id, "booking", data, session=session)
+        publish_on_commit(owners.get(b.listing_id), "booking", data, session=session)
@@ -0,0 +1,304 @@
+"""
+app/utils/receipts.py
+---------------------
+Reservation receipts as data, HTML or PDF, rendered in-process:
+
+    data = receipt(booking, "data", snap)          # dict for the JSON API
+    body = receipt(booking, "pdf", snap)           # bytes
+    job_id = start_export(owner_id, items, "pdf")  # bulk ZIP, built in the background
+
+A receipt depends only on the booking row and its frozen snapshot
+(models/booking.py), so rendered output is cached per worker by
+(booking id, updated_at, status, format): any change to the booking moves
+updated_at or status and makes the old entries unreachable. Receipts
+built from live rows (bookings without a snapshot yet) are never cached.
+
+Bulk exports never hold a request thread: the endpoint extracts plain
+dicts (no ORM objects, no app context needed) and hands them to a single
+background thread that writes the ZIP to disk for a later download.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+from jinja2 import Environment
+
+from .cache import TTLCache
+
+log = logging.getLogger(__name__)
+
+FORMATS = {"html": "text/html", "pdf": "application/pdf"}
+
+STATUS_LABELS = {
+    "PENDING":           "Pending",
+    "APPROVED":          "Approved",
+    "VIEWING_SCHEDULED": "Viewing Scheduled",
+    "VIEWING_DECLINED":  "Viewing Declined",
+    "ACTIVE":            "Occupied",
+    "COMPLETED":         "Moved Out",
+    "MOVED_OUT":         "Moved Out (Early)",
+    "REJECTED":          "Rejected",
+    "CANCELLED":         "Cancelled",
+}
+
+receipt_cache = TTLCache(maxsize=2048, ttl=3600.0)
+
+
+# =========================
+# Data
+# =========================
+def reference(booking) -> str:
+    """VHRA-YYYYMMDD-00001"""
+    created = booking.created_at or datetime.now()
+    return f"VHRA-{created.strftime('%Y%m%d')}-{booking.id:05d}"
+
+
+def receipt_data(booking, snap: dict) -> dict:
+    status_val = booking.status.value if hasattr(booking.status, "value") else str(booking.status)
+    listing = snap["listing"]
+    rent = listing["monthly_rent"]
+    return {
+        "reference": reference(booking),
+        "resident_name": snap["resident"]["name"] or "—",
+        "listing_title": listing["title"] or "Untitled listing",
+        "listing_address": listing["address"] or "—",
+        "owner_name": snap["owner"]["name"] or "—",
+        "move_in_date": booking.move_in_date.isoformat() if booking.move_in_date else None,
+        "monthly_rent": float(rent) if rent else None,
+        "status": STATUS_LABELS.get(status_val, status_val),
+        "approved_at": booking.approved_at.isoformat() if booking.approved_at else None,
+        "created_at": booking.created_at.isoformat() if booking.created_at else None,
+    }
+
+
+def cache_key(booking, fmt: str):
+    """
+    None when the receipt must not be cached (no snapshot yet). updated_at
+    is whole seconds on MySQL, so the status is part of the key too.
+    """
+    if not booking.snapshot or booking.updated_at is None:
+        return None
+    status_val = booking.status.value if hasattr(booking.status, "value") else str(booking.status)
+    return (booking.id, booking.updated_at.isoformat(), status_val, fmt)
+
+
+def receipt(booking, fmt: str, snap: dict = None):
+    """`fmt` is "data" (dict) or one of FORMATS (bytes)."""
+    key = cache_key(booking, fmt)
+    hit = receipt_cache.get(key) if key else None
+    if hit is not None:
+        return hit
+    data = receipt_data(booking, snap or booking.snapshot)
+    out = data if fmt == "data" else render(data, fmt)
+    if key:
+        receipt_cache.set(key, out)
+    return out
+
+
+def render(data: dict, fmt: str) -> bytes:
+    return render_pdf(data) if fmt == "pdf" else render_html(data)
+
+
+def _rows(data: dict) -> list:
+    return [
+        ("Resident", data["resident_name"]),
+        ("Property", data["listing_title"]),
+        ("Address", data["listing_address"]),
+        ("Owner", data["owner_name"]),
+        ("Move-in date", _nice_date(data["move_in_date"])),
+        ("Monthly rent", f"PHP {data['monthly_rent']:,.2f}" if data["monthly_rent"] else "On request"),
+        ("Status", data["status"]),
+        ("Approved", _nice_date(data["approved_at"])),
+        ("Reserved", _nice_date(data["created_at"])),
+    ]
+
+
+def _nice_date(iso) -> str:
+    if not iso:
+        return "—"
+    try:
+        return (date.fromisoformat(iso) if len(iso) == 10 else datetime.fromisoformat(iso)).strftime("%b %d, %Y")
+    except ValueError:
+        return iso
+
+
+# =========================
+# HTML
+# =========================
+_HTML = Environment(autoescape=True).from_string("""<!doctype html>
+<html lang="en"><head><meta charset="utf-8">
+<title>Receipt {{ ref }}</title>
+<style>
+  body { font-family: Helvetica, Arial, sans-serif; color: #111827; max-width: 560px; margin: 32px auto; }
+  h1 { font-size: 20px; margin: 0; } .sub { color: #6b7280; font-size: 13px; margin: 2px 0 20px; }
+  table { width: 100%; border-collapse: collapse; font-size: 14px; }
+  td { padding: 8px 0; border-bottom: 1px solid #e5e7eb; } td:first-child { color: #6b7280; width: 40%; }
+  .ref { font-family: monospace; } .note { color: #9ca3af; font-size: 12px; margin-top: 20px; }
+</style></head><body>
+<h1>VISTA-HR</h1>
+<div class="sub">Reservation Receipt · <span class="ref">{{ ref }}</span></div>
+<table>{% for label, value in rows %}<tr><td>{{ label }}</td><td>{{ value }}</td></tr>{% endfor %}</table>
+<p class="note">This receipt was generated by VISTA-HR.</p>
+</body></html>
+""")
+
+
+def render_html(data: dict) -> bytes:
+    return _HTML.render(ref=data["reference"], rows=_rows(data)).encode("utf-8")
+
+
+# =========================
+# PDF
+# =========================
+def _pdf_text(s: str) -> str:
+    s = str(s).replace("—", "-").encode("cp1252", "replace").decode("latin-1")
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_pdf(data: dict) -> bytes:
+    """One A4 page, built-in Helvetica (WinAnsi) — no PDF library needed."""
+    ops = [
+        "BT /F2 20 Tf 56 780 Td (VISTA-HR) Tj ET",
+        f"BT /F1 11 Tf 56 760 Td (Reservation Receipt  {_pdf_text(data['reference'])}) Tj ET",
+        "0.9 G 56 744 m 539 744 l S 0 G",
+    ]
+    y = 720
+    for label, value in _rows(data):
+        ops.append(f"BT /F1 11 Tf 56 {y} Td ({_pdf_text(label)}) Tj ET")
+        ops.append(f"BT /F2 11 Tf 220 {y} Td ({_pdf_text(value)}) Tj ET")
+        y -= 24
+    ops.append(f"BT /F1 9 Tf 56 {y - 16} Td (This receipt was generated by VISTA-HR.) Tj ET")
+    stream = "\n".join(ops).encode("latin-1")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+        b"/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+# =========================
+# Bulk export (background)
+# =========================
+# Exports are built off the request: the endpoint queues the job and
+# returns its id, one background thread per process writes the ZIP under
+# RECEIPT_EXPORT_DIR, and any worker on the host serves it once done.
+#
+#   <job>.zip.part   being written
+#   <job>.zip        ready
+#   <job>.err        failed
+EXPORT_TTL = 3600          # seconds a finished export is kept
+_JOB_RE = re.compile(r"^(\d+)-[0-9a-f]{32}$")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def export_dir() -> str:
+    from flask import current_app
+
+    path = current_app.config.get("RECEIPT_EXPORT_DIR") or os.path.join(
+        tempfile.gettempdir(), "vista-hr-receipts"
+    )
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # One thread: exports queue up instead of competing with requests
+            _pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="receipt-export")
+        return _pool
+
+
+def _render_one(item: dict, fmt: str) -> bytes:
+    key = item["key"]
+    hit = receipt_cache.get(key) if key else None
+    if hit is not None:
+        return hit
+    body = render(item["data"], fmt)
+    if key:
+        receipt_cache.set(key, body)
+    return body
+
+
+def _build_zip(base: str, items: list, fmt: str) -> None:
+    try:
+        with zipfile.ZipFile(base + ".zip.part", "w", zipfile.ZIP_DEFLATED) as zf:
+            for item in items:
+                zf.writestr(f"{item['data']['reference']}.{fmt}", _render_one(item, fmt))
+        os.replace(base + ".zip.part", base + ".zip")
+    except Exception:
+        log.exception("receipts: export %s failed", os.path.basename(base))
+        with open(base + ".err", "w"):
+            pass
+        if os.path.exists(base + ".zip.part"):
+            os.remove(base + ".zip.part")
+
+
+def start_export(owner_id: int, items: list, fmt: str) -> str:
+    """
+    Queue a ZIP of `items` ({"key", "data"} dicts — no ORM objects) and
+    return its job id. The id embeds the owner so only they can fetch it.
+    """
+    job_id = f"{owner_id}-{uuid.uuid4().hex}"
+    base = os.path.join(export_dir(), job_id)
+    open(base + ".zip.part", "wb").close()      # visible as "pending" right away
+    _executor().submit(_build_zip, base, items, fmt)
+    return job_id
+
+
+def export_status(job_id: str, owner_id: int):
+    """("ready", path) | ("pending", None) | ("failed", None) | (None, None)"""
+    m = _JOB_RE.match(job_id or "")
+    if not m or int(m.group(1)) != owner_id:
+        return None, None
+    base = os.path.join(export_dir(), job_id)
+    if os.path.exists(base + ".zip"):
+        return "ready", base + ".zip"
+    if os.path.exists(base + ".zip.part"):
+        return "pending", None
+    if os.path.exists(base + ".err"):
+        return "failed", None
+    return None, None
+
+
+def prune_exports() -> int:
+    """Scheduled job: delete exports older than EXPORT_TTL. Returns files removed."""
+    root = export_dir()
+    cutoff = time.time() - EXPORT_TTL
+    removed = 0
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
@@ -0,0 +1,130 @@
+"""
+app/utils/scheduler.py
+----------------------
+Periodic background jobs, run by one process at a time.
+
+    scheduler.register("expire_bookings", expire_stale_bookings, interval=300)
+    scheduler.start(app)                      # run.py — once per worker
+
+Every worker starts a scheduler thread. On each tick it tries to take an
+exclusive, non-blocking flock on SCHEDULER_LOCK_FILE; the process that
+holds it (the leader) keeps it for its lifetime and runs the jobs that
+are due. The others keep retrying, so when the leader dies the OS drops
+its lock and another worker takes over within one tick.
+
+The lock is per host: with web processes on several hosts, set
+SCHEDULER_ENABLED=0 on all but one. Without fcntl (Windows dev boxes)
+every process is its own leader.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:        # pragma: no cover — not available on Windows
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+
+class Scheduler:
+    def __init__(self):
+        self._jobs: dict[str, dict] = {}
+        self._lock_fd = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.is_leader = False
+
+    def register(self, name: str, fn, interval: float) -> None:
+        """Run `fn()` (inside an app context) every `interval` seconds."""
+        self._jobs[name] = {
+            "fn": fn, "interval": float(interval), "next_at": 0.0,
+            "runs": 0, "errors": 0, "last_result": None, "last_run_at": None,
+        }
+
+    # =========================
+    # Leadership
+    # =========================
+    def _try_lead(self, path: str) -> bool:
+        if self.is_leader:
+            return True
+        if fcntl is None:
+            self.is_leader = True
+            return True
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._lock_fd = fd            # held (never closed) for the life of the process
+        self.is_leader = True
+        log.info("scheduler: pid %s is the leader", os.getpid())
+        return True
+
+    # =========================
+    # Loop
+    # =========================
+    def start(self, app) -> None:
+        if not app.config.get("SCHEDULER_ENABLED", True) or not self._jobs:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            path = app.config.get("SCHEDULER_LOCK_FILE") or os.path.join(
+                tempfile.gettempdir(), "vista-hr-scheduler.lock"
+            )
+            tick = max(1.0, min(30.0, min(j["interval"] for j in self._jobs.values())))
+            self._thread = threading.Thread(
+                target=self._loop, args=(app, path, tick), name="scheduler", daemon=True
+            )
+            self._thread.start()
+
+    def _loop(self, app, path: str, tick: float) -> None:
+        while True:
+            try:
+                if self._try_lead(path):
+                    self.run_due(app)
+            except Exception:
+                log.exception("scheduler: tick failed")
+            time.sleep(tick)
+
+    def run_due(self, app, force: bool = False) -> None:
+        from ..extensions import db
+
+        now = time.monotonic()
+        for name, job in self._jobs.items():
+            if not force and now < job["next_at"]:
+                continue
+            job["next_at"] = now + job["interval"]
+            with app.app_context():
+                try:
+                    job["last_result"] = job["fn"]()
+                    job["runs"] += 1
+                except Exception:
+                    job["errors"] += 1
+                    log.exception("scheduler: job %s failed", name)
+                    db.session.rollback()
+                finally:
+                    job["last_run_at"] = time.time()
+                    db.session.remove()
+
+    def stats(self) -> dict:
+        return {
+            "leader": self.is_leader,
+            "pid": os.getpid(),
+            "jobs": {
+                name: {k: job[k] for k in ("interval", "runs", "errors", "last_result", "last_run_at")}
+                for name, job in self._jobs.items()
+            },
+        }
+
+
+scheduler = Scheduler()
@@ -0,0 +1,376 @@
+"""
+app/utils/search.py
+-------------------
+In-process full-text search over published listings.
+
+  - Inverted index: term → {listing_id: weighted term frequency}
+  - Tokenizer folds accents ("Parañaque" → "paranaque"), splits hyphenated
+    Tagalog forms ("mag-aaral" → mag, aaral, magaaral) and drops common
+    English/Tagalog stopwords.
+  - Ranking is BM25 with per-field weights (title > highlights > amenities
+    > description). The last query word is prefix-matched for search-as-you-type,
+    and a small Tagalog ↔ English synonym table widens queries.
+
+Each worker builds its own index at startup (run.py) and keeps it current by
+pulling listing_index rows whose synced_at moved past the newest one it saw,
+so edits made through another gunicorn worker show up too. A transaction can
+commit after a later one has been read, so every check re-scans the last
+_SYNC_OVERLAP seconds (an index-only read) and reloads just the rows whose
+per-row revision it has not applied yet. Deleted listings leave no row to pull; a cheap
+id scan every _PRUNE_EVERY seconds drops them. Queries never touch the listings table except to hydrate the
+final page of results.
+"""
+from __future__ import annotations
+
+import bisect
+import heapq
+import math
+import re
+import threading
+import time
+import unicodedata
+from datetime import timedelta
+
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+# Field weights — a title hit counts 3× a description hit
+_FIELD_WEIGHTS = {
+    "title":       3.0,
+    "place_type":  2.0,
+    "city":        2.0,
+    "barangay":    2.0,
+    "highlights":  2.0,
+    "amenities":   1.5,
+    "description": 1.0,
+}
+
+_PREFIX_WEIGHT  = 0.7   # prefix expansions score below exact hits
+_SYNONYM_WEIGHT = 0.9
+_MAX_EXPANSIONS = 40    # cap on terms a single prefix may expand to
+_REFRESH_EVERY  = 1.0   # seconds between change checks
+_SYNC_OVERLAP   = 120   # seconds of synced_at re-scanned for late commits
+_PRUNE_EVERY    = 60.0  # seconds between deleted-listing sweeps
+
+_STOPWORDS = frozenset("""
+a an and are as at be by for from in is it of on or the to with near
+ang ng nang sa na at mga ay si ni kay para ko mo niya namin natin nila
+ito iyan iyon dito diyan doon may mayroon malapit
+""".split())
+
+# Tagalog → English (and a few spelling variants). Expanded both ways at
+# query time, so "kitchen" also finds "kusina" and vice versa.
+_SYNONYMS = {
+    "bahay":      ("house",),
+    "kwarto":     ("room",),
+    "kuwarto":    ("room",),
+    "silid":      ("room",),
+    "paupahan":   ("rent", "apartment"),
+    "upa":        ("rent",),
+    "estudyante": ("student",),
+    "magaaral":   ("student",),
+    "paaralan":   ("school",),
+    "eskwelahan": ("school",),
+    "eskuwela":   ("school",),
+    "unibersidad": ("university",),
+    "banyo":      ("bathroom",),
+    "palikuran":  ("bathroom", "toilet"),
+    "kusina":     ("kitchen",),
+    "paradahan":  ("parking",),
+    "tahimik":    ("peaceful", "quiet"),
+    "ligtas":     ("safe", "secure"),
+    "aircon":     ("airconditioning", "ac"),
+    "condo":      ("condominium",),
+    "dorm":       ("dormitory",),
+}
+
+_EXPANSIONS: dict[str, set[str]] = {}
+for _word, _targets in _SYNONYMS.items():
+    for _t in _targets:
+        _EXPANSIONS.setdefault(_word, set()).add(_t)
+        _EXPANSIONS.setdefault(_t, set()).add(_word)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+
+def _fold(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text) -> list[str]:
+    """Lowercase, accent-folded, stopword-free tokens."""
+    if not text:
+        return []
+    out = []
+    for word in _TOKEN_RE.findall(_fold(str(text))):
+        parts = word.split("-")
+        if len(parts) > 1:
+            out.append("".join(parts))
+        out.extend(parts)
+    return [t for t in out if t not in _STOPWORDS and (len(t) > 1 or t.isdigit())]
+
+
+class ListingSearchIndex:
+    """BM25 inverted index. All public methods are thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: dict[str, dict[int, float]] = {}
+        self._doc_terms: dict[int, dict[str, float]] = {}
+        self._doc_len: dict[int, float] = {}
+        self._total_len = 0.0
+        self._vocab: list[str] = []          # sorted, for prefix lookups
+        self._vocab_dirty = False
+        self._synced = None                  # newest listing_index.synced_at seen
+        self._applied: dict[int, tuple] = {}   # listing_id → (synced_at, revision), overlap window only
+        self._last_check = 0.0
+        self._last_prune = 0.0
+        self.built = False
+
+    # ── Maintenance ──────────────────────────────────────────
+    def _remove(self, doc_id: int) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            bucket = self._postings.get(term)
+            if bucket is None:
+                continue
+            bucket.pop(doc_id, None)
+            if not bucket:
+                del self._postings[term]
+                self._vocab_dirty = True
+        self._total_len -= self._doc_len.pop(doc_id, 0.0)
+
+    def _add(self, doc_id: int, fields: dict) -> None:
+        self._remove(doc_id)
+        tf: dict[str, float] = {}
+        for field, weight in _FIELD_WEIGHTS.items():
+            for term in tokenize(fields.get(field)):
+                tf[term] = tf.get(term, 0.0) + weight
+        if not tf:
+            return
+        for term, freq in tf.items():
+            bucket = self._postings.get(term)
+            if bucket is None:
+                bucket = self._postings[term] = {}
+                self._vocab_dirty = True
+            bucket[doc_id] = freq
+        self._doc_terms[doc_id] = tf
+        length = sum(tf.values())
+        self._doc_len[doc_id] = length
+        self._total_len += length
+
+    def rebuild(self) -> int:
+        """Re-index every published listing from the database."""
+        synced = _max_synced()          # read first: later writes are pulled again
+        docs = _load_documents(None)
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_len.clear()
+            self._total_len = 0.0
+            for doc_id, fields in docs:
+                if fields is not None:
+                    self._add(doc_id, fields)
+            self._vocab_dirty = True
+            self._synced = synced
+            self._applied.clear()
+            self._last_check = self._last_prune = time.monotonic()
+            self.built = True
+            return len(self._doc_terms)
+
+    def refresh(self, force: bool = False) -> None:
+        """Pull listings changed since the last build/refresh (any worker's writes)."""
+        if not self.built:
+            self.rebuild()
+            return
+        now = time.monotonic()
+        if not force and now - self._last_check < _REFRESH_EVERY:
+            return
+        self._last_check = now
+        if now - self._last_prune >= _PRUNE_EVERY:
+            self._last_prune = now
+            self._prune()
+        since = self._synced - timedelta(seconds=_SYNC_OVERLAP) if self._synced else None
+        changed = [
+            (lid, at, rev) for lid, at, rev in _synced_since(since)
+            if self._applied.get(lid, (None, None))[1] != rev
+        ]
+        if not changed:
+            return
+        docs = _load_documents([lid for lid, _, _ in changed])
+        with self._lock:
+            for doc_id, fields in docs:
+                if fields is None:
+                    self._remove(doc_id)
+                else:
+                    self._add(doc_id, fields)
+            self._applied.update((lid, (at, rev)) for lid, at, rev in changed)
+            newest = max(at for _, at, _ in changed)
+            if self._synced is None or newest > self._synced:
+                self._synced = newest
+            cutoff = self._synced - timedelta(seconds=_SYNC_OVERLAP)
+            self._applied = {lid: v for lid, v in self._applied.items() if v[0] >= cutoff}
+
+    def _prune(self) -> None:
+        """Drop documents whose listing is no longer searchable (e.g. deleted)."""
+        live = _searchable_ids()
+        with self._lock:
+            for doc_id in [d for d in self._doc_terms if d not in live]:
+                self._remove(doc_id)
+
+    # ── Query ────────────────────────────────────────────────
+    def _prefix_terms(self, prefix: str) -> list[str]:
+        if self._vocab_dirty:
+            self._vocab = sorted(self._postings)
+            self._vocab_dirty = False
+        lo = bisect.bisect_left(self._vocab, prefix)
+        out = []
+        for term in self._vocab[lo:lo + _MAX_EXPANSIONS + 1]:
+            if not term.startswith(prefix):
+                break
+            if term != prefix:
+                out.append(term)
+        return out
+
+    def search(self, query: str, limit: int = 20) -> list[tuple[int, float]]:
+        """Return [(listing_id, score)] best-first."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            n_docs = len(self._doc_terms)
+            if not n_docs:
+                return []
+            avgdl = self._total_len / n_docs
+
+            # term → weight; the last word is treated as a prefix (search-as-you-type)
+            weighted: dict[str, float] = {}
+            for i, term in enumerate(terms):
+                weighted[term] = max(weighted.get(term, 0.0), 1.0)
+                for syn in _EXPANSIONS.get(term, ()):
+                    weighted[syn] = max(weighted.get(syn, 0.0), _SYNONYM_WEIGHT)
+                if i == len(terms) - 1 and len(term) >= 2:
+                    for ext in self._prefix_terms(term):
+                        weighted[ext] = max(weighted.get(ext, 0.0), _PREFIX_WEIGHT)
+
+            scores: dict[int, float] = {}
+            for term, qw in weighted.items():
+                bucket = self._postings.get(term)
+                if not bucket:
+                    continue
+                df = len(bucket)
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf in bucket.items():
+                    norm = tf * (_K1 + 1) / (tf + _K1 * (1 - _B + _B * self._doc_len[doc_id] / avgdl))
+                    scores[doc_id] = scores.get(doc_id, 0.0) + qw * idf * norm
+
+        return heapq.nlargest(limit, scores.items(), key=lambda kv: kv[1])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "documents": len(self._doc_terms),
+                "terms": len(self._postings),
+                "synced_at": self._synced.isoformat() if self._synced else None,
+            }
+
+
+# ── Database loading ─────────────────────────────────────────
+def _labels(value, amenity_labels: dict) -> str:
+    """Flatten amenity/highlight JSON (ids, keys, labels or {label} dicts) to text."""
+    items = []
+    if isinstance(value, dict):
+        for group in value.values():
+            if isinstance(group, list):
+                items.extend(group)
+    elif isinstance(value, list):
+        items = value
+    out = []
+    for item in items:
+        if isinstance(item, dict):
+            item = item.get("label") or item.get("key") or ""
+        item = str(item or "")
+        out.append(amenity_labels.get(item, item.replace("_", " ")))
+    return " ".join(out)
+
+
+def _max_synced():
+    from sqlalchemy import func
+
+    from ..extensions import db
+    from ..models.listing_index import ListingIndex
+
+    return db.session.query(func.max(ListingIndex.synced_at)).scalar()
+
+
+def _synced_since(since) -> list:
+    """[(listing_id, synced_at, revision)] for rows synced at or after `since` (None: any)."""
+    from ..extensions import db
+    from ..models.listing_index import ListingIndex
+
+    q = db.session.query(ListingIndex.listing_id, ListingIndex.synced_at, ListingIndex.revision)
+    if since is None:
+        q = q.filter(ListingIndex.synced_at.isnot(None))
+    else:
+        q = q.filter(ListingIndex.synced_at >= since)
+    return q.all()
+
+
+def _searchable_ids() -> set:
+    from ..extensions import db
+    from ..models.listing_index import ListingIndex
+
+    return {lid for (lid,) in db.session.query(ListingIndex.listing_id).filter(
+        ListingIndex.status == "PUBLISHED", ListingIndex.owner_active == True  # noqa: E712
+    )}
+
+
+def _load_documents(ids: list | None) -> list:
+    """
+    Return [(listing_id, fields | None)] for every searchable listing (ids
+    None) or for the given listing ids. fields is None for rows that are no
+    longer searchable (unpublished, owner suspended) so the caller drops them.
+    """
+    from ..extensions import db
+    from ..models.amenity import Amenity
+    from ..models.listing import Listing
+    from ..models.listing_index import ListingIndex
+
+    q = (
+        db.session.query(Listing, ListingIndex)
+        .join(ListingIndex, ListingIndex.listing_id == Listing.id)
+    )
+    if ids is None:
+        q = q.filter(ListingIndex.status == "PUBLISHED", ListingIndex.owner_active == True)  # noqa: E712
+    else:
+        q = q.filter(ListingIndex.listing_id.in_(ids))
+    rows = q.all()
+    if not rows:
+        return []
+
+    amenity_labels = {str(a.id): a.label for a in db.session.query(Amenity.id, Amenity.label)}
+
+    docs = []
+    for listing, idx in rows:
+        if idx.status != "PUBLISHED" or not idx.owner_active:
+            docs.append((listing.id, None))
+            continue
+        loc = listing.location if isinstance(listing.location, dict) else {}
+        docs.append((listing.id, {
+            "title":       listing.title,
+            "description": listing.description,
+            "place_type":  listing.place_type,
+            "city":        loc.get("city"),
+            "barangay":    loc.get("barangay"),
+            "amenities":   _labels(listing.amenities, amenity_labels),
+            "highlights":  _labels(listing.highlights, amenity_labels),
+        }))
+    return docs
+
+
+listing_search = ListingSearchIndex()
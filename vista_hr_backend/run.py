@@ -10,5 +10,46 @@ with app.app_context():
     db.create_all() 
     print("tables synced")
 
+    from app.models.counter import (
+        CATALOG_VERSION, PLATFORM_COUNTERS, ensure_counters, recount_platform_counters,
+    )
+    ensure_counters(CATALOG_VERSION)
+    if ensure_counters(*PLATFORM_COUNTERS):
+        recount_platform_counters()
+        print("platform counters seeded")
+
+    from app.models.listing import backfill_listing_covers
+    covers = backfill_listing_covers()
+    if covers:
+        print(f"listing covers backfilled ({covers})")
+
+    from app.models.listing_index import backfill_listing_index
+    indexed = backfill_listing_index()
+    if indexed:
+        print(f"listing index backfilled ({indexed})")
+
+    from app.models.conversation_thread import backfill_conversation_threads
+    threads = backfill_conversation_threads()
+    if threads:
+        print(f"conversation threads backfilled ({threads})")
+
+    from app.models.booking import backfill_booking_snapshots
+    snapshots = backfill_booking_snapshots()
+    if snapshots:
+        print(f"booking snapshots backfilled ({snapshots})")
+
+    from app.utils.search import listing_search
+    print(f"search index built ({listing_search.rebuild()} listings)")
+
+from app.utils.scheduler import scheduler
+from app.utils.booking_expiry import expire_stale_bookings
+from app.models.daily_metric import ensure_rollups
+from app.utils.receipts import prune_exports
+
+scheduler.register("expire_bookings", expire_stale_bookings, app.config["BOOKING_EXPIRY_INTERVAL"])
+scheduler.register("daily_rollups", ensure_rollups, app.config["DAILY_ROLLUP_INTERVAL"])
+scheduler.register("prune_receipt_exports", prune_exports, 600)
+scheduler.start(app)
+
 if __name__ == "__main__":
     app.run(debug=True, port=5000)
@@ -22,38 +22,57 @@
         loadError: null,
     };
 
-    // ── Fetch real bookings from backend ──
+    // ── Fetch bookings for the visible month (+ this month, for the "today" stats) ──
+    // GET /bookings/calendar only returns stays overlapping the window;
+    // months already fetched are kept until reload().
+    const monthCache = new Map();   // "YYYY-MM" → bookings
+
+    function monthKey(date) {
+        return `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, "0")}`;
+    }
+
+    async function fetchMonth(date) {
+        const key = monthKey(date);
+        if (monthCache.has(key)) return monthCache.get(key);
+
+        const from = toYMD(new Date(date.getFullYear(), date.getMonth(), 1));
+        const to = toYMD(new Date(date.getFullYear(), date.getMonth() + 1, 0));
+        const res = await fetch(`${API_BASE}/bookings/calendar?from=${from}&to=${to}`, {
+            headers: { "Content-Type": "application/json" },
+            credentials: "include",
+        });
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        const data = await res.json();
+
+        const items = (data.bookings || []).map(b => ({
+            id: b.id,
+            guest: b.guest || "Unknown",
+            listing: b.unit || `Listing #${b.listing_id}`,
+            unit: b.unit || `Listing #${b.listing_id}`,
+            start: b.start,
+            end: b.end || b.start,
+            status: b.calendar_status || b.status,
+            image: b.image || null,
+            approved_at: b.approved_at || null,
+            no_dates: !!b.no_dates,   // no move-in date — shown on today
+        }));
+        monthCache.set(key, items);
+        return items;
+    }
+
     async function loadBookings() {
-        state.loading = true;
         state.loadError = null;
-        renderLoadingState();
+        const needsFetch = !monthCache.has(monthKey(state.current)) || !monthCache.has(monthKey(new Date()));
+        if (needsFetch) {
+            state.loading = true;
+            renderLoadingState();
+        }
 
         try {
-            const res = await fetch(`${API_BASE}/bookings/for-owner`, {
-                headers: { "Content-Type": "application/json" },
-                credentials: "include",
-            });
-            if (!res.ok) throw new Error(`HTTP ${res.status}`);
-            const data = await res.json();
-
-            // Map to calendar shape — show APPROVED/ACTIVE/COMPLETED bookings
-            // Bookings without move_in_date fall back to today so they still appear
-            const SHOW_STATUSES = new Set(["APPROVED", "ACTIVE", "COMPLETED"]);
-            const todayStr = new Date().toISOString().slice(0, 10);
-            state.bookings = (data.bookings || [])
-                .filter(b => SHOW_STATUSES.has(b.status))
-                .map(b => ({
-                    id: b.id,
-                    guest: b.guest || "Unknown",
-                    listing: b.unit || `Listing #${b.listing_id}`,
-                    unit: b.unit || `Listing #${b.listing_id}`,
-                    start: b.start || todayStr,
-                    end: b.end || b.start || todayStr,
-                    status: b.calendar_status || b.status,
-                    image: b.image || null,
-                    approved_at: b.approved_at || null,
-                    no_dates: !b.start,
-                }));
+            const lists = await Promise.all([fetchMonth(state.current), fetchMonth(new Date())]);
+            const byId = new Map();
+            lists.flat().forEach(item => byId.set(item.id, item));
+            state.bookings = [...byId.values()];
         } catch (e) {
             console.error("[calendar] Failed to load bookings", e);
             state.loadError = "Could not load bookings. Please try again.";
@@ -760,18 +779,20 @@
         `;
 
         wrap.querySelectorAll(".calendarMonthItem").forEach((btn) => {
-            btn.addEventListener("click", () => {
+            btn.addEventListener("click", async () => {
                 const monthIndex = Number(btn.dataset.monthIndex);
                 state.current = new Date(currentYear, monthIndex, 1);
                 state.monthPickerOpen = false;
+                await loadBookings();
                 render();
             });
         });
 
         wrap.querySelectorAll(".calendarMonthNavBtn").forEach((btn) => {
-            btn.addEventListener("click", () => {
+            btn.addEventListener("click", async () => {
                 const shift = Number(btn.dataset.yearShift || 0);
                 state.current = new Date(currentYear + shift, state.current.getMonth(), 1);
+                await loadBookings();
                 renderMonthPicker();
                 renderGrid();
                 renderSummary();
@@ -780,26 +801,29 @@
     }
 
     function bindControls() {
-        document.getElementById("calPrevBtn")?.addEventListener("click", () => {
+        document.getElementById("calPrevBtn")?.addEventListener("click", async () => {
             state.current = new Date(state.current.getFullYear(), state.current.getMonth() - 1, 1);
             state.monthPickerOpen = false;
+            await loadBookings();
             renderGrid();
             renderMonthPicker();
             renderSummary();
         });
 
-        document.getElementById("calNextBtn")?.addEventListener("click", () => {
+        document.getElementById("calNextBtn")?.addEventListener("click", async () => {
             state.current = new Date(state.current.getFullYear(), state.current.getMonth() + 1, 1);
             state.monthPickerOpen = false;
+            await loadBookings();
             renderGrid();
             renderMonthPicker();
             renderSummary();
         });
 
-        document.getElementById("calTodayBtn")?.addEventListener("click", () => {
+        document.getElementById("calTodayBtn")?.addEventListener("click", async () => {
             state.current = new Date();
             state.selectedDate = todayYMD();
             state.monthPickerOpen = false;
+            await loadBookings();
             render();
         });
 
@@ -928,6 +952,7 @@
         },
         reload: async () => {
             _calInitialized = false;
+            monthCache.clear();
             await loadBookings();
             _calInitialized = true;
             await render();
@@ -956,6 +956,8 @@ window.DashToday = (() => {
         if (!overlay || !content) return;
 
         content.innerHTML = `<div class="receiptLoading">Loading receipt…</div>`;
+        const pdfBtn = document.getElementById("receiptPdfBtn");
+        if (pdfBtn) pdfBtn.href = `${API}/bookings/${bookingId}/receipt?format=pdf`;
         overlay.hidden = false;          // clear html hidden attr
         overlay.classList.add("open");   // CSS uses .open not hidden
         document.body.style.overflow = "hidden";
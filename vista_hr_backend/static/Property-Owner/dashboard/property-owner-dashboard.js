@@ -1444,9 +1444,13 @@
     }
   });
 
-  // Initial load + poll every 60s (only when panel is closed)
+  // Initial load, then pushed over SSE; poll every 60s only while the
+  // stream is down (and only when the panel is closed)
   loadNotifications();
+  window.VistaRealtime?.on("notification", () => loadNotifications());
+  window.VistaRealtime?.on("ready", () => loadNotifications());
   setInterval(() => {
+    if (window.VistaRealtime?.isConnected()) return;
     const panel = elN("notifPanel");
     if (panel && !panel.hidden) return; // don't clobber open panel
     loadNotifications();
@@ -48,7 +48,12 @@
         setupModal();
         setupReviewModal();
         await loadBookings();
-        setInterval(pollStatusChanges, 30000);
+        window.VistaRealtime?.on("booking", pollStatusChanges);
+        window.VistaRealtime?.on("ready", pollStatusChanges);
+        setInterval(() => {
+            if (window.VistaRealtime?.isConnected()) return;
+            pollStatusChanges();
+        }, 30000);
     });
 
     // ── Load bookings ─────────────────────────────────────────
@@ -738,6 +743,8 @@
         const content = document.getElementById("receiptContent");
         if (!overlay || !content) return;
         content.innerHTML = `<div class="receiptLoading">Loading receipt…</div>`;
+        const pdfBtn = document.getElementById("receiptPdfBtn");
+        if (pdfBtn) pdfBtn.href = `${API}/bookings/${bookingId}/receipt?format=pdf`;
         overlay.hidden = false;
         document.body.style.overflow = "hidden";
         try {
@@ -1336,5 +1336,11 @@ function closeBookingModal() {
   });
 
   loadNotif();
-  setInterval(loadNotif, 10000);
+  // Pushed over SSE when connected; the interval is the fallback
+  window.VistaRealtime?.on("notification", loadNotif);
+  window.VistaRealtime?.on("ready", loadNotif);
+  setInterval(() => {
+    if (window.VistaRealtime?.isConnected()) return;
+    loadNotif();
+  }, 10000);
 })();
\ No newline at end of file
@@ -74,24 +74,87 @@
 
     async function loadConversations(archived = false) {
         try {
-            const url = archived ? "/messages/conversations?archived=true" : "/messages/conversations";
-            const data = await apiFetch(url);
-            state.conversations = data.conversations || [];
+            const base = archived
+                ? "/messages/conversations?archived=true&limit=100"
+                : "/messages/conversations?limit=100";
+            // Inbox is keyset-paged — follow next_cursor to the end
+            const all = [];
+            let cursor = null;
+            do {
+                const data = await apiFetch(cursor ? `${base}&cursor=${encodeURIComponent(cursor)}` : base);
+                all.push(...(data.conversations || []));
+                cursor = data.next_cursor;
+            } while (cursor);
+            state.conversations = all;
         } catch (e) {
             console.warn("[Messages] loadConversations failed", e);
         }
     }
 
+    const THREAD_PAGE = 50;
+
     async function loadThread(listing_id, other_user_id) {
         try {
-            const data = await apiFetch(`/messages/conversations/${listing_id}/${other_user_id}`);
+            const data = await apiFetch(`/messages/conversations/${listing_id}/${other_user_id}?limit=${THREAD_PAGE}`);
             state.messages = data.messages || [];
+            state.hasOlder = !!data.has_more;
+            applyReadUpto(data.read_upto);
         } catch (e) {
             console.warn("[Messages] loadThread failed", e);
             state.messages = [];
+            state.hasOlder = false;
+        }
+    }
+
+    // Poll: only messages newer than the ones held + read receipts.
+    // Returns true when something changed.
+    async function syncThread(listing_id, other_user_id) {
+        const lastId = state.messages.reduce((mx, m) => Math.max(mx, m.id || 0), 0);
+        try {
+            const data = await apiFetch(`/messages/conversations/${listing_id}/${other_user_id}?after_id=${lastId}`);
+            const fresh = (data.messages || []).filter(m => !state.messages.some(x => x.id === m.id));
+            state.messages.push(...fresh);
+            return applyReadUpto(data.read_upto) || fresh.length > 0;
+        } catch (e) {
+            console.warn("[Messages] syncThread failed", e);
+            return false;
+        }
+    }
+
+    function applyReadUpto(readUpto) {
+        if (!readUpto) return false;
+        let changed = false;
+        state.messages.forEach(m => {
+            const isOwn = m.sender_id === state.meId || m.from === "me";
+            if (isOwn && m.id <= readUpto && !m.is_read) { m.is_read = true; changed = true; }
+        });
+        return changed;
+    }
+
+    async function loadOlder() {
+        const t = state.activeThread;
+        if (!t || !state.hasOlder || state.loadingOlder || !state.messages.length) return;
+        state.loadingOlder = true;
+        const firstId = Math.min(...state.messages.map(m => m.id));
+        try {
+            const data = await apiFetch(`/messages/conversations/${t.listing_id}/${t.other_user_id}?before_id=${firstId}&limit=${THREAD_PAGE}`);
+            state.messages = [...(data.messages || []), ...state.messages];
+            state.hasOlder = !!data.has_more;
+            const b = el("rmBubbles");
+            const fromBottom = b ? b.scrollHeight - b.scrollTop : 0;
+            renderBubbles(false);
+            if (b) b.scrollTop = b.scrollHeight - fromBottom;
+        } catch (e) {
+            console.warn("[Messages] loadOlder failed", e);
+        } finally {
+            state.loadingOlder = false;
         }
     }
 
+    el("rmBubbles")?.addEventListener("scroll", e => {
+        if (e.target.scrollTop < 40) loadOlder();
+    });
+
     async function sendMessage(text, image_url = null) {
         if (!state.activeThread) return;
         const { listing_id, other_user_id } = state.activeThread;
@@ -121,7 +184,10 @@
         if (_typingTimer) return;
         apiFetch("/messages/typing", {
             method: "POST",
-            body: JSON.stringify({ other_user_id: state.activeThread.other_user_id }),
+            body: JSON.stringify({
+                other_user_id: state.activeThread.other_user_id,
+                listing_id: state.activeThread.listing_id,
+            }),
         }).catch(() => { });
         _typingTimer = setTimeout(() => { _typingTimer = null; }, 3000);
     }
@@ -129,10 +195,11 @@
     function startTypingPoll() {
         stopTypingPoll();
         if (!state.activeThread) return;
-        const { other_user_id } = state.activeThread;
+        const { listing_id, other_user_id } = state.activeThread;
         _typingPoll = setInterval(async () => {
+            if (window.VistaRealtime?.isConnected()) return;   // pushed instead
             try {
-                const d = await apiFetch(`/messages/typing/${other_user_id}`);
+                const d = await apiFetch(`/messages/typing/${other_user_id}?listing_id=${listing_id}`);
                 const indicator = el("rmTypingIndicator");
                 if (indicator) indicator.hidden = !d.is_typing;
             } catch { }
@@ -143,6 +210,39 @@
         if (_typingPoll) { clearInterval(_typingPoll); _typingPoll = null; }
     }
 
+    // ── Realtime (SSE) — polling above is only the fallback ─
+    let _typingHide = null;
+
+    function isActive(listing_id, other_user_id) {
+        const t = state.activeThread;
+        return !!t && t.listing_id === listing_id && t.other_user_id === other_user_id;
+    }
+
+    async function refreshActive() {
+        const t = state.activeThread;
+        if (t && await syncThread(t.listing_id, t.other_user_id)) renderBubbles();
+        await loadConversations();
+        renderThreadList();
+    }
+
+    if (window.VistaRealtime) {
+        VistaRealtime.on("ready", refreshActive);
+        VistaRealtime.on("message", refreshActive);
+        VistaRealtime.on("read", d => {
+            if (isActive(d.listing_id, d.other_user_id) && applyReadUpto(d.read_upto)) renderBubbles(false);
+        });
+        VistaRealtime.on("typing", d => {
+            const t = state.activeThread;
+            if (!t || t.other_user_id !== d.user_id) return;
+            if (d.listing_id && d.listing_id !== t.listing_id) return;
+            const indicator = el("rmTypingIndicator");
+            if (!indicator) return;
+            indicator.hidden = false;
+            clearTimeout(_typingHide);
+            _typingHide = setTimeout(() => { indicator.hidden = true; }, (d.expires_in || 4) * 1000);
+        });
+    }
+
     // ── Photo upload ──────────────────────────────────────
     async function uploadPhoto(file) {
         try {
@@ -274,7 +374,7 @@
     }
 
     // ── Render: Chat bubbles ───────────────────────────────
-    function renderBubbles() {
+    function renderBubbles(stickToBottom = true) {
         const bubblesEl = el("rmBubbles");
         if (!bubblesEl) return;
 
@@ -317,7 +417,7 @@
             </div>`;
         }).join("");
 
-        scrollToBottom();
+        if (stickToBottom) scrollToBottom();
     }
 
     function scrollToBottom() {
@@ -434,11 +534,8 @@
         startTypingPoll();
         clearInterval(pollTimer);
         pollTimer = setInterval(async () => {
-            if (!state.activeThread) return;
-            const prev = state.messages.length;
-            const prevRead = state.messages.filter(m => m.is_read).length;
-            await loadThread(state.activeThread.listing_id, state.activeThread.other_user_id);
-            if (state.messages.length !== prev || state.messages.filter(m => m.is_read).length !== prevRead) {
+            if (!state.activeThread || window.VistaRealtime?.isConnected()) return;
+            if (await syncThread(state.activeThread.listing_id, state.activeThread.other_user_id)) {
                 renderBubbles();
                 await loadConversations();
                 renderThreadList();
@@ -197,45 +197,31 @@ document.addEventListener("DOMContentLoaded", async () => {
     // ══════════════════════════════════════════════════════════
     // OVERVIEW
     // ══════════════════════════════════════════════════════════
-    let cachedUsers = [];
+    // Counts from GET /admin/overview — also feed the Users page stat cards
+    let overviewCounts = null;
 
     async function loadOverview() {
         try {
-            const [userData, kycData, studentData, listingsData, bookingsData, feedbackData] = await Promise.all([
-                apiFetch("/users"),
+            const [overview, kycData, studentData, listingsData, bookingsData, feedbackData] = await Promise.all([
+                apiFetch("/admin/overview"),
                 apiFetch("/admin/kyc?status=PENDING"),
                 apiFetch("/admin/student?status=PENDING"),
                 apiFetch("/admin/listings?status=PUBLISHED&per_page=1").catch(() => ({ total: 0 })),
-                apiFetch("/bookings").catch(() => ({ bookings: [] })),
+                apiFetch("/bookings?status=APPROVED,VIEWING_SCHEDULED,ACTIVE&per_page=1&lean=1").catch(() => ({ total: 0 })),
                 apiFetch("/feedback?limit=50").catch(() => ({ feedback: [] })),
             ]);
 
-            cachedUsers = (userData.users || []).map(u => ({
-                id: u.id,
-                name: u.name,
-                email: u.email,
-                role: mapRoleFromBackend(u.role),
-                status: apiStatusToUi(u),
-                is_verified: !!u.is_verified,
-                is_suspended: !!u.is_suspended,
-                created_at: u.created_at,
-            }));
-
-            const total = cachedUsers.length;
-            const admins = cachedUsers.filter(u => u.role === "Admin").length;
-            const owners = cachedUsers.filter(u => u.role === "Property Owner").length;
-            const residents = cachedUsers.filter(u => u.role === "Resident").length;
-            const suspended = cachedUsers.filter(u => u.status === "Suspended").length;
+            overviewCounts = overview.users || {};
+            const total = overviewCounts.total || 0;
+            renderStats();
             const kycItems = kycData.kyc_applications || [];
             const stuItems = studentData.student_applications || [];
 
             // Active listings — admin endpoint returns `total` of filtered PUBLISHED listings
             const activeListings = listingsData.total || 0;
 
-            const bookings = bookingsData.bookings || [];
-            const activeBookings = bookings.filter(b =>
-                ["APPROVED", "VIEWING_SCHEDULED", "ACTIVE"].includes(b.status)
-            ).length;
+            // Active bookings — server-side status filter, only `total` is needed
+            const activeBookings = bookingsData.total || 0;
 
             const feedback = feedbackData.feedback || [];
             const rated = feedback.filter(f => f.rating);
@@ -254,18 +240,14 @@ document.addEventListener("DOMContentLoaded", async () => {
             if (elAvgFeedbackSub) elAvgFeedbackSub.textContent = `Based on ${rated.length} ${rated.length === 1 ? "review" : "reviews"}`;
             if (elActiveBookings) elActiveBookings.textContent = activeBookings;
 
-            // Active users now (last_login_at within 15 min)
-            const now = Date.now();
-            const FIFTEEN_MIN = 15 * 60 * 1000;
-            const activeNowUsers = (userData.users || []).filter(u => {
-                if (!u.last_login_at) return false;
-                const t = new Date(u.last_login_at).getTime();
-                return !isNaN(t) && (now - t) <= FIFTEEN_MIN;
-            });
-            const activeCount = activeNowUsers.length;
-            const activeAdmins = activeNowUsers.filter(u => mapRoleFromBackend(u.role) === "Admin").length;
-            const activeOwners = activeNowUsers.filter(u => mapRoleFromBackend(u.role) === "Property Owner").length;
-            const activeResidents = activeNowUsers.filter(u => mapRoleFromBackend(u.role) === "Resident").length;
+            // Active users now — server presence (any request / open stream
+            // in the last 15 min)
+            const presence = overview.active_now || {};
+            const byRole = presence.by_role || {};
+            const activeCount = presence.total || 0;
+            const activeAdmins = byRole.ADMIN || 0;
+            const activeOwners = byRole.OWNER || 0;
+            const activeResidents = byRole.RESIDENT || 0;
 
             const elActiveCount = document.getElementById("anActiveCount");
             const elActiveAdmins = document.getElementById("anActiveAdmins");
@@ -283,11 +265,17 @@ document.addEventListener("DOMContentLoaded", async () => {
             // KYC queue (show max 5)
             renderKycQueue(kycItems.slice(0, 5));
 
-            // Recent users (last 5 by created_at)
-            const recent = [...cachedUsers]
-                .filter(u => u.created_at)
-                .sort((a, b) => new Date(b.created_at) - new Date(a.created_at))
-                .slice(0, 5);
+            // Recent users (last 5 by created_at, newest first from the server)
+            const recent = (overview.recent_users || []).map(u => ({
+                id: u.id,
+                name: u.name,
+                email: u.email,
+                role: mapRoleFromBackend(u.role),
+                status: apiStatusToUi(u),
+                is_verified: !!u.is_verified,
+                is_suspended: !!u.is_suspended,
+                created_at: u.created_at,
+            }));
             renderRecentUsers(recent);
 
             // Update nav badges
@@ -379,7 +367,8 @@ document.addEventListener("DOMContentLoaded", async () => {
     // ══════════════════════════════════════════════════════════
     // USERS VIEW
     // ══════════════════════════════════════════════════════════
-    let users = [];
+    let users = [];             // current page only — filtering/paging happen server-side
+    let usersPages = 1;
     let editingId = null;
 
     const tableBody = document.getElementById("userTableBody");
@@ -402,29 +391,18 @@ document.addEventListener("DOMContentLoaded", async () => {
 
     function renderStats() {
         const el = id => document.getElementById(id);
-        if (el("totalUsers")) el("totalUsers").textContent = users.length;
-        if (el("totalOwners")) el("totalOwners").textContent = users.filter(u => u.role === "Property Owner").length;
-        if (el("totalResidents")) el("totalResidents").textContent = users.filter(u => u.role === "Resident").length;
-        const suspended = users.filter(u => u.is_suspended).length;
+        const counts = overviewCounts || {};
+        if (el("totalUsers")) el("totalUsers").textContent = counts.total || 0;
+        if (el("totalOwners")) el("totalOwners").textContent = counts.owners || 0;
+        if (el("totalResidents")) el("totalResidents").textContent = counts.residents || 0;
+        const suspended = counts.suspended || 0;
         if (el("ovSuspended")) el("ovSuspended").textContent = suspended;
         const chip = el("suspendedChip");
         if (chip) chip.style.display = suspended > 0 ? "" : "none";
     }
 
     function renderUsers() {
-        const keyword = (searchInput?.value || "").trim().toLowerCase();
-        const roleValue = roleFilter?.value || "all";
-        const statusValue = statusFilter?.value || "all";
-
-        const filtered = users.filter(u => {
-            const matchKeyword = !keyword ||
-                u.name.toLowerCase().includes(keyword) ||
-                u.email.toLowerCase().includes(keyword) ||
-                u.role.toLowerCase().includes(keyword);
-            const matchRole = roleValue === "all" || u.role === roleValue;
-            const matchStatus = statusValue === "all" || u.status === statusValue;
-            return matchKeyword && matchRole && matchStatus;
-        });
+        const filtered = users;
 
         const grid = document.getElementById("userCardGrid");
         if (!grid) return;
@@ -440,10 +418,9 @@ document.addEventListener("DOMContentLoaded", async () => {
             return;
         }
 
-        // Pagination slice
-        const totalPages = Math.ceil(filtered.length / USERS_PER_PAGE);
-        if (currentUserPage > totalPages) currentUserPage = 1;
-        const pageSlice = filtered.slice((currentUserPage - 1) * USERS_PER_PAGE, currentUserPage * USERS_PER_PAGE);
+        // `users` is already the requested page
+        const totalPages = usersPages;
+        const pageSlice = filtered;
 
         grid.innerHTML = pageSlice.map(u => {
             const initials = (u.name || "?").split(" ").map(w => w[0]).join("").toUpperCase().slice(0, 2);
@@ -544,8 +521,8 @@ document.addEventListener("DOMContentLoaded", async () => {
                 <button id="uPagNext" style="padding:6px 14px;border:1px solid rgba(0,0,0,0.1);border-radius:8px;background:#fff;cursor:pointer;font-size:13px;font-weight:600;" ${currentUserPage >= totalPages ? "disabled" : ""}>
                     Next &rarr;
                 </button>`;
-            document.getElementById("uPagPrev")?.addEventListener("click", () => { if (currentUserPage > 1) { currentUserPage--; renderUsers(); } });
-            document.getElementById("uPagNext")?.addEventListener("click", () => { if (currentUserPage < totalPages) { currentUserPage++; renderUsers(); } });
+            document.getElementById("uPagPrev")?.addEventListener("click", () => { if (currentUserPage > 1) { currentUserPage--; loadUsers({ withCounts: false }); } });
+            document.getElementById("uPagNext")?.addEventListener("click", () => { if (currentUserPage < totalPages) { currentUserPage++; loadUsers({ withCounts: false }); } });
         }
 
         // Attach hover popover to each N/2 Verified badge after render
@@ -716,9 +693,34 @@ document.addEventListener("DOMContentLoaded", async () => {
         });
     }
 
-    async function loadUsers() {
+    // UI filter values → /users query params
+    const STATUS_FILTER_PARAM = { Active: "ACTIVE", Pending: "PENDING", Suspended: "SUSPENDED" };
+    let usersRequest = 0;
+
+    // Paging/filtering only re-fetches the page; everything else (tab open,
+    // user actions) also refreshes the stat-card counts.
+    async function loadUsers({ withCounts = true } = {}) {
+        const params = new URLSearchParams({ page: currentUserPage, per_page: USERS_PER_PAGE });
+        const keyword = (searchInput?.value || "").trim();
+        const roleValue = roleFilter?.value || "all";
+        const statusValue = statusFilter?.value || "all";
+        if (keyword) params.set("q", keyword);
+        if (roleValue !== "all") params.set("role", mapRoleToBackend(roleValue));
+        if (STATUS_FILTER_PARAM[statusValue]) params.set("status", STATUS_FILTER_PARAM[statusValue]);
+
+        const requestId = ++usersRequest;
         try {
-            const data = await apiFetch("/users");
+            const [data, overview] = await Promise.all([
+                apiFetch(`/users?${params}`),
+                withCounts ? apiFetch("/admin/overview").catch(() => null) : null,
+            ]);
+            if (requestId !== usersRequest) return;      // a newer filter/page request superseded this one
+            if (overview) overviewCounts = overview.users || overviewCounts;
+            usersPages = data.pages || 1;
+            if (currentUserPage > usersPages) {
+                currentUserPage = usersPages;
+                return loadUsers({ withCounts: false });
+            }
             users = (data.users || []).map(u => ({
                 id: u.id,
                 name: u.name,
@@ -898,9 +900,13 @@ document.addEventListener("DOMContentLoaded", async () => {
     closeModalBtn?.addEventListener("click", closeModal);
     cancelBtn?.addEventListener("click", closeModal);
     modalOverlay?.addEventListener("click", e => { if (e.target === modalOverlay) closeModal(); });
-    searchInput?.addEventListener("input", () => { currentUserPage = 1; renderUsers(); });
-    roleFilter?.addEventListener("change", () => { currentUserPage = 1; renderUsers(); });
-    statusFilter?.addEventListener("change", () => { currentUserPage = 1; renderUsers(); });
+    let searchTimer = null;
+    searchInput?.addEventListener("input", () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(() => { currentUserPage = 1; loadUsers({ withCounts: false }); }, 250);
+    });
+    roleFilter?.addEventListener("change", () => { currentUserPage = 1; loadUsers({ withCounts: false }); });
+    statusFilter?.addEventListener("change", () => { currentUserPage = 1; loadUsers({ withCounts: false }); });
 
     // ══════════════════════════════════════════════════════════
     // KYC VIEW
@@ -2834,7 +2840,8 @@ document.addEventListener("DOMContentLoaded", async () => {
         { domain: "Auth", method: "POST", path: "/api/auth/google/complete", auth: "Public", desc: "Finish new Google user signup with chosen role." },
 
         // ── Users ────────────────────────────────────────────
-        { domain: "Users", method: "GET", path: "/api/users", auth: "ADMIN", desc: "List all users. Includes last_login_at, KYC/student doc URLs." },
+        { domain: "Users", method: "GET", path: "/api/users", auth: "ADMIN", desc: "Paginated users (?page, ?per_page, ?q, ?role, ?status). Includes last_login_at, KYC/student doc URLs." },
+        { domain: "Users", method: "GET", path: "/api/admin/overview", auth: "ADMIN", desc: "Dashboard counts by role/status, pending reviews, 5 newest users, active now." },
         { domain: "Users", method: "POST", path: "/api/users", auth: "ADMIN", desc: "Create new admin account." },
         { domain: "Users", method: "PUT", path: "/api/users/{id}", auth: "ADMIN", desc: "Edit user account (name read-only on edit)." },
         { domain: "Users", method: "PATCH", path: "/api/users/{id}", auth: "ADMIN", desc: "Partial update — suspend/uplift/reset-strikes." },
@@ -2863,7 +2870,11 @@ document.addEventListener("DOMContentLoaded", async () => {
 
         // ── Bookings ─────────────────────────────────────────
         { domain: "Bookings", method: "POST", path: "/api/bookings", auth: "RESIDENT", desc: "Create booking request. Guards: 1 live per resident, listing occupancy." },
-        { domain: "Bookings", method: "GET", path: "/api/bookings", auth: "Any", desc: "List bookings — filtered by role." },
+        { domain: "Bookings", method: "GET", path: "/api/bookings", auth: "ADMIN", desc: "All bookings, paginated (?status=A,B, ?page, ?per_page, ?lean=1)." },
+        { domain: "Bookings", method: "GET", path: "/api/bookings/calendar", auth: "OWNER", desc: "Stays overlapping ?from..?to (≤62 days) + per-day occupancy per listing." },
+        { domain: "Bookings", method: "GET", path: "/api/bookings/{id}/receipt", auth: "RESIDENT/OWNER", desc: "Receipt fields, or ?format=html|pdf rendered (cached per booking version)." },
+        { domain: "Bookings", method: "POST", path: "/api/bookings/receipts/export", auth: "OWNER", desc: "Queue a ZIP of receipts for reservations made ?from..?to (≤92 days), ?format=pdf|html → 202 {job_id}." },
+        { domain: "Bookings", method: "GET", path: "/api/bookings/receipts/export/{job_id}", auth: "OWNER", desc: "202 while the export is building, then the ZIP download." },
         { domain: "Bookings", method: "PATCH", path: "/api/bookings/{id}/status", auth: "OWNER", desc: "Approve/reject/cancel/activate/complete." },
         { domain: "Bookings", method: "PATCH", path: "/api/bookings/{id}/viewing-response", auth: "RESIDENT", desc: "Confirm/decline scheduled viewing." },
         { domain: "Bookings", method: "PATCH", path: "/api/bookings/{id}/move-out", auth: "RESIDENT", desc: "Resident move-out (records days_early)." },
@@ -2891,7 +2902,8 @@ document.addEventListener("DOMContentLoaded", async () => {
         { domain: "Messages", method: "DELETE", path: "/api/messages/conversations/{lid}/{oid}/archive", auth: "Any", desc: "Unarchive thread." },
         { domain: "Messages", method: "GET", path: "/api/messages/unread-count", auth: "Any", desc: "Badge count of unread messages." },
         { domain: "Messages", method: "POST", path: "/api/messages/typing", auth: "Any", desc: "Set typing_until = now+4s." },
-        { domain: "Messages", method: "GET", path: "/api/messages/typing/{user_id}", auth: "Any", desc: "Poll typing status for peer." },
+        { domain: "Messages", method: "GET", path: "/api/messages/typing/{user_id}", auth: "Any", desc: "Typing (to me) + online / last seen for peer — in memory." },
+        { domain: "Messages", method: "GET", path: "/api/events", auth: "Any", desc: "SSE stream — message, read, typing, notification, booking events." },
 
         // ── Feedback ─────────────────────────────────────────
         { domain: "Feedback", method: "POST", path: "/api/feedback", auth: "RESIDENT/OWNER", desc: "Submit feedback. Server-side profanity filter (EN+TL)." },
@@ -0,0 +1,62 @@
+/* ============================================================
+   VISTA-HR · Realtime channel
+   shared/realtime.js
+
+   One EventSource per page on /api/events. Pages register handlers:
+
+       VistaRealtime.on("message", data => …);
+       VistaRealtime.on("ready",   () => …);   // (re)connected — resync
+
+   and keep their old polling only as a fallback:
+
+       if (VistaRealtime.isConnected()) return;
+============================================================ */
+
+(() => {
+    if (window.VistaRealtime) return;
+
+    const TYPES = ["message", "read", "typing", "notification", "booking"];
+    // Server refused the stream (503 — worker at its stream cap): poll for a while
+    const REFUSED_RETRY_MS = 60000;
+    const handlers = {};
+    let source = null;
+    let connected = false;
+
+    function emit(type, data) {
+        (handlers[type] || []).forEach(fn => {
+            try { fn(data); } catch (e) { console.warn("[realtime] handler failed", type, e); }
+        });
+    }
+
+    function connect() {
+        if (source || !("EventSource" in window)) return;
+        source = new EventSource("/api/events", { withCredentials: true });
+
+        source.addEventListener("ready", () => {
+            connected = true;
+            emit("ready", {});
+        });
+        source.onerror = () => {
+            // EventSource retries by itself; polling covers the gap
+            connected = false;
+            // …except after a non-200 answer, where it gives up for good
+            if (source.readyState === EventSource.CLOSED) {
+                source = null;
+                setTimeout(connect, REFUSED_RETRY_MS + Math.random() * REFUSED_RETRY_MS);
+            }
+        };
+        TYPES.forEach(type => source.addEventListener(type, e => {
+            let data;
+            try { data = JSON.parse(e.data); } catch { return; }
+            emit(type, data);
+        }));
+    }
+
+    window.VistaRealtime = {
+        on(type, fn) {
+            (handlers[type] ||= []).push(fn);
+            connect();
+        },
+        isConnected: () => connected,
+    };
+})();